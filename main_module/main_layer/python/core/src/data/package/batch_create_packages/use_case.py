@@ -0,0 +1,72 @@
+from collections import namedtuple
+from core.src.domain.models import PackageWriteResult
+from core.src.domain.use_cases import BatchCreatePackagesUseCaseInterface
+from core.src.infra.config import UnitOfWork
+from core.src.infra.repo import PackageRepository
+
+BatchCreatePackagesParameter = namedtuple(
+    "BatchCreatePackagesParameter",
+    "empresa_id packages created_by item_errors",
+    defaults=(None,),
+)
+
+
+class BatchCreatePackagesUseCase(BatchCreatePackagesUseCaseInterface):
+    """
+    Use case gateway for create many Package entities in a single transaction
+    """
+
+    repository = PackageRepository()
+
+    def proceed(self, parameter: BatchCreatePackagesParameter) -> dict:
+        """
+        Proceed the execution of use case by calling database to create the valid entities
+        :param  - parameter: An Interfaced object with required data, item_errors having schema
+                    errors by item index as returned by validate_schema_items()
+        :return - A Dictionary with formated response of the request having 'success' and 'data'
+                    objects, 'data' having the result of each item
+        """
+
+        item_errors = parameter.item_errors or {}
+        packages = [
+            dict(
+                name=item.get("name"),
+                symbol=item.get("symbol"),
+                empresa_id=parameter.empresa_id,
+                created_by=parameter.created_by,
+                updated_by=parameter.created_by,
+            )
+            for index, item in enumerate(parameter.packages)
+            if index not in item_errors
+        ]
+
+        try:
+            with UnitOfWork(empresa_id=parameter.empresa_id):
+                created = iter(self.repository.create_packages(packages))
+
+            results = []
+            for index in range(len(parameter.packages)):
+                if index in item_errors:
+                    result = PackageWriteResult(index, None, False, "invalid")
+                else:
+                    result = next(created)._replace(index=index)
+                results.append(self.__serialize_result(result, item_errors))
+
+            created_count = len([result for result in results if result["success"]])
+            return self._render_response(
+                True,
+                results,
+                created=created_count,
+                failed=len(results) - created_count,
+            )
+        except:
+            self._print_exception()
+            return self._render_response(False, None)
+
+    def __serialize_result(self, result: PackageWriteResult, item_errors: dict) -> dict:
+        serialized = result._asdict()
+        serialized["package"] = (
+            result.package._asdict() if result.package is not None else None
+        )
+        serialized["errors"] = item_errors.get(result.index, [])
+        return serialized
@@ -0,0 +1,42 @@
+from collections import namedtuple
+from core.src.domain.use_cases import BatchDeletePackagesUseCaseInterface
+from core.src.infra.config import UnitOfWork
+from core.src.infra.repo import PackageRepository
+
+BatchDeletePackagesParameter = namedtuple(
+    "BatchDeletePackagesParameter", "empresa_id ids"
+)
+
+
+class BatchDeletePackagesUseCase(BatchDeletePackagesUseCaseInterface):
+    """
+    Use case gateway for delete many existing Package entities in a single transaction
+    """
+
+    repository = PackageRepository()
+
+    def proceed(self, parameter: BatchDeletePackagesParameter) -> dict:
+        """
+        Proceed the execution of use case by calling database to delete existing entities by ID
+        :param  - parameter: An Interfaced object with required data
+        :return - A Dictionary with formated response of the request having 'success' and 'data'
+                    objects, 'data' having the result of each ID
+        """
+
+        try:
+            with UnitOfWork(empresa_id=parameter.empresa_id):
+                results = self.repository.delete_packages(
+                    ids=parameter.ids, empresa_id=parameter.empresa_id
+                )
+
+            serialized_results = list(map(lambda item: item._asdict(), results))
+            deleted_count = len([result for result in results if result.success])
+            return self._render_response(
+                True,
+                serialized_results,
+                deleted=deleted_count,
+                failed=len(results) - deleted_count,
+            )
+        except:
+            self._print_exception()
+            return self._render_response(False, None)
@@ -20,14 +20,10 @@ class DeletePackageUseCase(DeletePackageUseCaseInterface):
         """
 
         try:
-            record = self.repository.get_package(
-                id=parameter.id, empresa_id=parameter.empresa_id
-            )
-
-            success = self.repository.delete_package(
+            record = self.repository.delete_package_returning(
                 id=parameter.id, empresa_id=parameter.empresa_id
             )
             serialized_record = record._asdict()
-            return self._render_response(success, serialized_record)
+            return self._render_response(True, serialized_record)
         except:
             return self._render_response(False, None)
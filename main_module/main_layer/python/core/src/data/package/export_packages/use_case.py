@@ -0,0 +1,79 @@
+from collections import namedtuple
+from core.src.domain.use_cases import ExportPackagesUseCaseInterface
+from core.src.infra.export import EXPORT_ENCODERS
+from core.src.infra.entities import Package as PackageModel
+from core.src.infra.repo import PackageRepository
+from core.src.infra.services import S3Service
+
+ExportPackagesParameter = namedtuple(
+    "ExportPackagesParameter",
+    "empresa_id format bucket key region expires_in batch_size",
+    defaults=("us-east-1", 3600, 1000),
+)
+
+
+class ExportPackagesUseCase(ExportPackagesUseCaseInterface):
+    """
+    Use case gateway for export every Package of a company into a file on S3. Rows are streamed
+    from the database, encoded batch by batch and uploaded as multipart parts, so memory stays
+    bounded by one batch plus one part whatever the company size
+    """
+
+    repository = PackageRepository()
+
+    @classmethod
+    def available_formats(cls) -> list:
+        """
+        Return the export formats whose encoder can run in this environment, parquet being
+        left out when pyarrow is not installed
+        :param  - None
+        :return - A list of format names
+        """
+
+        return [
+            format
+            for format, encoder_class in EXPORT_ENCODERS.items()
+            if encoder_class.is_available()
+        ]
+
+    def proceed(self, parameter: ExportPackagesParameter) -> dict:
+        """
+        Proceed the execution of use case by streaming the company Packages into the S3 object
+        :param  - parameter: An Interfaced object with required data, format being one of
+                    available_formats() and key the object key without extension
+        :return - A Dictionary with formated response of the request having 'success' and 'data'
+                    objects, 'data' having the presigned 'url', 'bucket', 'key', 'format', 'rows' and 'bytes'
+        """
+
+        try:
+            encoder_class = EXPORT_ENCODERS[parameter.format]
+            key = "{}.{}".format(parameter.key, encoder_class.extension)
+            service = S3Service(region=parameter.region)
+            columns = PackageModel.__table__.columns.keys()
+
+            with service.open_multipart_writer(
+                parameter.bucket, key, encoder_class.content_type
+            ) as writer:
+                encoder = encoder_class(writer, columns)
+                for rows in self.repository.stream_packages(
+                    empresa_id=parameter.empresa_id, batch_size=parameter.batch_size
+                ):
+                    encoder.write_rows(rows)
+                encoder.close()
+
+            return self._render_response(
+                True,
+                {
+                    "url": service.generate_presigned_url(
+                        parameter.bucket, key, parameter.expires_in
+                    ),
+                    "bucket": parameter.bucket,
+                    "key": key,
+                    "format": parameter.format,
+                    "rows": encoder.rows_written,
+                    "bytes": writer.bytes_written,
+                },
+            )
+        except:
+            self._print_exception()
+            return self._render_response(False, None)
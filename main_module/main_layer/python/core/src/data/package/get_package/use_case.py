@@ -2,7 +2,9 @@ from collections import namedtuple
 from core.src.domain.use_cases import GetPackageUseCaseInterface
 from core.src.infra.repo import PackageRepository
 
-GetPackageParameter = namedtuple("GetPackageParameter", "id empresa_id")
+GetPackageParameter = namedtuple(
+    "GetPackageParameter", "id empresa_id include", defaults=(None,)
+)
 
 
 class GetPackageUseCase(GetPackageUseCaseInterface):
@@ -21,9 +23,11 @@ class GetPackageUseCase(GetPackageUseCaseInterface):
 
         try:
             record = self.package_repository.get_package(
-                id=parameter.id, empresa_id=parameter.empresa_id
+                id=parameter.id,
+                empresa_id=parameter.empresa_id,
+                include=parameter.include,
             )
-            serialized_record = record._asdict()
+            serialized_record = record.to_dict()
             return self._render_response(True, serialized_record)
         except:
             return self._render_response(False, None)
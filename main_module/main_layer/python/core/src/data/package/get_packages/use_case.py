@@ -0,0 +1,34 @@
+from collections import namedtuple
+from core.src.domain.use_cases import GetPackagesUseCaseInterface
+from core.src.infra.repo import PackageRepository
+
+GetPackagesParameter = namedtuple("GetPackagesParameter", "ids empresa_id")
+
+
+class GetPackagesUseCase(GetPackagesUseCaseInterface):
+    """
+    Use case gateway for get many Package entities by ID in a single request
+    """
+
+    package_repository = PackageRepository()
+
+    def proceed(self, parameter: GetPackagesParameter) -> dict:
+        """
+        Proceed the execution of use case by calling database to retrieve entities by ID
+        :param  - parameter: An Interfaced object with required data
+        :return - A Dictionary with formated response of the request having 'success' and 'data'
+                    objects, 'data' having the found entities in the requested order and 'missing'
+                    the IDs that were not found
+        """
+
+        try:
+            records = self.package_repository.get_packages(
+                ids=parameter.ids, empresa_id=parameter.empresa_id
+            )
+            found = set(record.id for record in records)
+            missing = [id for id in dict.fromkeys(parameter.ids) if id not in found]
+            return self._render_response(
+                True, [record.to_dict() for record in records], missing=missing
+            )
+        except:
+            return self._render_response(False, None)
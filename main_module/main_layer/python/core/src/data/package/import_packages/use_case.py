@@ -0,0 +1,293 @@
+import csv
+import json
+import uuid
+from collections import namedtuple
+from itertools import islice
+from typing import Iterator, List, Tuple
+from core.src.domain.use_cases import ImportPackagesUseCaseInterface
+from core.src.infra.config import DatabaseRetryPolicy, UnitOfWork
+from core.src.infra.repo import PackageRepository
+from core.src.infra.services import S3Service
+
+ImportPackagesParameter = namedtuple(
+    "ImportPackagesParameter",
+    "empresa_id bucket key format job_id created_by region chunk_size reserve_seconds",
+    defaults=(None, "us-east-1", 1000, 60),
+)
+
+
+class ImportPackagesUseCase(ImportPackagesUseCaseInterface):
+    """
+    Use case gateway for import a CSV or NDJSON file of Packages from S3 in chunks.
+    The file is streamed record by record and each chunk is validated and created in its own
+    transaction before the next one is read, so memory is bounded by one chunk and reading
+    never runs ahead of the database. After each chunk a checkpoint with the byte offset of
+    the next line is saved next to the error reports, so an invocation that stops before the
+    Lambda deadline, or fails, resumes where the last chunk ended.
+    Package IDs are derived from the job and line number, so a chunk committed right before a
+    failure is detected on resume instead of created twice
+    """
+
+    repository = PackageRepository()
+
+    FORMATS = ("csv", "ndjson")
+
+    PACKAGE_SCHEMA = {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "title": "PackageImportSchema",
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "minLength": 1},
+                "symbol": {"type": ["string", "null"]},
+            },
+            "required": ["name"],
+        },
+    }
+
+    def proceed(self, parameter: ImportPackagesParameter) -> dict:
+        """
+        Proceed the execution of use case by importing chunks until the file ends or the
+        Lambda deadline is closer than reserve_seconds
+        :param  - parameter: An Interfaced object with required data, format being 'csv|ndjson'
+        :return - A Dictionary with formated response of the request having 'success' and 'data'
+                    objects, 'data' having the job checkpoint with 'done', 'rows', 'created',
+                    'failed' and the 'reports' key prefix of the per row error reports
+        """
+
+        try:
+            if parameter.format not in self.FORMATS:
+                raise ValueError("Unknown import format: {}".format(parameter.format))
+            if not parameter.key.startswith(self.uploads_prefix(parameter.empresa_id)):
+                raise ValueError(
+                    "Key outside the company uploads: {}".format(parameter.key)
+                )
+
+            service = S3Service(region=parameter.region)
+            prefix = self.reports_prefix(parameter.empresa_id, parameter.job_id)
+            checkpoint_key = prefix + "/checkpoint.json"
+            checkpoint = service.get_json(parameter.bucket, checkpoint_key) or {
+                "job_id": parameter.job_id,
+                "offset": 0,
+                "line": 0,
+                "header": None,
+                "rows": 0,
+                "created": 0,
+                "failed": 0,
+                "done": False,
+                "reports": prefix + "/errors/",
+            }
+
+            first_chunk = True
+            records = self.__read_records(service, parameter, checkpoint)
+            while not checkpoint["done"]:
+                if self.__out_of_time(parameter.reserve_seconds):
+                    break
+
+                chunk = list(islice(records, parameter.chunk_size))
+                if not chunk:
+                    checkpoint["done"] = True
+                else:
+                    errors = self.__import_chunk(parameter, chunk, first_chunk)
+                    first_chunk = False
+                    if errors:
+                        service.put_object(
+                            parameter.bucket,
+                            "{}{:010d}.ndjson".format(
+                                checkpoint["reports"], chunk[0][0]
+                            ),
+                            "".join(
+                                json.dumps(error, ensure_ascii=False) + "\n"
+                                for error in errors
+                            ).encode("utf-8"),
+                            "application/x-ndjson",
+                        )
+
+                    checkpoint["line"] = chunk[-1][0]
+                    checkpoint["offset"] = chunk[-1][1]
+                    checkpoint["rows"] += len(chunk)
+                    checkpoint["failed"] += len(errors)
+                    checkpoint["created"] += len(chunk) - len(errors)
+
+                service.put_object(
+                    parameter.bucket,
+                    checkpoint_key,
+                    json.dumps(checkpoint).encode("utf-8"),
+                    "application/json",
+                )
+
+            return self._render_response(True, checkpoint)
+        except:
+            self._print_exception()
+            return self._render_response(False, None)
+
+    @classmethod
+    def uploads_prefix(cls, empresa_id: str) -> str:
+        """
+        Build the key prefix of the files a company can import
+        :param  - empresa_id: ID of the Packages company
+        :return - The key prefix, with trailing slash
+        """
+
+        return "imports/{}/".format(empresa_id)
+
+    @classmethod
+    def reports_prefix(cls, empresa_id: str, job_id: str) -> str:
+        """
+        Build the key prefix of the checkpoint and error reports of an import job
+        :param  - empresa_id: ID of the Packages company
+                - job_id: ID of the import job
+        :return - The key prefix, without trailing slash
+        """
+
+        return "imports/{}/packages/{}".format(empresa_id, job_id)
+
+    def __import_chunk(
+        self, parameter: ImportPackagesParameter, chunk: List[Tuple], first_chunk: bool
+    ) -> List[dict]:
+        """
+        Validate and create the Packages of a chunk in a single transaction
+        :param  - parameter: The import parameter
+                - chunk: List of (line, next offset, item, parse error) tuples
+                - first_chunk: If the chunk is the first one of the invocation, which may have been
+                    committed by a previous invocation that failed before saving its checkpoint
+        :return - List of error reports of the chunk lines that were not created
+        """
+
+        items = [item for _, _, item, error in chunk if error is None]
+        validation = self.validate_schema_items("packages", items, self.PACKAGE_SCHEMA)
+        item_errors = {}
+        for error in validation.errors:
+            item_errors.setdefault(error["index"], []).append(
+                {"field": error["field"], "type": error["type"], "msg": error["msg"]}
+            )
+
+        reports = []
+        packages = []
+        item_index = 0
+        for line, _, item, error in chunk:
+            if error is not None:
+                reports.append({"line": line, "errors": [error]})
+                continue
+
+            if item_index in item_errors:
+                reports.append({"line": line, "errors": item_errors[item_index]})
+            else:
+                packages.append(
+                    dict(
+                        id=str(
+                            uuid.uuid5(
+                                uuid.NAMESPACE_URL,
+                                "{}/{}/{}".format(
+                                    parameter.empresa_id, parameter.job_id, line
+                                ),
+                            )
+                        ),
+                        name=item["name"],
+                        symbol=item.get("symbol"),
+                        empresa_id=parameter.empresa_id,
+                        created_by=parameter.created_by,
+                        updated_by=parameter.created_by,
+                    )
+                )
+            item_index += 1
+
+        if first_chunk and packages:
+            existing = self.repository.existing_package_ids(
+                [package["id"] for package in packages], parameter.empresa_id
+            )
+            packages = [
+                package for package in packages if package["id"] not in existing
+            ]
+
+        with UnitOfWork(empresa_id=parameter.empresa_id):
+            self.repository.create_packages(packages)
+
+        return reports
+
+    def __read_records(
+        self, service: S3Service, parameter: ImportPackagesParameter, checkpoint: dict
+    ) -> Iterator[Tuple]:
+        """
+        Parse the file records after the checkpoint offset, lazily. CSV records are read by a
+        single csv.reader over the file lines, so quoted values may span several lines
+        :param  - service: The S3 service
+                - parameter: The import parameter
+                - checkpoint: The job checkpoint, its header is set when the CSV header is read
+        :return - An iterator of (line, next offset, item, parse error) tuples, line being the
+                    1-based file line where the record ends and item None when the record cannot
+                    be parsed. Blank lines are skipped
+        """
+
+        position = {"offset": checkpoint["offset"], "line": checkpoint["line"]}
+        lines = self.__read_lines(service, parameter, position)
+        if parameter.format == "ndjson":
+            for text in lines:
+                if text.strip():
+                    yield (position["line"], position["offset"]) + self.__parse_json(
+                        text
+                    )
+            return
+
+        for values in csv.reader(lines):
+            if not values or (len(values) == 1 and not values[0].strip()):
+                continue
+
+            if checkpoint["header"] is None:
+                checkpoint["header"] = values
+                checkpoint["offset"] = position["offset"]
+                checkpoint["line"] = position["line"]
+                continue
+
+            yield (position["line"], position["offset"]) + self.__parse_values(
+                values, checkpoint["header"]
+            )
+
+    @classmethod
+    def __read_lines(
+        cls, service: S3Service, parameter: ImportPackagesParameter, position: dict
+    ) -> Iterator[str]:
+        """
+        Decode the file lines after an offset, keeping their line endings
+        :param  - service: The S3 service
+                - parameter: The import parameter
+                - position: Dictionary with the 'offset' and 'line' read so far, advanced past
+                    each yielded line
+        :return - An iterator of decoded lines
+        """
+
+        for raw_line in service.iter_object_lines(
+            parameter.bucket, parameter.key, start=position["offset"]
+        ):
+            position["offset"] += len(raw_line)
+            position["line"] += 1
+            yield raw_line.decode("utf-8-sig" if position["line"] == 1 else "utf-8")
+
+    @classmethod
+    def __parse_json(cls, text: str) -> Tuple:
+        try:
+            item = json.loads(text)
+            if not isinstance(item, dict):
+                raise ValueError("Line is not an object")
+        except ValueError as error:
+            return None, {"type": "invalid", "msg": str(error)}
+
+        return item, None
+
+    @classmethod
+    def __parse_values(cls, values: List[str], header: List[str]) -> Tuple:
+        if len(values) != len(header):
+            message = "Expected {} values, found {}".format(len(header), len(values))
+            return None, {"type": "invalid", "msg": message}
+
+        item = {
+            column: value if value != "" else None
+            for column, value in zip(header, values)
+        }
+        return item, None
+
+    @classmethod
+    def __out_of_time(cls, reserve_seconds: int) -> bool:
+        remaining = DatabaseRetryPolicy().remaining_seconds()
+        return remaining is not None and remaining < reserve_seconds
@@ -1,6 +1,10 @@
 from collections import namedtuple
 from core.src.domain.use_cases import ListPackagesUseCaseInterface
+from core.src.domain.use_cases.base_use_case import ValidateResponse
+from core.src.infra.config import UnitOfWork
+from core.src.infra.entities import Package as PackageModel
 from core.src.infra.repo import PackageRepository
+from core.src.infra.repo.package_repository import PackageStatements
 
 ListPackagesParameter = namedtuple(
     "ListPackageParam",
@@ -12,7 +16,11 @@ ListPackagesParameter = namedtuple(
         order
         page
         limit
+        cursor
+        fields
+        include
     """,
+    defaults=(None, None, None),
 )
 
 
@@ -22,6 +30,27 @@ class ListPackagesUseCase(ListPackagesUseCaseInterface):
     """
 
     repository = PackageRepository()
+    FIELDS = tuple(PackageModel.__table__.columns.keys())
+
+    @classmethod
+    def validate_fields(cls, fields: list) -> ValidateResponse:
+        """
+        Validates the requested fields against the Package columns that can be projected
+        :param  - fields: The requested field names
+        :return - A response object having operation result and an error for each unknown field
+        """
+
+        errors = [
+            {
+                "entity": "packages",
+                "field": "fields",
+                "type": "invalid",
+                "msg": "'{}' is not a Package field".format(field),
+            }
+            for field in fields or []
+            if field not in cls.FIELDS
+        ]
+        return ValidateResponse(success=(len(errors) == 0), errors=errors)
 
     def proceed(self, parameter: ListPackagesParameter) -> dict:
         """
@@ -34,21 +63,36 @@ class ListPackagesUseCase(ListPackagesUseCaseInterface):
         symbol: str = parameter.symbol if parameter.symbol is not None else ""
         column: str = parameter.column if parameter.column is not None else "created_at"
         order: str = parameter.order if parameter.order is not None else "desc"
+        fields: list = parameter.fields or []
+
+        fields_validate = self.validate_fields(fields)
+        if not fields_validate.success:
+            return self._render_response(False, [], errors=fields_validate.errors)
 
         try:
-            records = self.repository.select_packages(
-                empresa_id=parameter.empresa_id,
-                name=name,
-                symbol=symbol,
-                column=column,
-                order=order,
-                page=parameter.page,
-                limit=parameter.limit,
+            with UnitOfWork(read_only=True, empresa_id=parameter.empresa_id):
+                records, total_count = self.repository.select_packages_with_total(
+                    empresa_id=parameter.empresa_id,
+                    name=name,
+                    symbol=symbol,
+                    column=column,
+                    order=order,
+                    page=parameter.page,
+                    limit=parameter.limit,
+                    cursor=parameter.cursor,
+                    fields=fields,
+                    include=parameter.include,
+                )
+            next_cursor = (
+                self.repository.build_cursor(records[-1], column=column, order=order)
+                if len(records) == parameter.limit
+                else None
             )
-            total_count = self.repository.count_packages(
-                empresa_id=parameter.empresa_id, name=name, symbol=symbol
+            # Projected pages keep the ID and the order column that identify each row
+            projection = PackageStatements.projection(fields, column)
+            serialized_records = [record.to_dict(projection) for record in records]
+            return self._render_response(
+                True, serialized_records, total=total_count, next_cursor=next_cursor
             )
-            serialized_records = list(map(lambda item: item._asdict(), records))
-            return self._render_response(True, serialized_records, total=total_count)
         except:
             return self._render_response(False, [])
@@ -1 +1 @@
-from .package import Package
\ No newline at end of file
+from .package import Package, PackageRecord, PackageWriteResult
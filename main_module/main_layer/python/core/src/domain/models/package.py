@@ -3,3 +3,104 @@ from collections import namedtuple
 Package = namedtuple(
     "Package", "id name symbol created_at updated_at empresa_id created_by updated_by"
 )
+
+PackageWriteResult = namedtuple(
+    "PackageWriteResult", "index id success error package", defaults=(None, None)
+)
+
+
+class PackageRecord:
+    """
+    Compact read model of a Package, built straight from database rows without ORM entities.
+    It has the attributes of Package, datetimes being kept as loaded and converted to text
+    only when read, plus the products embedded when they are included
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "symbol",
+        "_created_at",
+        "_updated_at",
+        "empresa_id",
+        "created_by",
+        "updated_by",
+        "products",
+    )
+
+    _fields = Package._fields
+
+    def __init__(
+        self,
+        id: str = None,
+        name: str = None,
+        symbol: str = None,
+        created_at=None,
+        updated_at=None,
+        empresa_id: str = None,
+        created_by: str = None,
+        updated_by: str = None,
+        products: list = None,
+    ):
+        self.id = id
+        self.name = name
+        self.symbol = symbol
+        self._created_at = created_at
+        self._updated_at = updated_at
+        self.empresa_id = empresa_id
+        self.created_by = created_by
+        self.updated_by = updated_by
+        self.products = products
+
+    @property
+    def created_at(self) -> str:
+        return None if self._created_at is None else str(self._created_at)
+
+    @property
+    def updated_at(self) -> str:
+        return None if self._updated_at is None else str(self._updated_at)
+
+    @classmethod
+    def from_row(cls, row, columns=None) -> "PackageRecord":
+        """
+        Build a record from a row of Package columns
+        :param  - row: A row holding the columns first, extra trailing columns are ignored
+                - columns: (Optional) The column names of a projected row. Default is every
+                    Package column in table order, mapped by position
+        :return - A PackageRecord, with the columns that were not loaded as None
+        """
+
+        if columns is None:
+            return cls(*row[:8])
+
+        return cls(**dict(zip(columns, row)))
+
+    def to_dict(self, fields=None) -> dict:
+        """
+        Serialize the record into JSON compatible values, without intermediate copies
+        :param  - fields: (Optional) Attributes to keep. Default keeps every attribute
+        :return - A dictionary with the record attributes, embedded products only when loaded
+        """
+
+        serialized = {
+            field: getattr(self, field)
+            for field in fields or self._fields
+            if field != "products"
+        }
+        if self.products is not None:
+            serialized["products"] = self.products
+        return serialized
+
+    def _asdict(self) -> dict:
+        return self.to_dict()
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self._fields)
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, PackageRecord)):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return "PackageRecord(id={!r}, name={!r})".format(self.id, self.name)
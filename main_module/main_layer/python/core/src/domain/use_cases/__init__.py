@@ -5,6 +5,11 @@ from .package_interfaces import (
     CreatePackageUseCaseInterface,
     ListPackagesUseCaseInterface,
     GetPackageUseCaseInterface,
+    GetPackagesUseCaseInterface,
     UpdatePackageUseCaseInterface,
     DeletePackageUseCaseInterface,
+    BatchCreatePackagesUseCaseInterface,
+    BatchDeletePackagesUseCaseInterface,
+    ExportPackagesUseCaseInterface,
+    ImportPackagesUseCaseInterface,
 )
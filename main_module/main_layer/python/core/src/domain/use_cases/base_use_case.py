@@ -103,6 +103,45 @@ class BaseUseCaseInterface(ABC):
 
         return response
 
+    @classmethod
+    def validate_schema_items(
+        cls, type_name: str, items: list, schema: dict
+    ) -> ValidateResponse:
+        """
+        Validates a list of items in a single pass against an array json schema, keeping errors by item
+        :param  - type_name: The name of validated instances
+                - items: A list of dictionaries with attributes to validate
+                - schema: A dictionary with json schema of the array, having the item format in 'items'
+        :return - A response object having operation result and possible erros found, each error
+                    having the 'index' of its item, or None when the whole list is invalid
+        """
+
+        if schema is None:
+            raise Exception("EntityValidate", "<schema> not implemented")
+
+        errors = []
+        draft = jsonschema.Draft7Validator(schema)
+        for error in sorted(draft.iter_errors(items), key=str):
+            path = list(error.path)
+            if len(path) > 1:
+                field = path[-1]
+            elif "'" in error.message:
+                field = error.message.split("'")[1]
+            else:
+                field = None
+
+            errors.append(
+                {
+                    "entity": type_name,
+                    "index": path[0] if len(path) > 0 else None,
+                    "field": field,
+                    "type": "invalid",
+                    "msg": error.message,
+                }
+            )
+
+        return ValidateResponse(success=(len(errors) == 0), errors=errors)
+
     def convert_date_string_to_seconds(cls, date_string: str) -> int:
 
         date_string = str(date_string.replace("-03:00", ""))
@@ -29,3 +29,33 @@ class DeletePackageUseCaseInterface(BaseUseCaseInterface):
     """Interface to DeletePackageUseCase use case"""
 
     pass
+
+
+class BatchCreatePackagesUseCaseInterface(BaseUseCaseInterface):
+    """Interface to BatchCreatePackagesUseCase use case"""
+
+    pass
+
+
+class BatchDeletePackagesUseCaseInterface(BaseUseCaseInterface):
+    """Interface to BatchDeletePackagesUseCase use case"""
+
+    pass
+
+
+class ExportPackagesUseCaseInterface(BaseUseCaseInterface):
+    """Interface to ExportPackagesUseCase use case"""
+
+    pass
+
+
+class ImportPackagesUseCaseInterface(BaseUseCaseInterface):
+    """Interface to ImportPackagesUseCase use case"""
+
+    pass
+
+
+class GetPackagesUseCaseInterface(BaseUseCaseInterface):
+    """Interface to GetPackagesUseCase use case"""
+
+    pass
@@ -0,0 +1,6 @@
+from .backends import (
+    CacheBackend,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    CACHE_BACKENDS,
+)
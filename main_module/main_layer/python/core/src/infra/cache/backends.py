@@ -0,0 +1,149 @@
+import time
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+class CacheBackend:
+    """
+    Base class of shared cache backends, holding text values by key. Backends are shared by every
+    container reaching the same url, so a value written by one container is read by the others
+    """
+
+    scheme: str = None
+
+    def __init__(self, url: str):
+        """
+        Constructor that binds the backend to its server
+        :param  - url: The backend url, as 'redis://host:6379/0'
+        :return - None
+        """
+
+        self.url = url
+
+    def get_many(self, keys: Sequence[str]) -> List[str]:
+        """
+        Read many values with a single request
+        :param  - keys: The keys
+        :return - List of values in the order of keys, None for missing keys
+        """
+
+        raise Exception("Should implement method: get_many")
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """
+        Write a value that expires
+        :param  - key: The key
+                - value: The text value
+                - ttl: Seconds before the value expires
+        :return - None
+        """
+
+        raise Exception("Should implement method: set")
+
+    def incr(self, key: str) -> int:
+        """
+        Atomically increment a counter that never expires, a missing counter being 0
+        :param  - key: The counter key
+        :return - The incremented value
+        """
+
+        raise Exception("Should implement method: incr")
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process backend with the semantics of the Redis backend, used by tests and local runs.
+    Backends of the same url share their values, as containers sharing a server would
+    """
+
+    scheme = "memory"
+
+    _stores: Dict[str, Dict[str, Tuple[str, float]]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        with self._lock:
+            self.__store = self._stores.setdefault(url, {})
+
+    def get_many(self, keys: Sequence[str]) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            values = []
+            for key in keys:
+                entry = self.__store.get(key)
+                if entry is not None and entry[1] is not None and entry[1] <= now:
+                    del self.__store[key]
+                    entry = None
+                values.append(entry[0] if entry is not None else None)
+            return values
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self.__store[key] = (value, time.monotonic() + ttl)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self.__store.get(key)
+            value = int(entry[0]) + 1 if entry is not None else 1
+            self.__store[key] = (str(value), None)
+            return value
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drop the values of every memory backend, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            for store in cls._stores.values():
+                store.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis or any Redis compatible server, as ElastiCache or Valkey, requires the optional redis package"""
+
+    scheme = "redis"
+
+    def __init__(self, url: str, client=None):
+        """
+        Constructor that binds the backend to its server
+        :param  - url: The server url, as 'redis://host:6379/0' or 'rediss://' for TLS
+                - client: (Optional) A Redis compatible client. Default is built from url
+        :return - None
+        """
+
+        super().__init__(url)
+        if client is None:
+            if redis is None:
+                raise ImportError("The redis backend requires the redis package")
+            client = redis.Redis.from_url(
+                url, socket_timeout=0.25, socket_connect_timeout=0.25
+            )
+        self.client = client
+
+    def get_many(self, keys: Sequence[str]) -> List[str]:
+        return [
+            value.decode("utf-8") if isinstance(value, bytes) else value
+            for value in self.client.mget(list(keys))
+        ]
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+
+CACHE_BACKENDS = {
+    "memory": MemoryCacheBackend,
+    "redis": RedisCacheBackend,
+    "rediss": RedisCacheBackend,
+}
@@ -1,2 +1,13 @@
 from .db_base import Base
 from .db_config import DBConnectionHandler
+from .db_engine_registry import EngineRegistry
+from .db_unit_of_work import UnitOfWork
+from .db_drivers import (
+    DatabaseDriver,
+    AuroraDataApiDriver,
+    PostgresDriver,
+    SQLiteDriver,
+)
+from .db_batch import DataApiBatcher
+from .db_retry import DatabaseRetryPolicy
+from .db_shards import ShardMap, ShardTarget, TenantMovingError, tenant_shards
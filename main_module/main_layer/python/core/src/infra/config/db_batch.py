@@ -0,0 +1,83 @@
+from typing import Iterator, List, Sequence
+from .db_env import env_int
+
+
+class DataApiBatcher:
+    """
+    Splits executemany() parameter sets into Data API BatchExecuteStatement requests
+    that stay under the API request limits.
+    Environment:
+        - DATA_API_BATCH_SIZE: Maximum parameter sets per request (default 1000)
+        - DATA_API_BATCH_MAX_BYTES: Estimated maximum request size (default 3 MiB, the API limit is 4 MiB)
+    """
+
+    PARAMETER_OVERHEAD_BYTES = 48
+
+    @classmethod
+    def batch_size(cls) -> int:
+        return env_int("DATA_API_BATCH_SIZE", 1000)
+
+    @classmethod
+    def max_bytes(cls) -> int:
+        return env_int("DATA_API_BATCH_MAX_BYTES", 3145728)
+
+    @classmethod
+    def estimate_bytes(cls, parameters) -> int:
+        """
+        Estimate the serialized size of a single parameter set
+        :param  - parameters: A dictionary of named parameters or a sequence of positional ones
+        :return - Estimated size in bytes
+        """
+
+        if not isinstance(parameters, dict):
+            parameters = {str(index): value for index, value in enumerate(parameters)}
+
+        return sum(
+            cls.PARAMETER_OVERHEAD_BYTES + len(name) + len(str(value))
+            for name, value in parameters.items()
+        )
+
+    @classmethod
+    def chunk(cls, statement: str, parameters: Sequence) -> Iterator[List]:
+        """
+        Split parameter sets into chunks bounded by count and estimated request size
+        :param  - statement: The SQL statement sent with every chunk
+                - parameters: Sequence of parameter sets
+        :return - Iterator of parameter set chunks
+        """
+
+        batch_size = cls.batch_size()
+        max_bytes = cls.max_bytes() - len(statement)
+
+        chunk = []
+        chunk_bytes = 0
+        for parameter_set in parameters:
+            parameter_bytes = cls.estimate_bytes(parameter_set)
+            if chunk and (
+                len(chunk) >= batch_size or chunk_bytes + parameter_bytes > max_bytes
+            ):
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+
+            chunk.append(parameter_set)
+            chunk_bytes += parameter_bytes
+
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def do_executemany(cls, cursor, statement, parameters, context) -> bool:
+        """
+        Sqlalchemy do_executemany listener. Every chunk is sent by the Data API cursor
+        executemany(), which maps to a single BatchExecuteStatement request
+        :param  - cursor: The DBAPI cursor
+                - statement: The compiled statement
+                - parameters: Sequence of parameter sets
+                - context: The execution context
+        :return - True, so the default executemany is not invoked
+        """
+
+        for chunk in cls.chunk(statement, parameters):
+            cursor.executemany(statement, chunk)
+        return True
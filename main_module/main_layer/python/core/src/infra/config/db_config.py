@@ -1,36 +1,120 @@
 import os
-from sqlalchemy import create_engine, event
+import time
+from contextvars import ContextVar
+from typing import Dict, Hashable
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
+from .db_engine_registry import EngineRegistry
+from .db_env import env_int
+from .db_retry import DatabaseRetryPolicy
+from .db_shards import ShardMap, ShardTarget
+from .db_drivers import (
+    DatabaseDriver,
+    AuroraDataApiDriver,
+    PostgresDriver,
+    SQLiteDriver,
+)
 
 
 class DBConnectionHandler:
-    """Sqlalchemy database connection"""
+    """
+    Sqlalchemy database connection. The driver is selected by configuration:
+        - TEST_DATABASE_CONNECTION or an explicit connection string, by its scheme
+        - DATABASE_DRIVER=postgresql with DATABASE_URL, for a native driver behind a proxy
+        - Aurora Serverless Data API by default
+    Read-only handlers are routed to a reader target when one is configured
+    (TEST_DATABASE_READER_CONNECTION, DATABASE_READER_URL or AURORA_READER_CLUSTER_ARN),
+    except during DATABASE_READ_YOUR_WRITES_SECONDS (default 5) after a write in this container.
+    Data API targets idle for AURORA_AUTO_PAUSE_SECONDS (default 300) are pinged before use,
+    retrying while Aurora Serverless resumes from auto-pause.
+    Sessions keep loaded attributes on commit (expire_on_commit=False), so results read before
+    a commit never trigger a refresh SELECT.
+    Handlers opened with an empresa_id are routed to the shard of the company when ShardMap is
+    configured, and refuse writes while the company is locked by a move between shards.
+    Once entered, on_reader tells if the session is bound to the reader target
+    """
 
-    def __init__(self, connection_string: str = None):
+    _session_factory = sessionmaker(expire_on_commit=False)
+    _current_unit_of_work: ContextVar = ContextVar("current_unit_of_work", default=None)
+    _last_write_at: float = None
+    _last_activity_at: Dict[Hashable, float] = {}
+
+    def __init__(
+        self,
+        connection_string: str = None,
+        read_only: bool = False,
+        empresa_id: str = None,
+    ):
 
         self.log_enabled = os.getenv("LOG_AURORA") == "ENABLED"
         self.cluster_arn = os.getenv("AURORA_CLUSTER_ARN")
         self.secret_arn = os.getenv("AURORA_SECRET_ARN")
         self.database_name = os.getenv("AURORA_DATABASE_NAME")
+        self.reader_cluster_arn = os.getenv("AURORA_READER_CLUSTER_ARN")
+        self.read_only = read_only
         self.__connection_string = "postgresql+auroradataapi://:@/{}".format(
             self.database_name
         )
+        self.__reader_connection_string = None
+
+        self.driver_name = os.getenv("DATABASE_DRIVER")
+        if self.driver_name == PostgresDriver.name:
+            self.__connection_string = os.getenv("DATABASE_URL")
+            self.__reader_connection_string = os.getenv("DATABASE_READER_URL")
 
         if self.___has_test_database_environment():
             self.__connection_string = os.getenv("TEST_DATABASE_CONNECTION")
+            self.__reader_connection_string = os.getenv(
+                "TEST_DATABASE_READER_CONNECTION"
+            )
 
         if connection_string is not None:
             self.__connection_string = connection_string
+            self.__reader_connection_string = None
+
+        self.empresa_id = empresa_id
+        self.shard: str = None
+        if connection_string is None and empresa_id is not None:
+            target = ShardMap.resolve(empresa_id)
+            if target is not None:
+                self.__use_shard(target)
 
         self.session: sessionmaker = None
+        self.unit_of_work = None
+        self.on_reader = False
+        self.__driver_key = None
 
-    def ___is_aurora_serverless_available(self) -> bool:
-        """Returna Se banco de dados aurora esta disponível
-        :parram - None
-        :return - bool: Se banco de dados aurora esta disponível
+    @classmethod
+    def for_shard(cls, shard: str, read_only: bool = False) -> "DBConnectionHandler":
+        """Build a handler of a shard by name, used by tools working on a shard as a whole
+        :parram - shard: The shard name
+                - read_only: (Optional) If the handler may use the shard reader. Default is False
+        :return - The handler, not entered yet
         """
 
-        return self.cluster_arn is not None and self.secret_arn is not None
+        handler = cls(read_only=read_only)
+        handler.__use_shard(ShardMap.target(shard))
+        return handler
+
+    def __use_shard(self, target: ShardTarget) -> None:
+        """Point the handler to the primary and reader of a shard
+        :parram - target: The shard target
+        :return - None
+        """
+
+        self.shard = target.name
+        if target.url:
+            self.__connection_string = target.url
+            self.__reader_connection_string = target.reader_url
+            return
+
+        self.cluster_arn = target.cluster_arn
+        self.reader_cluster_arn = target.reader_cluster_arn
+        self.database_name = target.database_name or self.database_name
+        self.__connection_string = "postgresql+auroradataapi://:@/{}".format(
+            self.database_name
+        )
+        self.__reader_connection_string = None
 
     def ___has_test_database_environment(self) -> bool:
         """Retorna se existe variavel de ambiente para banco de dados para testes
@@ -41,36 +125,221 @@ class DBConnectionHandler:
         env_var_name = "TEST_DATABASE_CONNECTION"
         return os.getenv(env_var_name) is not None and os.getenv(env_var_name)
 
+    def has_reader(self) -> bool:
+        """Return if a reader target is configured
+        :parram - None
+        :return - bool: If read-only traffic can be routed to a reader
+        """
+
+        if self.__connection_string.startswith("postgresql+auroradataapi"):
+            return bool(self.reader_cluster_arn)
+        return bool(self.__reader_connection_string)
+
+    @classmethod
+    def record_write(cls) -> None:
+        """Start the read-your-writes window, pinning reads of this container to the primary
+        :parram - None
+        :return - None
+        """
+
+        DBConnectionHandler._last_write_at = time.monotonic()
+
+    @classmethod
+    def in_read_your_writes_window(cls) -> bool:
+        """Return if a write of this container is recent enough to pin reads to the primary
+        :parram - None
+        :return - bool: If reads must go to the primary
+        """
+
+        last_write_at = DBConnectionHandler._last_write_at
+        if last_write_at is None:
+            return False
+
+        window = env_int("DATABASE_READ_YOUR_WRITES_SECONDS", 5)
+        return time.monotonic() - last_write_at < window
+
+    def routes_to_reader(self) -> bool:
+        """Return if this handler uses the reader target
+        :parram - None
+        :return - bool: If the session is bound to the reader
+        """
+
+        return (
+            self.read_only
+            and self.has_reader()
+            and not self.in_read_your_writes_window()
+        )
+
+    def get_driver(self, reader: bool = None) -> DatabaseDriver:
+        """Return the database driver of the primary, or of the reader for routed read-only handlers
+        :parram - reader: (Optional) If the reader target is used. Default is routes_to_reader()
+        :return - The driver that builds the engine
+        """
+
+        if reader is None:
+            reader = self.routes_to_reader()
+
+        if reader:
+            if self.__connection_string.startswith("postgresql+auroradataapi"):
+                return self.__build_driver(
+                    self.__connection_string, self.reader_cluster_arn
+                )
+            return self.__build_driver(
+                self.__reader_connection_string, self.cluster_arn
+            )
+
+        return self.__build_driver(self.__connection_string, self.cluster_arn)
+
+    def __build_driver(
+        self, connection_string: str, cluster_arn: str
+    ) -> DatabaseDriver:
+        """Return the database driver matching the connection string
+        :parram - connection_string: The target connection string
+                - cluster_arn: The Aurora cluster used by the Data API driver
+        :return - The driver that builds the engine
+        """
+
+        if self.driver_name == PostgresDriver.name:
+            return PostgresDriver(connection_string, self.log_enabled)
+
+        if connection_string.startswith("sqlite"):
+            return SQLiteDriver(connection_string, self.log_enabled)
+
+        if connection_string.startswith("postgresql+auroradataapi"):
+            return AuroraDataApiDriver(
+                self.database_name,
+                cluster_arn,
+                self.secret_arn,
+                log_enabled=self.log_enabled,
+                connection_string=connection_string,
+            )
+
+        return PostgresDriver(connection_string, self.log_enabled)
+
     def get_engine(self):
-        """Return connection Engine
+        """Return connection Engine shared by every handler with the same connection settings
         :parram - None
         :return - engine connection to Database
         """
 
-        if self.___is_aurora_serverless_available():
-            return create_engine(
-                self.__connection_string,
-                echo=self.log_enabled,
-                connect_args=dict(
-                    aurora_cluster_arn=self.cluster_arn, secret_arn=self.secret_arn
-                ),
-            )
+        return self.get_driver().get_engine()
+
+    @classmethod
+    def dispose_engines(cls) -> None:
+        """Dispose every shared engine so the next handler creates new ones, mainly used by tests
+        :parram - None
+        :return - None
+        """
+
+        EngineRegistry.reset()
+
+    @property
+    def joined(self) -> bool:
+        """Return if this handler joined the session of an active UnitOfWork
+        :parram - None
+        :return - bool: If the session belongs to a UnitOfWork
+        """
+
+        return self.unit_of_work is not None
+
+    def commit(self) -> None:
+        """Commit the session, or only flush it when joined to a UnitOfWork that commits on exit
+        :parram - None
+        :return - None
+        """
+
+        if self.joined:
+            self.session.flush()
+        else:
+            self.session.commit()
+
+        if not self.read_only:
+            self.record_write()
 
-        return self._create_engine_sqlite()
+    def rollback(self) -> None:
+        """Rollback the session, or mark the joined UnitOfWork to rollback on exit
+        :parram - None
+        :return - None
+        """
 
-    def _create_engine_sqlite(self):
-        engine = create_engine(self.__connection_string, echo=self.log_enabled)
-        event.listen(engine, "connect", self._fk_pragma_on_connect)
-        return engine
+        if self.joined:
+            self.unit_of_work.rollback_only = True
+        else:
+            self.session.rollback()
+
+    def close(self) -> None:
+        """Close the session unless it belongs to a UnitOfWork
+        :parram - None
+        :return - None
+        """
+
+        if not self.joined:
+            self.session.close()
+
+    def needs_warm_up(self, driver: DatabaseDriver) -> bool:
+        """Return if the Data API target was idle long enough to be auto-paused
+        :parram - driver: The driver of the target database
+        :return - bool: If the target must be pinged before use
+        """
+
+        if not isinstance(driver, AuroraDataApiDriver):
+            return False
+
+        last_activity_at = self._last_activity_at.get(driver.registry_key())
+        if last_activity_at is None:
+            return True
+
+        idle_seconds = env_int("AURORA_AUTO_PAUSE_SECONDS", 300)
+        return time.monotonic() - last_activity_at >= idle_seconds
+
+    def ping(self) -> bool:
+        """Run a cheap statement on the target database, retrying while Aurora Serverless resumes.
+        Schedulers may call it to keep the cluster warm
+        :param  - None
+        :return - bool: True once the database answered
+        """
+
+        return self.__ping(self.get_driver())
+
+    def __ping(self, driver: DatabaseDriver) -> bool:
+        engine = driver.get_engine()
+
+        def execute():
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+        DatabaseRetryPolicy().call(execute)
+        self._last_activity_at[driver.registry_key()] = time.monotonic()
+        return True
 
     def __enter__(self):
-        engine = self.get_engine()
-        session_maker = sessionmaker()
-        self.session = session_maker(bind=engine)
+        if not self.read_only and self.empresa_id is not None:
+            ShardMap.check_writable([self.empresa_id])
+
+        unit_of_work = self._current_unit_of_work.get()
+        if unit_of_work is not None:
+            if unit_of_work.shard != self.shard:
+                raise ValueError(
+                    "A UnitOfWork of shard {} cannot be joined by shard {}".format(
+                        unit_of_work.shard, self.shard
+                    )
+                )
+            self.unit_of_work = unit_of_work
+            self.session = unit_of_work.session
+            self.on_reader = unit_of_work.on_reader
+            return self
+
+        # Kept for the session lifetime, the read-your-writes window may start or end meanwhile
+        self.on_reader = self.routes_to_reader()
+        driver = self.get_driver(self.on_reader)
+        if self.needs_warm_up(driver):
+            self.__ping(driver)
+
+        self.__driver_key = driver.registry_key()
+        self.session = self._session_factory(bind=driver.get_engine())
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.session.close()  # pylint: disable=no-member
-
-    def _fk_pragma_on_connect(self, dbapi_con, con_record):
-        dbapi_con.execute("pragma foreign_keys=ON")
+        self.close()
+        if exc_type is None and self.__driver_key is not None:
+            self._last_activity_at[self.__driver_key] = time.monotonic()
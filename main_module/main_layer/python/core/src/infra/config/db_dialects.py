@@ -0,0 +1,13 @@
+from sqlalchemy.dialects import registry
+
+AuroraDataApiDialect = registry.load("postgresql.auroradataapi")
+
+
+class CachingAuroraDataApiDialect(AuroraDataApiDialect):
+    """
+    The Data API dialect predates Sqlalchemy 1.4 and does not declare supports_statement_cache,
+    which disables compiled SQL caching for its engines. Its compiler adds no uncacheable state,
+    so this subclass declares the flag without changing the library class
+    """
+
+    supports_statement_cache = True
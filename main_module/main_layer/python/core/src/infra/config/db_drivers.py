@@ -0,0 +1,252 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Hashable
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import registry
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+from .db_engine_registry import EngineRegistry
+from .db_env import env_int, env_flag
+from .db_batch import DataApiBatcher
+
+registry.register(
+    "postgresql.auroradataapi_caching",
+    __package__ + ".db_dialects",
+    "CachingAuroraDataApiDialect",
+)
+
+
+class DatabaseDriver(ABC):
+    """Base class of database drivers, responsible for building and configuring engines"""
+
+    name: str = None
+
+    def __init__(self, connection_string: str, log_enabled: bool = False):
+        self.connection_string = connection_string
+        self.log_enabled = log_enabled
+
+    @abstractmethod
+    def engine_options(self) -> dict:
+        """
+        Return the keyword arguments given to sqlalchemy create_engine
+        :param  - None
+        :return - A dictionary with engine options
+        """
+
+        raise Exception("Should implement method: engine_options")
+
+    def configure_engine(self, engine: Engine) -> None:
+        """
+        Hook to attach listeners on a newly created engine
+        :param  - engine: The created engine
+        :return - None
+        """
+
+    def create_engine(self) -> Engine:
+        """
+        Create and configure a new engine
+        :param  - None
+        :return - A new engine
+        """
+
+        engine = create_engine(self.connection_string, **self.engine_options())
+        self.configure_engine(engine)
+        return engine
+
+    def registry_key(self) -> Hashable:
+        """
+        Return the key of this driver engine in EngineRegistry
+        :param  - None
+        :return - A hashable key
+        """
+
+        return EngineRegistry.build_key(
+            self.connection_string, driver=self.name, **self.engine_options()
+        )
+
+    def get_engine(self) -> Engine:
+        """
+        Return the process-wide engine of this driver, creating it on first use
+        :param  - None
+        :return - A shared engine
+        """
+
+        return EngineRegistry.get_engine(self.registry_key(), self.create_engine)
+
+
+class AuroraDataApiDriver(DatabaseDriver):
+    """Aurora Serverless Data API driver, one HTTPS request per statement"""
+
+    name = "auroradataapi"
+
+    def __init__(
+        self,
+        database_name: str,
+        cluster_arn: str,
+        secret_arn: str,
+        log_enabled: bool = False,
+        connection_string: str = None,
+    ):
+        super().__init__(
+            connection_string
+            or "postgresql+auroradataapi://:@/{}".format(database_name),
+            log_enabled,
+        )
+        self.cluster_arn = cluster_arn
+        self.secret_arn = secret_arn
+
+    def engine_options(self) -> dict:
+        return dict(
+            echo=self.log_enabled,
+            connect_args=dict(
+                aurora_cluster_arn=self.cluster_arn, secret_arn=self.secret_arn
+            ),
+        )
+
+    def create_engine(self) -> Engine:
+        # Engines use the dialect subclass that declares supports_statement_cache
+        url = make_url(self.connection_string)
+        if url.drivername == "postgresql+auroradataapi":
+            url = url.set(drivername="postgresql+auroradataapi_caching")
+
+        engine = create_engine(url, **self.engine_options())
+        self.configure_engine(engine)
+        return engine
+
+    def configure_engine(self, engine: Engine) -> None:
+        event.listen(engine, "do_executemany", DataApiBatcher.do_executemany)
+
+
+class PostgresDriver(DatabaseDriver):
+    """
+    Native PostgreSQL driver with a tuned connection pool, used to reach the cluster directly or through RDS Proxy.
+    Environment:
+        - DATABASE_POOL: 'queue' (default) or 'null' to open a connection per checkout
+        - DATABASE_POOL_SIZE: Connections kept open per container (default 1)
+        - DATABASE_MAX_CONNECTIONS: Connection budget per container, overflow included (default DATABASE_POOL_SIZE)
+        - DATABASE_POOL_TIMEOUT: Seconds waiting for a connection when the budget is exhausted (default 10)
+        - DATABASE_POOL_RECYCLE: Seconds before a connection is replaced (default 300)
+        - DATABASE_POOL_PRE_PING: ENABLED|DISABLED liveness check on checkout (default ENABLED)
+    """
+
+    name = "postgresql"
+
+    def __init__(self, connection_string: str, log_enabled: bool = False):
+        super().__init__(connection_string, log_enabled)
+        self.pool = os.getenv("DATABASE_POOL") or "queue"
+        self.pool_size = env_int("DATABASE_POOL_SIZE", 1)
+        self.max_connections = max(
+            env_int("DATABASE_MAX_CONNECTIONS", self.pool_size), self.pool_size
+        )
+        self.pool_timeout = env_int("DATABASE_POOL_TIMEOUT", 10)
+        self.pool_recycle = env_int("DATABASE_POOL_RECYCLE", 300)
+        self.pool_pre_ping = env_flag("DATABASE_POOL_PRE_PING", True)
+
+    def engine_options(self) -> dict:
+        if self.pool == "null":
+            return dict(
+                echo=self.log_enabled,
+                poolclass=NullPool,
+                pool_pre_ping=self.pool_pre_ping,
+            )
+
+        return dict(
+            echo=self.log_enabled,
+            poolclass=QueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_connections - self.pool_size,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+        )
+
+
+class SQLiteDriver(DatabaseDriver):
+    """
+    SQLite driver used by local runs, tests and edge deployments.
+    Environment:
+        - SQLITE_PROFILE: 'performance' (default) applies WAL journaling and tuned pragmas, 'safe' only enables foreign keys
+        - SQLITE_MMAP_SIZE: Bytes of the database file mapped in memory (default 256 MiB)
+        - SQLITE_CACHE_SIZE: Page cache size, negative values are KiB (default -65536, 64 MiB)
+        - SQLITE_BUSY_TIMEOUT: Milliseconds a writer waits for a lock (default 5000)
+        - SQLITE_POOL_SIZE: Connections kept open for file databases (default 5)
+    """
+
+    name = "sqlite"
+
+    def __init__(self, connection_string: str, log_enabled: bool = False):
+        super().__init__(connection_string, log_enabled)
+        self.profile = os.getenv("SQLITE_PROFILE") or "performance"
+        self.mmap_size = env_int("SQLITE_MMAP_SIZE", 268435456)
+        self.cache_size = env_int("SQLITE_CACHE_SIZE", -65536)
+        self.busy_timeout = env_int("SQLITE_BUSY_TIMEOUT", 5000)
+        self.pool_size = env_int("SQLITE_POOL_SIZE", 5)
+
+    def is_memory_database(self) -> bool:
+        """
+        Return if the connection string targets an in-memory database
+        :param  - None
+        :return - If the database lives in memory
+        """
+
+        database = self.connection_string.split("://", 1)[-1].lstrip("/")
+        return database in ("", ":memory:") or "mode=memory" in database
+
+    def pragmas(self) -> list:
+        """
+        Return the pragmas applied on every new connection
+        :param  - None
+        :return - List of pragma statements
+        """
+
+        pragmas = ["pragma foreign_keys=ON"]
+        if self.profile != "performance":
+            return pragmas
+
+        if not self.is_memory_database():
+            pragmas.append("pragma journal_mode=WAL")
+            pragmas.append("pragma mmap_size={}".format(self.mmap_size))
+
+        pragmas.append("pragma synchronous=NORMAL")
+        pragmas.append("pragma cache_size={}".format(self.cache_size))
+        pragmas.append("pragma temp_store=MEMORY")
+        pragmas.append("pragma busy_timeout={}".format(self.busy_timeout))
+        return pragmas
+
+    def engine_options(self) -> dict:
+        if self.profile != "performance":
+            return dict(echo=self.log_enabled)
+
+        if self.is_memory_database():
+            return dict(
+                echo=self.log_enabled,
+                poolclass=StaticPool,
+                connect_args=dict(check_same_thread=False),
+            )
+
+        return dict(
+            echo=self.log_enabled,
+            poolclass=QueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.pool_size,
+            connect_args=dict(check_same_thread=False),
+        )
+
+    def registry_key(self) -> Hashable:
+        return EngineRegistry.build_key(
+            self.connection_string,
+            driver=self.name,
+            pragmas=self.pragmas(),
+            **self.engine_options()
+        )
+
+    def configure_engine(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self._pragmas_on_connect)
+
+    def _pragmas_on_connect(self, dbapi_con, con_record):
+        cursor = dbapi_con.cursor()
+        try:
+            for pragma in self.pragmas():
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -0,0 +1,119 @@
+import threading
+from typing import Callable, Dict, Hashable, List
+from sqlalchemy.engine import Engine
+
+
+class EngineRegistry:
+    """Process-wide registry of Sqlalchemy engines, shared by warm Lambda invocations and threads"""
+
+    _engines: Dict[Hashable, Engine] = {}
+    _create_hooks: List[Callable[[Engine], None]] = []
+    _lock = threading.Lock()
+
+    @classmethod
+    def build_key(cls, connection_string: str, **engine_options) -> Hashable:
+        """
+        Build the registry key of an engine
+        :param  - connection_string: The database connection string
+                - engine_options: Driver and engine arguments used to create the engine
+        :return - A hashable key identifying the engine
+        """
+
+        return (connection_string, cls.__freeze(engine_options))
+
+    @classmethod
+    def get_engine(cls, key: Hashable, factory: Callable[[], Engine]) -> Engine:
+        """
+        Return the engine registered by key, creating it with factory only once per process
+        :param  - key: A key built by build_key()
+                - factory: A callable without arguments that creates the engine
+        :return - The shared engine
+        """
+
+        engine = cls._engines.get(key)
+        if engine is not None:
+            return engine
+
+        with cls._lock:
+            engine = cls._engines.get(key)
+            if engine is None:
+                engine = factory()
+                for hook in cls._create_hooks:
+                    hook(engine)
+                cls._engines[key] = engine
+
+        return engine
+
+    @classmethod
+    def on_create(cls, hook: Callable[[Engine], None]) -> None:
+        """
+        Register a function called with every engine created from now on, to attach listeners
+        :param  - hook: A callable receiving the created engine
+        :return - None
+        """
+
+        with cls._lock:
+            cls._create_hooks.append(hook)
+
+    @classmethod
+    def dispose(cls, key: Hashable) -> bool:
+        """
+        Dispose and unregister a single engine
+        :param  - key: A key built by build_key()
+        :return - If an engine was registered by key
+        """
+
+        with cls._lock:
+            engine = cls._engines.pop(key, None)
+
+        if engine is None:
+            return False
+
+        engine.dispose()
+        return True
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Dispose and unregister every engine, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            engines = list(cls._engines.values())
+            cls._engines.clear()
+
+        for engine in engines:
+            engine.dispose()
+
+    @classmethod
+    def size(cls) -> int:
+        """
+        Return the count of registered engines
+        :param  - None
+        :return - Count of registered engines
+        """
+
+        return len(cls._engines)
+
+    @classmethod
+    def __freeze(cls, value: any) -> Hashable:
+        """
+        Transform nested dicts and lists into hashable tuples
+        :param  - value: Any engine argument value
+        :return - A hashable representation of value
+        """
+
+        if isinstance(value, dict):
+            return tuple(
+                sorted(
+                    ((key, cls.__freeze(item)) for key, item in value.items()),
+                    key=lambda pair: str(pair[0]),
+                )
+            )
+        if isinstance(value, (list, tuple, set)):
+            return tuple(cls.__freeze(item) for item in value)
+        if isinstance(value, Hashable):
+            return value
+        return repr(value)
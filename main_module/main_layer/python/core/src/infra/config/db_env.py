@@ -0,0 +1,25 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """
+    Read an integer environment variable
+    :param  - name: Name of the environment variable
+            - default: Value used when the variable is not set or empty
+    :return - The integer value
+    """
+
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_flag(name: str, default: bool) -> bool:
+    """
+    Read an ENABLED/DISABLED environment variable
+    :param  - name: Name of the environment variable
+            - default: Value used when the variable is not set or empty
+    :return - If the flag is enabled
+    """
+
+    value = os.getenv(name)
+    return value == "ENABLED" if value else default
@@ -0,0 +1,165 @@
+import time
+import random
+import functools
+from contextvars import ContextVar, Token
+from typing import Callable, TypeVar
+from .db_env import env_int
+
+T = TypeVar("T")
+
+
+class DatabaseRetryPolicy:
+    """
+    Jittered exponential backoff for errors raised while Aurora Serverless resumes from
+    auto-pause. A resume takes tens of seconds, so retries are bounded by time rather than by a
+    count: they go on until the Lambda deadline minus a margin, or for
+    DATABASE_RETRY_TIMEOUT_SECONDS outside Lambda, and the last sleep ends within that time.
+    The deadline belongs to the invocation that bound it: handlers decorated with
+    with_lambda_deadline() unbind it when they return, so warm containers never reuse it.
+    The policy wraps the warm-up ping DBConnectionHandler runs before the first statement on a
+    target idle for AURORA_AUTO_PAUSE_SECONDS, and ping() itself. Statements themselves are not
+    retried, a session cannot replay the statements that ran before the failing one.
+    Environment:
+        - DATABASE_RETRY_BASE_MS: Backoff of the first retry (default 250)
+        - DATABASE_RETRY_MAX_MS: Maximum backoff of a single retry (default 8000)
+        - DATABASE_RETRY_DEADLINE_MARGIN_MS: Time kept free before the Lambda deadline
+            (default 2000)
+        - DATABASE_RETRY_TIMEOUT_SECONDS: Time spent retrying without a Lambda deadline
+            (default 60)
+    """
+
+    RESUMING_ERROR_NAMES = ("DatabaseResumingException",)
+    RESUMING_ERROR_MESSAGES = (
+        "is resuming after being auto-paused",
+        "communications link failure",
+        "databaseresumingexception",
+    )
+
+    _deadline: ContextVar = ContextVar("database_retry_deadline", default=None)
+
+    def __init__(
+        self,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sleep = sleep
+        self.jitter = jitter
+        self.clock = clock
+        self.base_ms = env_int("DATABASE_RETRY_BASE_MS", 250)
+        self.max_ms = env_int("DATABASE_RETRY_MAX_MS", 8000)
+        self.deadline_margin_ms = env_int("DATABASE_RETRY_DEADLINE_MARGIN_MS", 2000)
+        self.timeout_seconds = env_int("DATABASE_RETRY_TIMEOUT_SECONDS", 60)
+
+    @classmethod
+    def bind_lambda_context(cls, context) -> Token:
+        """
+        Record the deadline of the current Lambda invocation in the current context
+        :param  - context: The Lambda context object, or None outside Lambda
+        :return - The token restoring the previous deadline with unbind()
+        """
+
+        if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+            return cls._deadline.set(None)
+
+        return cls._deadline.set(
+            time.monotonic() + context.get_remaining_time_in_millis() / 1000
+        )
+
+    @classmethod
+    def unbind(cls, token: Token) -> None:
+        """
+        Restore the deadline bound before bind_lambda_context()
+        :param  - token: The token returned by bind_lambda_context()
+        :return - None
+        """
+
+        cls._deadline.reset(token)
+
+    @classmethod
+    def with_lambda_deadline(cls, handler: Callable) -> Callable:
+        """
+        Decorate a Lambda handler so each invocation binds its own deadline and unbinds it on return
+        :param  - handler: The handler, receiving event and context
+        :return - The decorated handler
+        """
+
+        @functools.wraps(handler)
+        def bound_handler(event, context):
+            token = cls.bind_lambda_context(context)
+            try:
+                return handler(event, context)
+            finally:
+                cls.unbind(token)
+
+        return bound_handler
+
+    @classmethod
+    def is_resuming_error(cls, error: BaseException) -> bool:
+        """
+        Return if the error, or any error in its chain, is raised by a resuming Aurora Serverless
+        :param  - error: The raised exception
+        :return - If the operation can be retried once the database resumes
+        """
+
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            if type(error).__name__ in cls.RESUMING_ERROR_NAMES:
+                return True
+
+            message = str(error).lower()
+            if any(text in message for text in cls.RESUMING_ERROR_MESSAGES):
+                return True
+
+            error = getattr(error, "orig", None) or error.__cause__ or error.__context__
+
+        return False
+
+    def remaining_seconds(self) -> float:
+        """
+        Return the seconds available for sleeping before the Lambda deadline
+        :param  - None
+        :return - Available seconds, or None when no deadline is bound
+        """
+
+        deadline = self._deadline.get()
+        if deadline is None:
+            return None
+
+        return deadline - self.clock() - self.deadline_margin_ms / 1000
+
+    def backoff_seconds(self, retry: int) -> float:
+        """
+        Return the jittered backoff of a retry ("full jitter")
+        :param  - retry: The retry number, starting at 0
+        :return - Seconds to sleep
+        """
+
+        ceiling = min(self.max_ms, self.base_ms * (2 ** retry))
+        return ceiling * self.jitter() / 1000
+
+    def call(self, operation: Callable[[], T]) -> T:
+        """
+        Invoke operation, retrying it while the database is resuming
+        :param  - operation: A callable without arguments
+        :return - The operation result
+        """
+
+        timeout = self.clock() + self.timeout_seconds
+        retry = 0
+        while True:
+            try:
+                return operation()
+            except Exception as error:
+                if not self.is_resuming_error(error):
+                    raise
+
+                remaining = self.remaining_seconds()
+                if remaining is None:
+                    remaining = timeout - self.clock()
+                if remaining <= 0:
+                    raise
+
+                self.sleep(min(self.backoff_seconds(retry), remaining))
+                retry += 1
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import bisect
+import hashlib
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import Column, DateTime, String, Table, delete, select
+from .db_base import Base
+from .db_env import env_int
+
+tenant_shards = Table(
+    "tenant_shards",
+    Base.metadata,
+    Column("empresa_id", String(36), primary_key=True),
+    Column("shard", String(64), nullable=False),
+    Column("state", String(16), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+ShardTarget = namedtuple(
+    "ShardTarget",
+    "name url reader_url cluster_arn reader_cluster_arn database_name weight",
+    defaults=(None, None, None, None, None, 1),
+)
+
+
+class TenantMovingError(Exception):
+    """Raised on writes of a company locked while it moves between shards, retry after the move"""
+
+
+class ShardMap:
+    """
+    Routes each company to one of several database targets. A company is placed by a consistent
+    hash ring of the shard names, unless the static overrides or the 'tenant_shards' directory
+    table pin it to a shard. The directory is written by TenantMover and read from the primary of
+    the default target outside any UnitOfWork, it is cached per container for
+    DATABASE_SHARD_MAP_TTL_SECONDS.
+    Sharding is disabled, and every handler uses the default target, unless DATABASE_SHARDS is set.
+    Environment:
+        - DATABASE_SHARDS: JSON with 'shards' by name, each having 'url' and optional 'reader_url',
+            or 'cluster_arn' with optional 'reader_cluster_arn' and 'database_name' for the Data API,
+            and an optional 'weight'. Optional 'overrides' maps company IDs to shard names and
+            'vnodes' sets the ring points per unit of weight (default 64)
+        - DATABASE_SHARD_MAP_TTL_SECONDS: Seconds the directory is cached (default 30)
+    """
+
+    ACTIVE = "active"
+    LOCKED = "locked"
+
+    _source: str = None
+    _shards: Dict[str, ShardTarget] = {}
+    _overrides: Dict[str, str] = {}
+    _ring_keys: List[int] = []
+    _ring_shards: List[str] = []
+    _directory: Dict[str, Tuple[str, str]] = {}
+    _directory_loaded_at: float = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """
+        Return if a shard map is configured
+        :param  - None
+        :return - bool: If companies are routed to shards
+        """
+
+        cls.__load_config()
+        return bool(cls._shards)
+
+    @classmethod
+    def shards(cls) -> Dict[str, ShardTarget]:
+        """
+        Return the configured shards
+        :param  - None
+        :return - Dictionary of targets by shard name
+        """
+
+        cls.__load_config()
+        return dict(cls._shards)
+
+    @classmethod
+    def target(cls, shard: str) -> ShardTarget:
+        """
+        Return a configured shard
+        :param  - shard: The shard name
+        :return - The shard target
+        """
+
+        cls.__load_config()
+        if shard not in cls._shards:
+            raise ValueError("Unknown shard: {}".format(shard))
+        return cls._shards[shard]
+
+    @classmethod
+    def resolve(cls, empresa_id: str) -> ShardTarget:
+        """
+        Return the target of a company
+        :param  - empresa_id: ID of the company
+        :return - The shard target, or None when sharding is disabled
+        """
+
+        shard = cls.shard_name(empresa_id)
+        return cls._shards[shard] if shard is not None else None
+
+    @classmethod
+    def shard_name(cls, empresa_id: str) -> str:
+        """
+        Return the shard of a company, by directory entry, static override or hash ring
+        :param  - empresa_id: ID of the company
+        :return - The shard name, or None when sharding is disabled
+        """
+
+        if not cls.enabled():
+            return None
+
+        entry = cls.__directory().get(empresa_id)
+        if entry is not None and entry[0] in cls._shards:
+            return entry[0]
+
+        override = cls._overrides.get(empresa_id)
+        if override is not None:
+            return override
+
+        return cls.ring_shard(empresa_id)
+
+    @classmethod
+    def ring_shard(cls, empresa_id: str) -> str:
+        """
+        Return the shard placed by the hash ring, ignoring overrides
+        :param  - empresa_id: ID of the company
+        :return - The shard name, or None when sharding is disabled
+        """
+
+        if not cls.enabled():
+            return None
+
+        index = bisect.bisect(cls._ring_keys, cls.__hash(empresa_id))
+        return cls._ring_shards[index % len(cls._ring_shards)]
+
+    @classmethod
+    def group(cls, empresa_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Group companies by shard, keeping their first appearance order
+        :param  - empresa_ids: IDs of the companies
+        :return - Dictionary of company IDs by shard name, a single None key when sharding is disabled
+        """
+
+        groups = {}
+        for empresa_id in dict.fromkeys(empresa_ids):
+            groups.setdefault(cls.shard_name(empresa_id), []).append(empresa_id)
+        return groups
+
+    @classmethod
+    def is_locked(cls, empresa_id: str) -> bool:
+        """
+        Return if the writes of a company are locked by a move between shards
+        :param  - empresa_id: ID of the company
+        :return - bool: If writes must be refused
+        """
+
+        if not cls.enabled():
+            return False
+
+        entry = cls.__directory().get(empresa_id)
+        return entry is not None and entry[1] == cls.LOCKED
+
+    @classmethod
+    def check_writable(cls, empresa_ids: Iterable[str]) -> None:
+        """
+        Refuse writes touching any company locked by a move between shards
+        :param  - empresa_ids: IDs of the written companies
+        :return - None
+        """
+
+        for empresa_id in empresa_ids:
+            if cls.is_locked(empresa_id):
+                raise TenantMovingError(
+                    "Company {} is moving between shards".format(empresa_id)
+                )
+
+    @classmethod
+    def assign(cls, empresa_id: str, shard: str, state: str = ACTIVE) -> None:
+        """
+        Pin a company to a shard in the directory and drop the cached directory of this container.
+        Other containers see the change after DATABASE_SHARD_MAP_TTL_SECONDS
+        :param  - empresa_id: ID of the company
+                - shard: The shard name
+                - state: (Optional) 'active' or 'locked'. Default is 'active'
+        :return - None
+        """
+
+        from .db_config import DBConnectionHandler
+
+        cls.target(shard)
+        with DBConnectionHandler().get_engine().begin() as connection:
+            connection.execute(
+                delete(tenant_shards).where(tenant_shards.c.empresa_id == empresa_id)
+            )
+            connection.execute(
+                tenant_shards.insert().values(
+                    empresa_id=empresa_id,
+                    shard=shard,
+                    state=state,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+        cls.refresh()
+
+    @classmethod
+    def ttl(cls) -> int:
+        return env_int("DATABASE_SHARD_MAP_TTL_SECONDS", 30)
+
+    @classmethod
+    def refresh(cls) -> None:
+        """
+        Drop the cached directory, so the next lookup reads it again
+        :param  - None
+        :return - None
+        """
+
+        cls._directory_loaded_at = None
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Drop the loaded configuration and directory, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            cls._source = None
+            cls._shards = {}
+            cls._overrides = {}
+            cls._ring_keys = []
+            cls._ring_shards = []
+            cls._directory = {}
+            cls._directory_loaded_at = None
+
+    @classmethod
+    def __load_config(cls) -> None:
+        source = os.getenv("DATABASE_SHARDS") or ""
+        if source == cls._source:
+            return
+
+        config = json.loads(source) if source else {}
+        shards = {
+            name: ShardTarget(name=name, **options)
+            for name, options in (config.get("shards") or {}).items()
+        }
+        overrides = config.get("overrides") or {}
+        for empresa_id, shard in overrides.items():
+            if shard not in shards:
+                raise ValueError(
+                    "Unknown shard {} in the override of {}".format(shard, empresa_id)
+                )
+
+        vnodes = int(config.get("vnodes") or 64)
+        points = sorted(
+            (cls.__hash("{}#{}".format(name, index)), name)
+            for name, target in shards.items()
+            for index in range(vnodes * int(target.weight))
+        )
+
+        with cls._lock:
+            cls._shards = shards
+            cls._overrides = overrides
+            cls._ring_keys = [point for point, _ in points]
+            cls._ring_shards = [name for _, name in points]
+            cls._directory = {}
+            cls._directory_loaded_at = None
+            cls._source = source
+
+    @classmethod
+    def __directory(cls) -> Dict[str, Tuple[str, str]]:
+        loaded_at = cls._directory_loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < cls.ttl():
+            return cls._directory
+
+        from .db_config import DBConnectionHandler
+
+        with DBConnectionHandler().get_engine().connect() as connection:
+            rows = connection.execute(
+                select(
+                    tenant_shards.c.empresa_id,
+                    tenant_shards.c.shard,
+                    tenant_shards.c.state,
+                )
+            ).all()
+
+        cls._directory = {
+            empresa_id: (shard, state) for empresa_id, shard, state in rows
+        }
+        cls._directory_loaded_at = time.monotonic()
+        return cls._directory
+
+    @classmethod
+    def __hash(cls, value: str) -> int:
+        return int(hashlib.md5(value.encode("utf-8")).hexdigest()[:16], 16)
@@ -0,0 +1,50 @@
+from .db_config import DBConnectionHandler
+
+
+class UnitOfWork(DBConnectionHandler):
+    """
+    Request scoped session and transaction. Every DBConnectionHandler opened inside it
+    joins its session, so a use case runs in a single connection and transaction.
+    With sharding enabled it must be opened with the empresa_id of the handlers joining it
+    """
+
+    def __init__(
+        self,
+        connection_string: str = None,
+        read_only: bool = False,
+        empresa_id: str = None,
+    ):
+        super().__init__(connection_string, read_only, empresa_id)
+        self.rollback_only = False
+        self.__token = None
+
+    def __enter__(self):
+        super().__enter__()
+        if not self.joined:
+            self.__token = self._current_unit_of_work.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.joined:
+            if exc_type is not None:
+                self.rollback()
+            return
+
+        try:
+            if exc_type is None and not self.rollback_only:
+                self.session.commit()
+            else:
+                self.session.rollback()
+        finally:
+            self._current_unit_of_work.reset(self.__token)
+            self.session.close()
+
+    @classmethod
+    def current(cls) -> "UnitOfWork":
+        """
+        Return the active UnitOfWork of the current context
+        :param  - None
+        :return - The active UnitOfWork or None
+        """
+
+        return cls._current_unit_of_work.get()
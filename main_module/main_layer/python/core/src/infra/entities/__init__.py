@@ -1,3 +1,3 @@
 """Namespace de entidades."""
 
-from .package import Package
\ No newline at end of file
+from .package import Package, PackageCounter
@@ -1 +1 @@
-from .entity import Package
+from .entity import Package, PackageCounter
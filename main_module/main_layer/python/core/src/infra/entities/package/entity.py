@@ -1,6 +1,6 @@
 from datetime import datetime, timezone, timedelta
 from typing import Sequence
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.schema import ForeignKey
@@ -12,6 +12,13 @@ class Package(Base):
     """Packages Entity"""
 
     __tablename__ = "packages"
+    __table_args__ = (
+        Index("ix_packages_empresa_created_at", "empresa_id", "created_at", "id"),
+        Index("ix_packages_empresa_updated_at", "empresa_id", "updated_at", "id"),
+        Index("ix_packages_empresa_name", "empresa_id", "name", "id"),
+        Index("ix_packages_empresa_symbol", "empresa_id", "symbol", "id"),
+        Index("ix_packages_empresa_id", "empresa_id", "id"),
+    )
 
     id = Column(String(36), primary_key=True)
     name = Column(String(), nullable=False, unique=False)
@@ -38,3 +45,15 @@ class Package(Base):
         ):
             return True
         return False
+
+
+class PackageCounter(Base):
+    """Packages total of each company, maintained by PackageRepository writes"""
+
+    __tablename__ = "package_counters"
+
+    empresa_id = Column(String(36), primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"PackageCounter [empresa_id={self.empresa_id}, total={self.total}]"
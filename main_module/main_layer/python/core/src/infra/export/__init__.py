@@ -0,0 +1,7 @@
+from .encoders import (
+    ExportEncoder,
+    NdjsonEncoder,
+    CsvEncoder,
+    ParquetEncoder,
+    EXPORT_ENCODERS,
+)
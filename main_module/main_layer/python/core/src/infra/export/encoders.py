@@ -0,0 +1,197 @@
+import io
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Sequence
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+
+class ExportEncoder:
+    """
+    Base class of incremental export encoders. Rows are encoded batch by batch straight into
+    a binary file-like sink, so no encoder keeps more than one batch of rows in memory
+    """
+
+    format: str = None
+    extension: str = None
+    content_type: str = None
+
+    def __init__(self, sink, columns: Sequence[str]):
+        """
+        Constructor that binds the encoder to its output
+        :param  - sink: A binary file-like object with a write() method
+                - columns: The exported column names, in output order
+        :return - None
+        """
+
+        self.sink = sink
+        self.columns = list(columns)
+        self.rows_written = 0
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        """
+        Encode a batch of rows
+        :param  - rows: List of dictionaries keyed by column name
+        :return - None
+        """
+
+        raise Exception("Should implement method: write_rows")
+
+    def close(self) -> None:
+        """
+        Write any trailing bytes of the format. The sink is not closed
+        :param  - None
+        :return - None
+        """
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Return if the packages required by the format are installed
+        :param  - None
+        :return - If exports in this format are supported
+        """
+
+        return True
+
+    @classmethod
+    def to_text(cls, value) -> str:
+        """
+        Convert a column value into its exported text, keeping None
+        :param  - value: A column value
+        :return - The value as text, or None
+        """
+
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        return str(value)
+
+
+class NdjsonEncoder(ExportEncoder):
+    """Newline delimited JSON, one object per row"""
+
+    format = "ndjson"
+    extension = "ndjson"
+    content_type = "application/x-ndjson"
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        lines = [
+            json.dumps(
+                {column: self.__to_json(row.get(column)) for column in self.columns},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            for row in rows
+        ]
+        if lines:
+            self.sink.write(("\n".join(lines) + "\n").encode("utf-8"))
+            self.rows_written += len(lines)
+
+    @classmethod
+    def __to_json(cls, value):
+        if value is None or isinstance(value, (str, int, float, bool, dict, list)):
+            return value
+        if isinstance(value, Decimal):
+            return float(value)
+        return cls.to_text(value)
+
+
+class CsvEncoder(ExportEncoder):
+    """Comma separated values with a header line, None values are written as empty fields"""
+
+    format = "csv"
+    extension = "csv"
+    content_type = "text/csv"
+
+    def __init__(self, sink, columns: Sequence[str]):
+        super().__init__(sink, columns)
+        self.__buffer = io.StringIO()
+        self.__writer = csv.writer(self.__buffer, lineterminator="\n")
+        self.__writer.writerow(self.columns)
+        self.__flush()
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self.__writer.writerows(
+            [self.to_text(row.get(column)) for column in self.columns] for row in rows
+        )
+        self.rows_written += len(rows)
+        self.__flush()
+
+    def __flush(self) -> None:
+        self.sink.write(self.__buffer.getvalue().encode("utf-8"))
+        self.__buffer.seek(0)
+        self.__buffer.truncate()
+
+
+class ParquetEncoder(ExportEncoder):
+    """
+    Apache Parquet with string columns, requires the optional pyarrow package.
+    Rows are buffered up to row_group_size before each row group is written, since tiny
+    row groups make the file slow to read
+    """
+
+    format = "parquet"
+    extension = "parquet"
+    content_type = "application/vnd.apache.parquet"
+
+    DEFAULT_ROW_GROUP_SIZE = 50000
+
+    def __init__(self, sink, columns: Sequence[str], row_group_size: int = None):
+        if pyarrow is None:
+            raise ImportError("The parquet format requires the pyarrow package")
+
+        super().__init__(sink, columns)
+        self.row_group_size = row_group_size or self.DEFAULT_ROW_GROUP_SIZE
+        self.__schema = pyarrow.schema(
+            [pyarrow.field(column, pyarrow.string()) for column in self.columns]
+        )
+        self.__writer = pyarrow.parquet.ParquetWriter(sink, self.__schema)
+        self.__pending: Dict[str, list] = {column: [] for column in self.columns}
+        self.__pending_count = 0
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Return if the pyarrow package is installed
+        :param  - None
+        :return - If parquet exports are supported
+        """
+
+        return pyarrow is not None
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        for row in rows:
+            for column in self.columns:
+                self.__pending[column].append(self.to_text(row.get(column)))
+        self.__pending_count += len(rows)
+        self.rows_written += len(rows)
+        if self.__pending_count >= self.row_group_size:
+            self.__write_row_group()
+
+    def close(self) -> None:
+        self.__write_row_group()
+        self.__writer.close()
+
+    def __write_row_group(self) -> None:
+        if not self.__pending_count:
+            return
+
+        table = pyarrow.Table.from_pydict(self.__pending, schema=self.__schema)
+        self.__writer.write_table(table)
+        self.__pending = {column: [] for column in self.columns}
+        self.__pending_count = 0
+
+
+EXPORT_ENCODERS = {
+    encoder.format: encoder for encoder in (NdjsonEncoder, CsvEncoder, ParquetEncoder)
+}
@@ -0,0 +1,4 @@
+from .migration import Migration
+from .runner import MigrationRunner
+from .index_advisor import IndexAdvisor, QueryShape
+from .versions import MIGRATIONS
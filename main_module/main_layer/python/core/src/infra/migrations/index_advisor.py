@@ -0,0 +1,83 @@
+from collections import namedtuple
+from typing import List, Sequence
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+QueryShape = namedtuple(
+    "QueryShape",
+    """
+        name
+        equality
+        order
+    """,
+)
+
+
+class IndexAdvisor:
+    """
+    Checks that every declared query shape can be served by an index: the equality columns
+    first, in any order, followed by the order by columns
+    """
+
+    @classmethod
+    def serves(cls, index_columns: Sequence[str], shape: QueryShape) -> bool:
+        """
+        Return if an index serves a query shape
+        :param  - index_columns: The ordered columns of the index
+                - shape: The query shape
+        :return - If the index filters and orders the shape without a scan or a sort
+        """
+
+        equality_length = len(shape.equality)
+        if set(index_columns[:equality_length]) != set(shape.equality):
+            return False
+
+        order = list(index_columns[equality_length:])[: len(shape.order)]
+        return order == list(shape.order)
+
+    @classmethod
+    def table_indexes(cls, engine: Engine, table_name: str) -> List[List[str]]:
+        """
+        Read the indexes of a table from the database, primary key included
+        :param  - engine: The engine of the database
+                - table_name: The table name
+        :return - List of index column lists
+        """
+
+        inspector = inspect(engine)
+        indexes = [index["column_names"] for index in inspector.get_indexes(table_name)]
+        primary_key = inspector.get_pk_constraint(table_name)["constrained_columns"]
+        if primary_key:
+            indexes.append(primary_key)
+        return indexes
+
+    @classmethod
+    def unindexed_shapes(
+        cls, indexes: List[Sequence[str]], shapes: List[QueryShape]
+    ) -> List[QueryShape]:
+        """
+        Return the query shapes without a matching index
+        :param  - indexes: List of index column lists
+                - shapes: The declared query shapes
+        :return - List of unserved query shapes
+        """
+
+        return [
+            shape
+            for shape in shapes
+            if not any(cls.serves(columns, shape) for columns in indexes)
+        ]
+
+    @classmethod
+    def check(
+        cls, engine: Engine, table_name: str, shapes: List[QueryShape]
+    ) -> List[QueryShape]:
+        """
+        Return the query shapes of a table without a matching index in the database
+        :param  - engine: The engine of the database
+                - table_name: The table name
+                - shapes: The declared query shapes
+        :return - List of unserved query shapes
+        """
+
+        return cls.unindexed_shapes(cls.table_indexes(engine, table_name), shapes)
@@ -0,0 +1,14 @@
+from typing import Callable
+from sqlalchemy.engine import Connection
+
+
+class Migration:
+    """A versioned schema change, applied once and recorded in the schema_migrations table"""
+
+    def __init__(self, version: int, name: str, upgrade: Callable[[Connection], None]):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+
+    def __repr__(self):
+        return f"Migration [version={self.version}, name={self.name}]"
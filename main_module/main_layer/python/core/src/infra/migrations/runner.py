@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+from core.src.infra.config import DBConnectionHandler
+from .migration import Migration
+from .versions import MIGRATIONS
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class MigrationRunner:
+    """
+    Applies pending migrations in version order, each one in its own transaction together with
+    its schema_migrations row. On PostgreSQL a transaction advisory lock makes concurrent runners
+    apply every migration once
+    """
+
+    ADVISORY_LOCK_KEY = 4817305
+
+    def __init__(self, engine: Engine = None, migrations: List[Migration] = None):
+        self.engine = engine or DBConnectionHandler().get_engine()
+        self.migrations = sorted(
+            migrations if migrations is not None else MIGRATIONS,
+            key=lambda migration: migration.version,
+        )
+
+    def applied_versions(self) -> List[int]:
+        """
+        Return the versions already applied to the database
+        :param  - None
+        :return - Sorted list of versions
+        """
+
+        with self.engine.begin() as connection:
+            schema_migrations.create(connection, checkfirst=True)
+            return self.__applied_versions(connection)
+
+    def pending(self) -> List[Migration]:
+        """
+        Return the migrations not applied to the database yet
+        :param  - None
+        :return - List of migrations, in version order
+        """
+
+        applied = set(self.applied_versions())
+        return [
+            migration
+            for migration in self.migrations
+            if migration.version not in applied
+        ]
+
+    def upgrade(self, target: int = None) -> List[Migration]:
+        """
+        Apply pending migrations up to a version
+        :param  - target: (Optional) The last version to apply. Default is every migration
+        :return - List of applied migrations
+        """
+
+        applied = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+
+            with self.engine.begin() as connection:
+                self.__lock(connection)
+                if migration.version in self.__applied_versions(connection):
+                    continue
+
+                migration.upgrade(connection)
+                connection.execute(
+                    schema_migrations.insert().values(
+                        version=migration.version,
+                        name=migration.name,
+                        applied_at=datetime.now(timezone.utc),
+                    )
+                )
+            applied.append(migration)
+
+        return applied
+
+    def __lock(self, connection: Connection) -> None:
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": self.ADVISORY_LOCK_KEY},
+            )
+
+    def __applied_versions(self, connection: Connection) -> List[int]:
+        return sorted(
+            connection.execute(select(schema_migrations.c.version)).scalars().all()
+        )
@@ -0,0 +1,62 @@
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from core.src.infra.config import tenant_shards
+from core.src.infra.entities import Package as PackageModel, PackageCounter
+from .migration import Migration
+
+
+def _create_indexes(*names: str):
+    def upgrade(connection: Connection) -> None:
+        for index in PackageModel.__table__.indexes:
+            if index.name in names:
+                index.create(connection, checkfirst=True)
+
+    return upgrade
+
+
+def _create_packages(connection: Connection) -> None:
+    PackageModel.__table__.create(connection, checkfirst=True)
+
+
+def _install_package_search(connection: Connection) -> None:
+    from core.src.infra.repo.package_repository import PackageSearch
+
+    PackageSearch.install(connection)
+
+
+def _create_package_counters(connection: Connection) -> None:
+    table = PackageCounter.__table__
+    table.create(connection, checkfirst=True)
+    counted = (
+        select(PackageModel.empresa_id, func.count())
+        .where(PackageModel.empresa_id.not_in(select(table.c.empresa_id)))
+        .group_by(PackageModel.empresa_id)
+    )
+    connection.execute(table.insert().from_select(["empresa_id", "total"], counted))
+
+
+def _create_tenant_shards(connection: Connection) -> None:
+    tenant_shards.create(connection, checkfirst=True)
+
+
+MIGRATIONS = [
+    Migration(1, "create_packages", _create_packages),
+    Migration(
+        2,
+        "packages_tenant_indexes",
+        _create_indexes(
+            "ix_packages_empresa_created_at",
+            "ix_packages_empresa_updated_at",
+            "ix_packages_empresa_name",
+        ),
+    ),
+    Migration(3, "packages_search", _install_package_search),
+    Migration(4, "package_counters", _create_package_counters),
+    Migration(5, "tenant_shards", _create_tenant_shards),
+    Migration(6, "packages_search_keys", _install_package_search),
+    Migration(
+        7,
+        "packages_sort_indexes",
+        _create_indexes("ix_packages_empresa_symbol", "ix_packages_empresa_id"),
+    ),
+]
@@ -1 +1,7 @@
 from .repository import PackageRepository
+from .statements import PackageStatements
+from .cursor import PackageCursor
+from .search import PackageSearch
+from .counts import PackageCounts
+from .cache import PackageCache
+from .shared_cache import PackageSharedCache
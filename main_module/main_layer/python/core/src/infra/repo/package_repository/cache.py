@@ -0,0 +1,131 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Tuple
+from core.src.domain.models import PackageRecord
+
+
+class PackageCache:
+    """
+    Per container LRU cache of the Packages read by ID, keyed by (empresa_id, id). Entries keep
+    the PackageSharedCache version of the company they were read under and only hit under that
+    same version, so writes of other containers are seen at once while the shared cache is
+    available, and after at most PACKAGE_CACHE_SECONDS otherwise. Writes of this container update
+    or drop the entries of the Packages they change once committed, updated entries being kept
+    under the version their commit produced. Cached records are shared by every caller and must
+    not be modified.
+    Environment:
+        - PACKAGE_CACHE_ENABLED: ENABLED|DISABLED (default ENABLED)
+        - PACKAGE_CACHE_SECONDS: TTL of cached Packages (default 60)
+        - PACKAGE_CACHE_SIZE: Maximum cached Packages (default 1024)
+    """
+
+    _cache: "OrderedDict[Hashable, Tuple[PackageRecord, float, str]]" = OrderedDict()
+    _lock = threading.Lock()
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return os.getenv("PACKAGE_CACHE_ENABLED") != "DISABLED" and cls.ttl() > 0
+
+    @classmethod
+    def ttl(cls) -> int:
+        return int(os.getenv("PACKAGE_CACHE_SECONDS") or 60)
+
+    @classmethod
+    def max_size(cls) -> int:
+        return int(os.getenv("PACKAGE_CACHE_SIZE") or 1024)
+
+    @classmethod
+    def get(cls, empresa_id: str, id: str, version: str = None) -> PackageRecord:
+        """
+        Return a cached Package
+        :param  - empresa_id: ID of the Package company
+                - id: ID of the Package
+                - version: (Optional) The current shared version of the company, None when the
+                    shared cache is unavailable
+        :return - The cached PackageRecord, or None when missing, expired, cached under another
+                    version or the cache is disabled
+        """
+
+        if not cls.enabled():
+            return None
+
+        key = (empresa_id, id)
+        with cls._lock:
+            entry = cls._cache.get(key)
+            if (
+                entry is not None
+                and entry[1] > time.monotonic()
+                and entry[2] == version
+            ):
+                cls._cache.move_to_end(key)
+                cls._stats["hits"] += 1
+                return entry[0]
+
+            if entry is not None:
+                del cls._cache[key]
+            cls._stats["misses"] += 1
+            return None
+
+    @classmethod
+    def put(cls, record: PackageRecord, version: str = None) -> None:
+        """
+        Cache a Package, evicting the least recently used Packages over max_size()
+        :param  - record: The PackageRecord, without relationships
+                - version: (Optional) The shared version of the company the record was read
+                    under. Default only hits while the shared cache is unavailable
+        :return - None
+        """
+
+        if not cls.enabled():
+            return
+
+        key = (record.empresa_id, record.id)
+        with cls._lock:
+            cls._cache[key] = (record, time.monotonic() + cls.ttl(), version)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.max_size():
+                cls._cache.popitem(last=False)
+                cls._stats["evictions"] += 1
+
+    @classmethod
+    def invalidate(cls, empresa_id: str, ids: Iterable[str] = None) -> None:
+        """
+        Drop cached Packages of a company
+        :param  - empresa_id: ID of the Packages company
+                - ids: (Optional) IDs of the changed Packages. Default drops every Package of the company
+        :return - None
+        """
+
+        with cls._lock:
+            if ids is None:
+                keys = [key for key in cls._cache if key[0] == empresa_id]
+            else:
+                keys = [(empresa_id, id) for id in ids]
+            for key in keys:
+                cls._cache.pop(key, None)
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """
+        Return cache counters
+        :param  - None
+        :return - Dictionary with 'hits', 'misses', 'evictions' and the cached 'size'
+        """
+
+        return dict(cls._stats, size=len(cls._cache))
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Clear cached Packages and counters, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            cls._cache.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
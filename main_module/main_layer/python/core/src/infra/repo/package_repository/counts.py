@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from core.src.infra.entities import Package as PackageModel, PackageCounter
+
+
+class PackageCounts:
+    """
+    Package totals served without scanning. The unfiltered total of each company is read from
+    the 'package_counters' table, adjusted by repository writes in their own transaction.
+    Filtered totals are cached per container by (empresa_id, name, symbol) for a short TTL and
+    dropped when this container writes Packages of the company.
+    Environment:
+        - PACKAGE_COUNT_CACHE_SECONDS: TTL of cached filtered totals, 0 disables the cache (default 30)
+        - PACKAGE_COUNT_CACHE_SIZE: Maximum cached filtered totals (default 1024)
+    """
+
+    _cache: "OrderedDict[Hashable, Tuple[int, float]]" = OrderedDict()
+    _lock = threading.Lock()
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "counter_reads": 0}
+
+    @classmethod
+    def ttl(cls) -> int:
+        return int(os.getenv("PACKAGE_COUNT_CACHE_SECONDS") or 30)
+
+    @classmethod
+    def max_size(cls) -> int:
+        return int(os.getenv("PACKAGE_COUNT_CACHE_SIZE") or 1024)
+
+    @classmethod
+    def get(cls, empresa_id: str, name: str, symbol: str) -> int:
+        """
+        Return a cached filtered total
+        :param  - empresa_id: ID of the Packages company
+                - name: The name filter, empty to ignore
+                - symbol: The symbol filter, empty to ignore
+        :return - The cached total, or None when missing or expired
+        """
+
+        key = (empresa_id, name, symbol)
+        with cls._lock:
+            entry = cls._cache.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                cls._cache.move_to_end(key)
+                cls._stats["hits"] += 1
+                return entry[0]
+
+            if entry is not None:
+                del cls._cache[key]
+            cls._stats["misses"] += 1
+            return None
+
+    @classmethod
+    def put(cls, empresa_id: str, name: str, symbol: str, total: int) -> None:
+        """
+        Cache a filtered total, evicting the least recently used totals over max_size()
+        :param  - empresa_id: ID of the Packages company
+                - name: The name filter, empty to ignore
+                - symbol: The symbol filter, empty to ignore
+                - total: The counted total
+        :return - None
+        """
+
+        ttl = cls.ttl()
+        if ttl <= 0:
+            return
+
+        key = (empresa_id, name, symbol)
+        with cls._lock:
+            cls._cache[key] = (total, time.monotonic() + ttl)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.max_size():
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def invalidate(cls, *empresa_ids: str) -> None:
+        """
+        Drop the cached filtered totals of companies
+        :param  - empresa_ids: IDs of the companies whose Packages changed
+        :return - None
+        """
+
+        targets = set(empresa_ids)
+        with cls._lock:
+            for key in [key for key in cls._cache if key[0] in targets]:
+                del cls._cache[key]
+
+    @classmethod
+    def read_counter(cls, session: Session, empresa_id: str) -> int:
+        """
+        Read the maintained total of a company
+        :param  - session: The session running the query
+                - empresa_id: ID of the Packages company
+        :return - The total, or None when the company has no counter yet
+        """
+
+        cls._stats["counter_reads"] += 1
+        return session.execute(
+            select(PackageCounter.total).where(PackageCounter.empresa_id == empresa_id)
+        ).scalar()
+
+    @classmethod
+    def adjust(cls, session: Session, deltas: Dict[str, int]) -> None:
+        """
+        Apply Package count changes of a write to the company counters, in the write transaction.
+        A missing counter is created with the company count, which already includes the write
+        :param  - session: The session of the write
+                - deltas: Dictionary of count change by company ID
+        :return - None
+        """
+
+        for empresa_id, delta in deltas.items():
+            if delta:
+                session.execute(cls.__upsert_statement(session, empresa_id, delta))
+        cls.invalidate(*deltas)
+
+    @classmethod
+    def refresh_counter(cls, session: Session, empresa_id: str) -> int:
+        """
+        Recount the Packages of a company into its counter, repairing writes made outside the repository
+        :param  - session: The session running the statements, committed by the caller
+                - empresa_id: ID of the Packages company
+        :return - The recounted total
+        """
+
+        total = session.execute(
+            select(func.count())
+            .select_from(PackageModel)
+            .where(PackageModel.empresa_id == empresa_id)
+        ).scalar()
+        result = session.execute(
+            update(PackageCounter)
+            .where(PackageCounter.empresa_id == empresa_id)
+            .values(total=total)
+        )
+        if not result.rowcount:
+            session.execute(cls.__upsert_statement(session, empresa_id, 0))
+        cls.invalidate(empresa_id)
+        return total
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """
+        Return cache counters
+        :param  - None
+        :return - Dictionary with 'hits', 'misses', 'counter_reads' and the cached 'size'
+        """
+
+        return dict(cls._stats, size=len(cls._cache))
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Clear cached totals and counters, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            cls._cache.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def __upsert_statement(cls, session: Session, empresa_id: str, delta: int):
+        table = PackageCounter.__table__
+        counted = select(literal(empresa_id), func.count()).where(
+            PackageModel.empresa_id == empresa_id
+        )
+        dialect = session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return (
+            insert(table)
+            .from_select(["empresa_id", "total"], counted)
+            .on_conflict_do_update(
+                index_elements=[table.c.empresa_id],
+                set_={"total": table.c.total + delta},
+            )
+        )
@@ -0,0 +1,65 @@
+import json
+import base64
+from datetime import datetime
+from typing import Tuple
+from sqlalchemy import DateTime
+from core.src.infra.entities import Package as PackageModel
+
+
+class PackageCursor:
+    """Opaque keyset pagination cursor, made of the sort column value plus the Package id"""
+
+    KEYSET_COLUMNS = ("created_at", "updated_at", "name", "id")
+
+    @classmethod
+    def supports(cls, column: str) -> bool:
+        """
+        Return if a sort column can be paginated by cursor, which requires a non nullable column
+        :param  - column: The sort column name
+        :return - If the column supports keyset pagination
+        """
+
+        return column in cls.KEYSET_COLUMNS
+
+    @classmethod
+    def encode(cls, column: str, order: str, value: any, id: str) -> str:
+        """
+        Build the cursor pointing after a Package
+        :param  - column: The sort column name
+                - order: The sort order 'asc|desc'
+                - value: The sort column value of the last Package of the page
+                - id: The ID of the last Package of the page
+        :return - An url safe opaque cursor
+        """
+
+        payload = json.dumps([column, order, str(value), id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str, column: str, order: str) -> Tuple[any, str]:
+        """
+        Read the keyset of a cursor built for the same sort column and order
+        :param  - cursor: A cursor built by encode()
+                - column: The requested sort column name
+                - order: The requested sort order 'asc|desc'
+        :return - A tuple with the typed sort column value and the Package id
+        """
+
+        if not cls.supports(column):
+            raise ValueError("Column does not support cursor pagination")
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            cursor_column, cursor_order, value, id = json.loads(
+                base64.urlsafe_b64decode(cursor + padding)
+            )
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+        if cursor_column != column or cursor_order != order:
+            raise ValueError("Cursor does not match the requested sort")
+
+        if isinstance(PackageModel.__table__.c[column].type, DateTime):
+            value = datetime.fromisoformat(value)
+
+        return value, id
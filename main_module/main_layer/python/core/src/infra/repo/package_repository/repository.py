@@ -1,41 +1,154 @@
 # pylint: disable=E1101
 
 import uuid
+from collections import Counter
 from datetime import datetime, timezone, timedelta
-from typing import List
+from typing import Iterator, List, Tuple
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy import String
+from sqlalchemy import String, bindparam, delete, insert, inspect, select, update
 from core.src.data.interfaces import PackageRepositoryInterface
-from core.src.domain.models import Package
-from core.src.infra.config import DBConnectionHandler
+from core.src.domain.models import Package, PackageRecord, PackageWriteResult
+from core.src.infra.config import DBConnectionHandler, ShardMap, UnitOfWork
 from core.src.infra.entities import Package as PackageModel
+from .statements import PackageStatements
+from .cursor import PackageCursor
+from .search import PackageSearch
+from .counts import PackageCounts
+from .cache import PackageCache
+from .shared_cache import PackageSharedCache
 
 
 class PackageRepository(PackageRepositoryInterface):
     """Class to manage Package Repository"""
 
+    GET_PACKAGES_CHUNK_SIZE = 100
+
     @classmethod
     def __build_entity_to_domain_interface(
-        cls, entity_instance: PackageModel
-    ) -> Package:
+        cls, entity_instance: PackageModel, include: Tuple[str, ...] = ()
+    ) -> PackageRecord:
         """
-        Transform infra Entity Package into named tuple domain model Package
+        Transform infra Entity Package into the domain read model PackageRecord
         :param  - entity_instance: A PackageModel
-        :return - A domain Package
+                - include: (Optional) Loaded relationships embedded in the domain Package
+        :return - A domain PackageRecord
         """
 
-        domain_entity = Package(
+        domain_entity = PackageRecord(
             id=entity_instance.id,
             name=entity_instance.name,
             symbol=entity_instance.symbol,
             empresa_id=entity_instance.empresa_id,
             created_by=entity_instance.created_by,
             updated_by=entity_instance.updated_by,
-            created_at=str(entity_instance.created_at),
-            updated_at=str(entity_instance.updated_at),
+            created_at=entity_instance.created_at,
+            updated_at=entity_instance.updated_at,
+            products=(
+                [cls.__build_child_to_dict(child) for child in entity_instance.products]
+                if "products" in include
+                else None
+            ),
         )
         return domain_entity
 
+    @classmethod
+    def __build_child_to_dict(cls, child) -> dict:
+        """
+        Transform a loaded related entity into a dictionary of its columns
+        :param  - child: A related entity, as a Product
+        :return - A dictionary with the entity columns
+        """
+
+        return {
+            attribute.key: getattr(child, attribute.key)
+            for attribute in inspect(child).mapper.column_attrs
+        }
+
+    @classmethod
+    def __build_row_to_domain_interface(cls, row: dict) -> Package:
+        """
+        Transform a dictionary of Package columns into named tuple domain model Package
+        :param  - row: A dictionary with every Package column
+        :return - A domain Package
+        """
+
+        return Package(
+            id=row["id"],
+            name=row["name"],
+            symbol=row["symbol"],
+            empresa_id=row["empresa_id"],
+            created_by=row["created_by"],
+            updated_by=row["updated_by"],
+            created_at=str(row["created_at"]),
+            updated_at=str(row["updated_at"]),
+        )
+
+    @classmethod
+    def __build_list_records(
+        cls, rows: list, projection: Tuple[str, ...], include: Tuple[str, ...]
+    ) -> List[Package]:
+        """
+        Transform the rows of the list statements into domain Packages. Column rows are mapped
+        straight into PackageRecord, rows of ORM entities are only read when relationships are included
+        :param  - rows: The rows of a list statement
+                - projection: The projected column names, None when every column was loaded
+                - include: Loaded relationships embedded in the domain Package
+        :return - List of PackageRecord
+        """
+
+        if include:
+            return [
+                cls.__build_entity_to_domain_interface(row[0], include) for row in rows
+            ]
+
+        from_row = PackageRecord.from_row
+        return [from_row(row, projection) for row in rows]
+
+    @classmethod
+    def __build_update_rows(cls, packages: List[dict]) -> List[dict]:
+        """
+        Build the parameter sets of __build_update_statement()
+        :param  - packages: List of dictionaries with id, empresa_id, name, symbol and optional
+                    updated_by and updated_at of each Package
+        :return - List of parameter sets
+        """
+
+        now = datetime.now(timezone(timedelta(hours=-3)))
+        return [
+            dict(
+                b_id=package["id"],
+                b_empresa_id=package["empresa_id"],
+                b_name=package["name"],
+                b_symbol=package.get("symbol"),
+                b_updated_by=package.get("updated_by"),
+                b_updated_at=package.get("updated_at") or now,
+            )
+            for package in packages
+        ]
+
+    @classmethod
+    def __build_update_statement(cls):
+        """
+        Build the multi-row update of name and symbol, bound by __build_update_rows()
+        :param  - None
+        :return - The update statement
+        """
+
+        table = PackageModel.__table__
+        return (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                table.c.empresa_id == bindparam("b_empresa_id"),
+            )
+            .values(
+                name=bindparam("b_name"),
+                symbol=bindparam("b_symbol"),
+                updated_by=bindparam("b_updated_by"),
+                updated_at=bindparam("b_updated_at"),
+            )
+        )
+
     @classmethod
     def create_package(
         cls,
@@ -59,29 +172,40 @@ class PackageRepository(PackageRepositoryInterface):
         :return - A Package created
         """
 
-        with DBConnectionHandler() as db_connection:
+        row = dict(
+            id=str(uuid.uuid4()),
+            name=name,
+            symbol=symbol,
+            empresa_id=empresa_id,
+            created_at=created_at,
+            created_by=created_by,
+            updated_by=updated_by,
+            updated_at=updated_at,
+        )
+
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
             try:
-                id = str(uuid.uuid4())
-                entity_instance = PackageModel(
-                    id=id,
-                    name=name,
-                    symbol=symbol,
-                    empresa_id=empresa_id,
-                    created_at=created_at,
-                    created_by=created_by,
-                    updated_by=updated_by,
-                    updated_at=updated_at,
+                db_connection.session.execute(
+                    insert(PackageModel.__table__).values(**row)
                 )
-                db_connection.session.add(entity_instance)
-                db_connection.session.commit()
+                PackageCounts.adjust(db_connection.session, {empresa_id: 1})
+                PackageSharedCache.invalidate(db_connection.session, empresa_id)
+                db_connection.commit()
+                if not db_connection.joined:
+                    PackageCache.put(
+                        PackageRecord(**row),
+                        PackageSharedCache.committed_version(
+                            db_connection.session, empresa_id
+                        ),
+                    )
 
-                return cls.__build_entity_to_domain_interface(entity_instance)
+                return cls.__build_row_to_domain_interface(row)
 
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
 
         return None
 
@@ -107,26 +231,41 @@ class PackageRepository(PackageRepositoryInterface):
                 - created_at: Datetime of create action, (default is now())
                 - updated_by: ID of the Package doing update action, (default is None)
                 - updated_at: Datetime of update action, (default is now())
-        :return - A Package updated
+        :return - A Package updated, raising NoResultFound when the company has no Package with the ID
         """
 
-        with DBConnectionHandler() as db_connection:
-            try:
-                entity_instance = db_connection.session.get(PackageModel, id)
-                entity_instance.name = name
-                entity_instance.symbol = symbol
-                entity_instance.updated_by = updated_by
-                entity_instance.updated_at = updated_at
+        table = PackageModel.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == id, table.c.empresa_id == empresa_id)
+            .values(
+                name=name, symbol=symbol, updated_by=updated_by, updated_at=updated_at
+            )
+        )
 
-                db_connection.session.merge(entity_instance)
-                db_connection.session.commit()
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
+            try:
+                row = cls.__execute_returning(db_connection, statement, id, empresa_id)
+                if row is None:
+                    raise NoResultFound("Package not found")
+                PackageCounts.invalidate(empresa_id)
+                PackageCache.invalidate(empresa_id, [id])
+                PackageSharedCache.invalidate(db_connection.session, empresa_id)
+                db_connection.commit()
+                if not db_connection.joined:
+                    PackageCache.put(
+                        PackageRecord(**row),
+                        PackageSharedCache.committed_version(
+                            db_connection.session, empresa_id
+                        ),
+                    )
 
-                return cls.__build_entity_to_domain_interface(entity_instance)
+                return cls.__build_row_to_domain_interface(row)
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
 
         return None
 
@@ -136,28 +275,368 @@ class PackageRepository(PackageRepositoryInterface):
         Delete Package by ID
         :param  - id: ID of the Package
                 - empresa_id: ID of the Package company
-        :return - If deletion has been succeeded
+        :return - If deletion has been succeeded, raising NoResultFound when the company has no Package with the ID
+        """
+
+        return cls.delete_package_returning(id, empresa_id) is not None
+
+    @classmethod
+    def delete_package_returning(cls, id: str, empresa_id: str) -> Package:
+        """
+        Delete Package by ID, returning the deleted Package without reading it first
+        :param  - id: ID of the Package
+                - empresa_id: ID of the Package company
+        :return - The deleted Package, raising NoResultFound when the company has no Package with the ID
         """
 
-        with DBConnectionHandler() as db_connection:
+        table = PackageModel.__table__
+        statement = delete(table).where(
+            table.c.id == id, table.c.empresa_id == empresa_id
+        )
+
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
             try:
-                entity_instance = (
-                    db_connection.session.query(PackageModel)
-                    .filter(
-                        PackageModel.id == id, PackageModel.empresa_id == empresa_id
+                row = cls.__execute_returning(db_connection, statement, id, empresa_id)
+                if row is None:
+                    raise NoResultFound("Package not found")
+                PackageCounts.adjust(db_connection.session, {empresa_id: -1})
+                PackageCache.invalidate(empresa_id, [id])
+                PackageSharedCache.invalidate(db_connection.session, empresa_id)
+                db_connection.commit()
+
+                return cls.__build_row_to_domain_interface(row)
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
+
+    @classmethod
+    def __execute_returning(
+        cls, db_connection: DBConnectionHandler, statement, id: str, empresa_id: str
+    ) -> dict:
+        """
+        Execute an update or delete of a single Package and return its columns. Dialects supporting
+        RETURNING, as PostgreSQL and the Data API, need a single statement. SQLite reads the row apart
+        :param  - db_connection: The open connection handler
+                - statement: The update or delete statement of the Package
+                - id: ID of the Package
+                - empresa_id: ID of the Package company
+        :return - A dictionary with the Package columns after the statement, or None when no row matched
+        """
+
+        table = PackageModel.__table__
+        session = db_connection.session
+        if session.get_bind().dialect.full_returning:
+            row = session.execute(statement.returning(*table.c)).mappings().first()
+            return dict(row) if row is not None else None
+
+        select_row = select(table).where(
+            table.c.id == id, table.c.empresa_id == empresa_id
+        )
+        if statement.is_delete:
+            row = session.execute(select_row).mappings().first()
+            if row is not None:
+                session.execute(statement)
+        else:
+            result = session.execute(statement)
+            row = (
+                session.execute(select_row).mappings().first()
+                if result.rowcount
+                else None
+            )
+
+        return dict(row) if row is not None else None
+
+    @classmethod
+    def bulk_insert_packages(cls, packages: List[dict]) -> List[Package]:
+        """
+        Insert many Packages with a single multi-row statement. On the Aurora Data API the
+        parameter sets are sent through chunked BatchExecuteStatement requests. Companies on
+        different shards are written in one transaction per shard
+        :param  - packages: List of dictionaries with name, symbol, empresa_id and optional
+                    id, created_by, updated_by, created_at and updated_at of each Package
+        :return - List of created Packages, in the same order
+        """
+
+        now = datetime.now(timezone(timedelta(hours=-3)))
+        rows = [
+            dict(
+                id=package.get("id") or str(uuid.uuid4()),
+                name=package["name"],
+                symbol=package.get("symbol"),
+                empresa_id=package["empresa_id"],
+                created_by=package.get("created_by"),
+                updated_by=package.get("updated_by"),
+                created_at=package.get("created_at") or now,
+                updated_at=package.get("updated_at") or now,
+            )
+            for package in packages
+        ]
+
+        if not rows:
+            return []
+
+        # Every company is checked before any shard is written, the handler only checks the first
+        groups = ShardMap.group(row["empresa_id"] for row in rows)
+        ShardMap.check_writable(
+            empresa_id for ids in groups.values() for empresa_id in ids
+        )
+        for empresa_ids in groups.values():
+            targets = set(empresa_ids)
+            shard_rows = [row for row in rows if row["empresa_id"] in targets]
+            with DBConnectionHandler(empresa_id=empresa_ids[0]) as db_connection:
+                try:
+                    db_connection.session.execute(
+                        insert(PackageModel.__table__), shard_rows
+                    )
+                    PackageCounts.adjust(
+                        db_connection.session,
+                        Counter(row["empresa_id"] for row in shard_rows),
+                    )
+                    PackageSharedCache.invalidate(db_connection.session, *empresa_ids)
+                    db_connection.commit()
+                except:
+                    db_connection.rollback()
+                    raise
+                finally:
+                    db_connection.close()
+
+        return [cls.__build_row_to_domain_interface(row) for row in rows]
+
+    @classmethod
+    def bulk_update_packages(cls, packages: List[dict]) -> int:
+        """
+        Update name and symbol of many Packages with a single multi-row statement. On the Aurora
+        Data API the parameter sets are sent through chunked BatchExecuteStatement requests.
+        Companies on different shards are written in one transaction per shard
+        :param  - packages: List of dictionaries with id, empresa_id, name, symbol and optional
+                    updated_by and updated_at of each Package
+        :return - Count of submitted updates
+        """
+
+        rows = cls.__build_update_rows(packages)
+        if not rows:
+            return 0
+
+        # Every company is checked before any shard is written, the handler only checks the first
+        groups = ShardMap.group(row["b_empresa_id"] for row in rows)
+        ShardMap.check_writable(
+            empresa_id for ids in groups.values() for empresa_id in ids
+        )
+        for empresa_ids in groups.values():
+            targets = set(empresa_ids)
+            shard_rows = [row for row in rows if row["b_empresa_id"] in targets]
+            with DBConnectionHandler(empresa_id=empresa_ids[0]) as db_connection:
+                try:
+                    db_connection.session.execute(
+                        cls.__build_update_statement(), shard_rows
                     )
-                    .first()
+                    PackageCounts.invalidate(*empresa_ids)
+                    for row in shard_rows:
+                        PackageCache.invalidate(row["b_empresa_id"], [row["b_id"]])
+                    PackageSharedCache.invalidate(db_connection.session, *empresa_ids)
+                    db_connection.commit()
+                except:
+                    db_connection.rollback()
+                    raise
+                finally:
+                    db_connection.close()
+
+        return len(rows)
+
+    @classmethod
+    def create_packages(cls, packages: List[dict]) -> List[PackageWriteResult]:
+        """
+        Create many Packages in a single transaction, skipping invalid items
+        :param  - packages: List of dictionaries with name, symbol, empresa_id and optional
+                    id, created_by, updated_by, created_at and updated_at of each Package
+        :return - List of results in the same order, with the created Package or the error code 'invalid'
+        """
+
+        valid = [
+            (index, package)
+            for index, package in enumerate(packages)
+            if package.get("name") and package.get("empresa_id")
+        ]
+        created = iter(cls.bulk_insert_packages([package for _, package in valid]))
+        valid_indexes = set(index for index, _ in valid)
+
+        results = []
+        for index in range(len(packages)):
+            if index in valid_indexes:
+                package = next(created)
+                results.append(
+                    PackageWriteResult(index, package.id, True, package=package)
                 )
-                db_connection.session.delete(entity_instance)
-                db_connection.session.commit()
-                return True
+            else:
+                results.append(PackageWriteResult(index, None, False, "invalid"))
+        return results
+
+    @classmethod
+    def update_packages(
+        cls, packages: List[dict], empresa_id: str
+    ) -> List[PackageWriteResult]:
+        """
+        Update name and symbol of many Packages of a company in a single transaction
+        :param  - packages: List of dictionaries with id, name, symbol and optional updated_by
+                    and updated_at of each Package
+                - empresa_id: ID of the Packages company
+        :return - List of results in the same order, with the updated Package or the error code 'invalid|not_found'
+        """
+
+        now = datetime.now(timezone(timedelta(hours=-3)))
+        ids = [package.get("id") for package in packages if package.get("id")]
+        table = PackageModel.__table__
+
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
+            try:
+                current = {}
+                if ids:
+                    current = {
+                        row["id"]: dict(row)
+                        for row in db_connection.session.execute(
+                            select(table).where(
+                                table.c.empresa_id == empresa_id, table.c.id.in_(ids)
+                            )
+                        ).mappings()
+                    }
+
+                results = []
+                updates = []
+                for index, package in enumerate(packages):
+                    row = current.get(package.get("id"))
+                    if not package.get("name"):
+                        error = "invalid"
+                    elif row is None:
+                        error = "not_found"
+                    else:
+                        error = None
+
+                    if error is not None:
+                        results.append(
+                            PackageWriteResult(index, package.get("id"), False, error)
+                        )
+                        continue
+
+                    row.update(
+                        name=package["name"],
+                        symbol=package.get("symbol"),
+                        updated_by=package.get("updated_by"),
+                        updated_at=package.get("updated_at") or now,
+                    )
+                    updates.append(row)
+                    results.append(
+                        PackageWriteResult(
+                            index,
+                            row["id"],
+                            True,
+                            package=cls.__build_row_to_domain_interface(row),
+                        )
+                    )
+
+                if updates:
+                    db_connection.session.execute(
+                        cls.__build_update_statement(),
+                        cls.__build_update_rows(updates),
+                    )
+                    PackageCounts.invalidate(empresa_id)
+                    PackageCache.invalidate(empresa_id, [row["id"] for row in updates])
+                    PackageSharedCache.invalidate(db_connection.session, empresa_id)
+                db_connection.commit()
+                return results
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
+
+    @classmethod
+    def delete_packages(
+        cls, ids: List[str], empresa_id: str
+    ) -> List[PackageWriteResult]:
+        """
+        Delete many Packages of a company by ID with a single set-based statement
+        :param  - ids: List of Package IDs
+                - empresa_id: ID of the Packages company
+        :return - List of results in the same order, with the error code 'not_found' for unknown IDs
+        """
 
-        return False
+        if not ids:
+            return []
+
+        table = PackageModel.__table__
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
+            try:
+                found = set(
+                    db_connection.session.execute(
+                        select(table.c.id).where(
+                            table.c.empresa_id == empresa_id, table.c.id.in_(ids)
+                        )
+                    ).scalars()
+                )
+                if found:
+                    db_connection.session.execute(
+                        delete(table).where(
+                            table.c.empresa_id == empresa_id, table.c.id.in_(found)
+                        )
+                    )
+                    PackageCounts.adjust(
+                        db_connection.session, {empresa_id: -len(found)}
+                    )
+                    PackageCache.invalidate(empresa_id, found)
+                    PackageSharedCache.invalidate(db_connection.session, empresa_id)
+                db_connection.commit()
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
+
+        return [
+            (
+                PackageWriteResult(index, id, True)
+                if id in found
+                else PackageWriteResult(index, id, False, "not_found")
+            )
+            for index, id in enumerate(ids)
+        ]
+
+    @classmethod
+    def delete_packages_by_filter(
+        cls, empresa_id: str, name: str = "", symbol: str = ""
+    ) -> int:
+        """
+        Delete every Package of a company matching the name and symbol filters with a single statement
+        :param  - empresa_id: ID of the Packages company
+                - name: (Optional) The name filter of select_packages()
+                - symbol: (Optional) The symbol filter of select_packages()
+        :return - Count of deleted Packages
+        """
+
+        if not empresa_id:
+            raise ValueError("empresa_id is required")
+
+        statement = delete(PackageModel.__table__).where(
+            *PackageStatements.filter_criteria(name != "", symbol != "")
+        )
+        parameters = PackageStatements.filter_parameters(empresa_id, name, symbol)
+
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
+            try:
+                result = db_connection.session.execute(statement, parameters)
+                PackageCounts.adjust(
+                    db_connection.session, {empresa_id: -result.rowcount}
+                )
+                PackageCache.invalidate(empresa_id)
+                PackageSharedCache.invalidate(db_connection.session, empresa_id)
+                db_connection.commit()
+                return result.rowcount
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
 
     @classmethod
     def select_packages(
@@ -169,114 +648,505 @@ class PackageRepository(PackageRepositoryInterface):
         order: str = "desc",
         limit: int = 10,
         page: int = 0,
+        cursor: str = None,
+        fields: List[str] = None,
+        include: List[str] = None,
     ) -> List[Package]:
         """
         Search Package by company and filter by name and/or desciption
         :param  - empresa_id: ID of the Package company
                 - name: The name of the Package
                 - symbol: The symbols of the Package
-                - column: (Optional) The column name where is desired to order results. Default is 'created_at' attribute
+                - column: (Optional) The column name where is desired to order results, or 'relevance' to order by match quality of the name or symbol filter. Default is 'created_at' attribute
                 - order: (Optional) The order where is desired to order results 'asc|desc'. Default is 'desc'
                 - limit: (Optional) The total count of found records. Default is 10
                 - page: (Optional) The index of current page requestes. Default is 0
+                - cursor: (Optional) A cursor built by build_cursor(), the page starts after it and page is ignored
+                - fields: (Optional) Package attributes to load, the others are None. Default loads every attribute
+                - include: (Optional) Relationships embedded in each Package, as ['products'], loaded by one query per page. Default embeds none
         :return - List of found Package
         """
 
-        attribute = getattr(PackageModel, column)
-        order_by_attribute = attribute.desc() if order == "desc" else attribute.asc()
         query_data = None
 
-        with DBConnectionHandler() as db_connection:
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
             try:
-                query_data = (
-                    db_connection.session.query(PackageModel)
-                    .filter(
-                        PackageModel.empresa_id == empresa_id,
-                        PackageModel.name.ilike("%" + name + "%"),
-                        PackageModel.symbol.ilike("%" + symbol + "%")
-                        if symbol != ""
-                        else True,
-                    )
-                    .order_by(order_by_attribute)
-                    .limit(limit)
-                    .offset(page)
-                ).all()
-                return list(
-                    map(
-                        lambda instance: cls.__build_entity_to_domain_interface(
-                            instance
-                        ),
-                        query_data,
-                    )
+                statement, parameters, projection = cls.__build_list_statement(
+                    db_connection,
+                    False,
+                    empresa_id,
+                    name,
+                    symbol,
+                    column,
+                    order,
+                    limit,
+                    page,
+                    cursor,
+                    fields,
+                    include,
+                )
+                query_data = db_connection.session.execute(statement, parameters).all()
+                return cls.__build_list_records(
+                    query_data, projection, PackageStatements.includes(include)
                 )
             except NoResultFound:
                 return []
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
+
+    @classmethod
+    def select_packages_with_total(
+        cls,
+        empresa_id: str,
+        name: str = "",
+        symbol: str = "",
+        column: str = "created_at",
+        order: str = "desc",
+        limit: int = 10,
+        page: int = 0,
+        cursor: str = None,
+        fields: List[str] = None,
+        include: List[str] = None,
+    ) -> Tuple[List[Package], int]:
+        """
+        Search Package by company and filter by name and/or desciption, retrieving the page and the
+        total count of the filter. A filtered total cached by count_packages() is reused, otherwise
+        the page and the total are read in a single statement, unfiltered totals coming from the
+        company counter. Pages without relationships are served from PackageSharedCache when cached
+        :param  - empresa_id: ID of the Package company
+                - name: The name of the Package
+                - symbol: The symbols of the Package
+                - column: (Optional) The column name where is desired to order results, or 'relevance' to order by match quality of the name or symbol filter. Default is 'created_at' attribute
+                - order: (Optional) The order where is desired to order results 'asc|desc'. Default is 'desc'
+                - limit: (Optional) The total count of found records. Default is 10
+                - page: (Optional) The index of current page requestes. Default is 0
+                - cursor: (Optional) A cursor built by build_cursor(), the page starts after it and page is ignored
+                - fields: (Optional) Package attributes to load, the others are None. Default loads every attribute
+                - include: (Optional) Relationships embedded in each Package, as ['products'], loaded by one query per page. Default embeds none
+        :return - A tuple with the list of found Package and the total count of query result
+        """
+
+        cache_key = None
+        if not PackageStatements.includes(include) and cls.__uses_cache():
+            cached, cache_key = PackageSharedCache.read(
+                empresa_id,
+                "list",
+                [name, symbol, column, order, limit, page, cursor, fields],
+            )
+            if cached is not None:
+                records = [PackageRecord(**record) for record in cached["records"]]
+                return records, cached["total"]
+
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
+            try:
+                # The unfiltered total is read by the page statement from the company counter
+                total = (
+                    PackageCounts.get(empresa_id, name, symbol)
+                    if name != "" or symbol != ""
+                    else None
+                )
+                statement, parameters, projection = cls.__build_list_statement(
+                    db_connection,
+                    total is None,
+                    empresa_id,
+                    name,
+                    symbol,
+                    column,
+                    order,
+                    limit,
+                    page,
+                    cursor,
+                    fields,
+                    include,
+                )
+                rows = db_connection.session.execute(statement, parameters).all()
+                records = cls.__build_list_records(
+                    rows, projection, PackageStatements.includes(include)
+                )
+                if total is None and rows:
+                    total = rows[0].total
+                    if name != "" or symbol != "":
+                        PackageCounts.put(empresa_id, name, symbol, total)
+                elif total is None:
+                    # An empty page carries no total row, so the filter is counted apart
+                    total = cls.__count_packages(
+                        db_connection, empresa_id, name, symbol
+                    )
+                if not db_connection.on_reader:
+                    PackageSharedCache.write(
+                        cache_key,
+                        {
+                            "records": [record.to_dict() for record in records],
+                            "total": total,
+                        },
+                    )
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
+
+        return records, total
+
+    @classmethod
+    def __build_list_statement(
+        cls,
+        db_connection: DBConnectionHandler,
+        with_total: bool,
+        empresa_id: str,
+        name: str,
+        symbol: str,
+        column: str,
+        order: str,
+        limit: int,
+        page: int,
+        cursor: str,
+        fields: List[str] = None,
+        include: List[str] = None,
+    ) -> Tuple:
+        """
+        Pick the cached list statement of a query shape and build its bound parameters
+        :param  - db_connection: The open connection handler running the statement
+                - with_total: If the statement also returns the 'total' column
+                - empresa_id, name, symbol, column, order, limit, page, cursor, fields, include: See select_packages()
+        :return - A tuple with the statement, its parameters and the projected column names, None
+                    when every column or whole entities are loaded
+        """
+
+        has_name = name != ""
+        has_symbol = symbol != ""
+        if column == PackageSearch.RELEVANCE and not (has_name or has_symbol):
+            column = "created_at"
+        if (
+            column != PackageSearch.RELEVANCE
+            and column not in PackageStatements.SORT_COLUMNS
+        ):
+            raise ValueError("Unknown sort column: {}".format(column))
+
+        keyset = bool(cursor)
+        projection = None if include else PackageStatements.projection(fields, column)
+        indexed = PackageSearch.uses_shadow_table(
+            db_connection.session.get_bind(), name, symbol
+        )
+        build_statement = (
+            PackageStatements.select_packages_with_total
+            if with_total
+            else PackageStatements.select_packages
+        )
+        statement = build_statement(
+            column,
+            order,
+            has_name=has_name,
+            has_symbol=has_symbol,
+            keyset=keyset,
+            indexed=indexed,
+            fields=projection,
+            include=PackageStatements.includes(include),
+        )
+
+        parameters = PackageStatements.filter_parameters(
+            empresa_id, name, symbol, indexed
+        )
+        parameters.update(limit=limit)
+        if keyset:
+            cursor_value, cursor_id = PackageCursor.decode(cursor, column, order)
+            parameters.update(cursor_value=cursor_value, cursor_id=cursor_id)
+        else:
+            parameters.update(offset=page)
+        if column == PackageSearch.RELEVANCE:
+            parameters.update(PackageSearch.relevance_parameters(name, symbol))
+
+        return statement, parameters, projection
+
+    @classmethod
+    def build_cursor(
+        cls, package: Package, column: str = "created_at", order: str = "desc"
+    ) -> str:
+        """
+        Build the cursor of the page that starts after a Package
+        :param  - package: The last Package of the current page
+                - column: (Optional) The column name used to order results. Default is 'created_at' attribute
+                - order: (Optional) The order direction 'asc|desc'. Default is 'desc'
+        :return - An opaque cursor, or None when the column does not support cursor pagination
+        """
+
+        if package is None or not PackageCursor.supports(column):
+            return None
+
+        return PackageCursor.encode(column, order, getattr(package, column), package.id)
 
     @classmethod
     def count_packages(self, empresa_id: str, name: str = "", symbol: str = "") -> int:
         """
-        Retrieve count of results in query by company and filter by key attributes
+        Retrieve count of results in query by company and filter by key attributes. The unfiltered
+        count is read from the company counter, filtered counts are cached by PackageCounts
         :param  - empresa_id: ID of Package company
                 - name: The name of Package
         :return - A total count of query result
         """
 
-        with DBConnectionHandler() as db_connection:
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
             try:
-                count = (
-                    db_connection.session.query(PackageModel)
-                    .filter(
-                        PackageModel.empresa_id == empresa_id,
-                        PackageModel.name.ilike("%" + name + "%"),
-                        PackageModel.symbol.ilike("%" + symbol + "%")
-                        if symbol != ""
-                        else True,
-                    )
-                    .count()
-                )
-                return count
+                return self.__count_packages(db_connection, empresa_id, name, symbol)
             except NoResultFound:
                 return []
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
 
     @classmethod
-    def get_package(cls, id: str, empresa_id: str) -> Package:
+    def __known_total(
+        cls, db_connection: DBConnectionHandler, empresa_id: str, name: str, symbol: str
+    ) -> int:
+        """
+        Return a count known without scanning Packages
+        :param  - db_connection: The open connection handler
+                - empresa_id, name, symbol: See count_packages()
+        :return - The company counter when unfiltered, else the cached filtered count, or None
+        """
+
+        if name == "" and symbol == "":
+            return PackageCounts.read_counter(db_connection.session, empresa_id)
+
+        return PackageCounts.get(empresa_id, name, symbol)
+
+    @classmethod
+    def __count_packages(
+        cls, db_connection: DBConnectionHandler, empresa_id: str, name: str, symbol: str
+    ) -> int:
+        total = cls.__known_total(db_connection, empresa_id, name, symbol)
+        if total is not None:
+            return total
+
+        indexed = PackageSearch.uses_shadow_table(
+            db_connection.session.get_bind(), name, symbol
+        )
+        statement = PackageStatements.count_packages(
+            has_name=name != "", has_symbol=symbol != "", indexed=indexed
+        )
+        parameters = PackageStatements.filter_parameters(
+            empresa_id, name, symbol, indexed
+        )
+        total = db_connection.session.execute(statement, parameters).scalar()
+        if name != "" or symbol != "":
+            PackageCounts.put(empresa_id, name, symbol, total)
+        return total
+
+    @classmethod
+    def get_package(
+        cls, id: str, empresa_id: str, include: List[str] = None
+    ) -> Package:
         """
         Retrieve Package by ID and company ID
         :param  - id: ID of the Package
                 - empresa_id: ID of the Package company
-        :return - A found Package by ID
+                - include: (Optional) Relationships embedded in the Package, as ['products']. Default embeds none
+        :return - A found PackageRecord by ID, read without ORM entities unless relationships are
+                    included. Packages without relationships are served from PackageCache, then from
+                    PackageSharedCache, when cached
         """
 
+        include = PackageStatements.includes(include)
+        cacheable = not include and cls.__uses_cache()
+        cache_key = None
+        version = None
+        if cacheable:
+            # Local hits are only trusted under the current shared version of the company
+            version = PackageSharedCache.version(empresa_id)
+            cached = PackageCache.get(empresa_id, id, version)
+            if cached is not None:
+                return cached
+
+            if version is not None:
+                shared, cache_key = PackageSharedCache.read(
+                    empresa_id, "get", [id], version
+                )
+                if shared is not None:
+                    record = PackageRecord(**shared)
+                    PackageCache.put(record, version)
+                    return record
+
         query_data = None
-        with DBConnectionHandler() as db_connection:
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
             try:
+                if not include:
+                    row = db_connection.session.execute(
+                        PackageStatements.get_package(),
+                        {"id": id, "empresa_id": empresa_id},
+                    ).first()
+                    if row is None:
+                        return None
+
+                    record = PackageRecord.from_row(row)
+                    if cacheable:
+                        cls.__cache_record(db_connection, record, version, cache_key)
+                    return record
+
                 query_data = (
-                    db_connection.session.query(PackageModel).filter(
+                    db_connection.session.query(PackageModel)
+                    .options(*PackageStatements.loader_options(include))
+                    .filter(
                         PackageModel.id == id, PackageModel.empresa_id == empresa_id
                     )
                 ).first()
                 if query_data is not None:
-                    return cls.__build_entity_to_domain_interface(query_data)
+                    return cls.__build_entity_to_domain_interface(query_data, include)
             except NoResultFound:
                 return []
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
 
         return None
 
+    @classmethod
+    def __uses_cache(cls) -> bool:
+        """
+        Return if reads can be served from and stored into the caches, which excludes reads of a
+        UnitOfWork that may write: they must see its own writes, that may still be rolled back
+        :param  - None
+        :return - If reads see committed data only
+        """
+
+        unit_of_work = UnitOfWork.current()
+        return unit_of_work is None or unit_of_work.read_only
+
+    @classmethod
+    def __cache_record(
+        cls,
+        db_connection: DBConnectionHandler,
+        record: PackageRecord,
+        version: str,
+        cache_key: str,
+    ) -> None:
+        """
+        Cache a Package read from the database. A reader may lag behind the write that produced
+        the current version, so its rows are never stored under a version, and only kept for
+        PACKAGE_CACHE_SECONDS by this container while the shared cache is unavailable
+        :param  - db_connection: The open connection handler that read the Package
+                - record: The PackageRecord read
+                - version: The shared version read before the database, None when unavailable
+                - cache_key: The shared cache key returned by PackageSharedCache.read()
+        :return - None
+        """
+
+        if not db_connection.on_reader:
+            PackageCache.put(record, version)
+            PackageSharedCache.write(cache_key, record.to_dict())
+        elif version is None:
+            PackageCache.put(record)
+
+    @classmethod
+    def get_packages(cls, ids: List[str], empresa_id: str) -> List[PackageRecord]:
+        """
+        Retrieve many Packages of a company by ID, with one IN query per GET_PACKAGES_CHUNK_SIZE IDs
+        :param  - ids: List of Package IDs, duplicates are read once
+                - empresa_id: ID of the Packages company
+        :return - List of found PackageRecord in the order of ids, unknown IDs being left out
+        """
+
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+
+        found = {}
+        statement = PackageStatements.get_packages()
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
+            try:
+                for start in range(0, len(ids), cls.GET_PACKAGES_CHUNK_SIZE):
+                    rows = db_connection.session.execute(
+                        statement,
+                        {
+                            "empresa_id": empresa_id,
+                            "ids": ids[start : start + cls.GET_PACKAGES_CHUNK_SIZE],
+                        },
+                    )
+                    for row in rows:
+                        found[row[0]] = PackageRecord.from_row(row)
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
+
+        return [found[id] for id in ids if id in found]
+
+    @classmethod
+    def existing_package_ids(cls, ids: List[str], empresa_id: str) -> set:
+        """
+        Return which IDs already belong to Packages of a company. Reads from the primary, so
+        rows committed by another container are always seen
+        :param  - ids: List of Package IDs
+                - empresa_id: ID of the Packages company
+        :return - A set with the existing IDs
+        """
+
+        if not ids:
+            return set()
+
+        table = PackageModel.__table__
+        with DBConnectionHandler(empresa_id=empresa_id) as db_connection:
+            try:
+                return set(
+                    db_connection.session.execute(
+                        select(table.c.id).where(
+                            table.c.empresa_id == empresa_id, table.c.id.in_(ids)
+                        )
+                    ).scalars()
+                )
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
+
+    @classmethod
+    def stream_packages(
+        cls, empresa_id: str, batch_size: int = 1000
+    ) -> Iterator[List[dict]]:
+        """
+        Read every Package of a company in batches through a server-side cursor, so memory is
+        bounded by one batch whatever the company size. The connection stays open until the
+        iterator is exhausted or closed
+        :param  - empresa_id: ID of the Package company
+                - batch_size: (Optional) Rows fetched per batch. Default is 1000
+        :return - An iterator of lists of dictionaries with every Package column, oldest first
+        """
+
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
+            try:
+                result = db_connection.session.execute(
+                    PackageStatements.export_packages(),
+                    {"empresa_id": empresa_id},
+                    execution_options={"stream_results": True, "yield_per": batch_size},
+                )
+                for partition in result.mappings().partitions(batch_size):
+                    yield [dict(row) for row in partition]
+            except:
+                db_connection.rollback()
+                raise
+            finally:
+                db_connection.close()
+
     @classmethod
     def select_packages_by_json_name(
         cls,
@@ -308,7 +1178,9 @@ class PackageRepository(PackageRepositoryInterface):
             )
 
         query_data = None
-        with DBConnectionHandler() as db_connection:
+        with DBConnectionHandler(
+            read_only=True, empresa_id=empresa_id
+        ) as db_connection:
             try:
                 query_data = (
                     db_connection.session.query(PackageModel).filter(query)
@@ -318,9 +1190,9 @@ class PackageRepository(PackageRepositoryInterface):
             except NoResultFound:
                 return []
             except:
-                db_connection.session.rollback()
+                db_connection.rollback()
                 raise
             finally:
-                db_connection.session.close()
+                db_connection.close()
 
         return None
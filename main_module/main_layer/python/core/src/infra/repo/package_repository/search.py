@@ -0,0 +1,225 @@
+import threading
+from typing import Dict, List
+from sqlalchemy import (
+    bindparam,
+    case,
+    column,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+)
+from sqlalchemy.engine import Connection, Engine
+from core.src.infra.entities import Package as PackageModel
+
+
+class PackageSearch:
+    """
+    Indexed substring search of Package name and symbol.
+    PostgreSQL serves the existing ILIKE '%term%' filters from pg_trgm GIN indexes, kept in sync by
+    the database. SQLite has no index able to serve them, so Packages are mirrored in the FTS5
+    'packages_fts' trigram table, kept in sync by triggers, and filtered with MATCH.
+    Both backends need at least 3 characters per term, shorter terms fall back to ILIKE
+    """
+
+    MIN_TERM_LENGTH = 3
+    SHADOW_TABLE = "packages_fts"
+    KEYS_TABLE = "packages_fts_keys"
+    RELEVANCE = "relevance"
+
+    POSTGRESQL_DDL = [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_packages_name_trgm ON packages USING gin (name gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_packages_symbol_trgm ON packages USING gin (symbol gin_trgm_ops)",
+    ]
+
+    SQLITE_DROP = [
+        "DROP TRIGGER IF EXISTS packages_fts_insert",
+        "DROP TRIGGER IF EXISTS packages_fts_delete",
+        "DROP TRIGGER IF EXISTS packages_fts_update",
+        "DROP TABLE IF EXISTS packages_fts",
+    ]
+
+    SQLITE_DDL = [
+        """
+        CREATE TABLE IF NOT EXISTS packages_fts_keys (
+            docid INTEGER PRIMARY KEY, id VARCHAR(36) NOT NULL UNIQUE
+        )
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS packages_fts USING fts5(
+            name, symbol, tokenize='trigram'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS packages_fts_insert AFTER INSERT ON packages BEGIN
+            INSERT INTO packages_fts_keys(id) VALUES (new.id);
+            INSERT INTO packages_fts(rowid, name, symbol) VALUES (
+                (SELECT docid FROM packages_fts_keys WHERE id = new.id), new.name, new.symbol
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS packages_fts_delete AFTER DELETE ON packages BEGIN
+            DELETE FROM packages_fts
+            WHERE rowid = (SELECT docid FROM packages_fts_keys WHERE id = old.id);
+            DELETE FROM packages_fts_keys WHERE id = old.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS packages_fts_update AFTER UPDATE OF id, name, symbol ON packages BEGIN
+            UPDATE packages_fts_keys SET id = new.id WHERE id = old.id;
+            UPDATE packages_fts SET name = new.name, symbol = new.symbol
+            WHERE rowid = (SELECT docid FROM packages_fts_keys WHERE id = new.id);
+        END
+        """,
+    ]
+
+    SQLITE_FILL = [
+        "INSERT INTO packages_fts_keys(id) SELECT id FROM packages",
+        """
+        INSERT INTO packages_fts(rowid, name, symbol)
+        SELECT packages_fts_keys.docid, packages.name, packages.symbol
+        FROM packages JOIN packages_fts_keys ON packages_fts_keys.id = packages.id
+        """,
+    ]
+
+    _installed: Dict[str, bool] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def install(cls, connection: Connection) -> None:
+        """
+        Create the search indexes of the connection dialect. Safe to run on existing databases,
+        a new SQLite shadow table is filled from the current Packages and replaces a shadow table
+        keyed by the packages rowid
+        :param  - connection: An open connection
+        :return - None
+        """
+
+        dialect = connection.dialect.name
+        if dialect == "sqlite":
+            created = not cls.__has_shadow_table(connection)
+            if created:
+                for statement in cls.SQLITE_DROP:
+                    connection.exec_driver_sql(statement)
+            for statement in cls.SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+            if created:
+                for statement in cls.SQLITE_FILL:
+                    connection.exec_driver_sql(statement)
+        elif dialect == "postgresql":
+            for statement in cls.POSTGRESQL_DDL:
+                connection.exec_driver_sql(statement)
+
+        with cls._lock:
+            cls._installed.pop(str(connection.engine.url), None)
+
+    @classmethod
+    def uses_shadow_table(cls, engine: Engine, name: str, symbol: str) -> bool:
+        """
+        Return if the name and symbol filters can be served by the SQLite shadow table
+        :param  - engine: The engine running the query
+                - name: The name filter, empty to ignore
+                - symbol: The symbol filter, empty to ignore
+        :return - If the query should filter with match_criteria()
+        """
+
+        terms = [term for term in (name, symbol) if term]
+        if engine.dialect.name != "sqlite" or not terms:
+            return False
+
+        if any(len(term) < cls.MIN_TERM_LENGTH for term in terms):
+            return False
+
+        key = str(engine.url)
+        installed = cls._installed.get(key)
+        if installed is None:
+            with engine.connect() as connection:
+                installed = cls.__has_shadow_table(connection)
+            with cls._lock:
+                cls._installed[key] = installed
+
+        return installed
+
+    @classmethod
+    def match_criteria(cls):
+        """
+        Build the criteria selecting Packages of the shadow table that match the 'search' parameter
+        :param  - None
+        :return - The criteria
+        """
+
+        shadow_table = table(cls.SHADOW_TABLE, column("rowid"))
+        keys_table = table(cls.KEYS_TABLE, column("docid"), column("id"))
+        matches = (
+            select(keys_table.c.id)
+            .join(shadow_table, shadow_table.c.rowid == keys_table.c.docid)
+            .where(literal_column(cls.SHADOW_TABLE).op("MATCH")(bindparam("search")))
+        )
+        return PackageModel.id.in_(matches)
+
+    @classmethod
+    def match_expression(cls, name: str, symbol: str) -> str:
+        """
+        Build the FTS5 query of the name and symbol filters, each one matched as a substring of its column
+        :param  - name: The name filter, empty to ignore
+                - symbol: The symbol filter, empty to ignore
+        :return - The 'search' parameter of match_criteria()
+        """
+
+        phrases = [
+            '{} : "{}"'.format(field, term.replace('"', '""'))
+            for field, term in (("name", name), ("symbol", symbol))
+            if term
+        ]
+        return " AND ".join(phrases)
+
+    @classmethod
+    def relevance_order(cls, has_name: bool) -> List:
+        """
+        Build the relevance ordering of filtered Packages: exact matches first, then prefix matches,
+        then shorter values, using the name filter or else the symbol one
+        :param  - has_name: If the name filter is applied
+        :return - List of order by clauses, bound by relevance_parameters()
+        """
+
+        attribute = PackageModel.name if has_name else PackageModel.symbol
+        return [
+            case(
+                (attribute.ilike(bindparam("relevance_exact")), 0),
+                (attribute.ilike(bindparam("relevance_prefix")), 1),
+                else_=2,
+            ),
+            func.length(attribute),
+        ]
+
+    @classmethod
+    def relevance_parameters(cls, name: str, symbol: str) -> dict:
+        """
+        Build the bound parameters of relevance_order()
+        :param  - name: The name filter, empty to ignore
+                - symbol: The symbol filter, empty to ignore
+        :return - Dictionary of bound parameters
+        """
+
+        term = name or symbol
+        return {"relevance_exact": term, "relevance_prefix": term + "%"}
+
+    @classmethod
+    def __has_shadow_table(cls, connection: Connection) -> bool:
+        return (
+            connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (cls.KEYS_TABLE,),
+            ).first()
+            is not None
+        )
+
+
+event.listen(
+    PackageModel.__table__,
+    "after_create",
+    lambda target, connection, **kw: PackageSearch.install(connection),
+)
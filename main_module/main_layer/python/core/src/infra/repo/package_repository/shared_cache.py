@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Hashable, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from core.src.infra.cache import CACHE_BACKENDS, CacheBackend
+
+
+class PackageSharedCache:
+    """
+    Read-through cache of the Packages read by ID and of the list pages, shared by every container
+    through a cache server. Keys embed a version of the company that is incremented after each
+    committed write, so a write of any container makes the cached reads of the company unreachable
+    and they expire after PACKAGE_SHARED_CACHE_SECONDS. The version is read before the database,
+    so a read racing a write is stored under the old version. Versions are kept per container for
+    PACKAGE_SHARED_CACHE_VERSION_SECONDS, so writes of other containers are seen after at most
+    that time, while writes of this container are seen at once. Backend failures, including a
+    backend that cannot be built, are logged, counted and served as misses.
+    Environment:
+        - PACKAGE_SHARED_CACHE_URL: Backend url, as 'redis://host:6379/0' or 'memory://name'.
+            The cache is disabled when unset
+        - PACKAGE_SHARED_CACHE_SECONDS: TTL of cached reads (default 300)
+        - PACKAGE_SHARED_CACHE_VERSION_SECONDS: TTL of the versions kept per container
+            (default 1, 0 reads the version on every call)
+    """
+
+    PREFIX = "packages"
+    PENDING_KEY = "package_shared_cache_pending"
+    COMMITTED_KEY = "package_shared_cache_committed"
+
+    VERSIONS_SIZE = 4096
+
+    _backends: Dict[str, CacheBackend] = {}
+    _versions: Dict[str, Tuple[str, float]] = {}
+    _broken: Dict[str, str] = {}
+    _lock = threading.Lock()
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "errors": 0, "invalidations": 0}
+
+    @classmethod
+    def ttl(cls) -> int:
+        return int(os.getenv("PACKAGE_SHARED_CACHE_SECONDS") or 300)
+
+    @classmethod
+    def version_ttl(cls) -> float:
+        return float(os.getenv("PACKAGE_SHARED_CACHE_VERSION_SECONDS") or 1)
+
+    @classmethod
+    def backend(cls) -> CacheBackend:
+        """
+        Return the backend of PACKAGE_SHARED_CACHE_URL, created once per process. A backend that
+        cannot be built, as an unknown scheme or a missing client package, is logged once and
+        leaves the cache disabled
+        :param  - None
+        :return - The backend, or None when the cache is disabled or unavailable
+        """
+
+        url = os.getenv("PACKAGE_SHARED_CACHE_URL")
+        if not url or url in cls._broken:
+            return None
+
+        backend = cls._backends.get(url)
+        if backend is not None:
+            return backend
+
+        with cls._lock:
+            backend = cls._backends.get(url)
+            if backend is None and url not in cls._broken:
+                try:
+                    scheme = url.split("://", 1)[0]
+                    if scheme not in CACHE_BACKENDS:
+                        raise ValueError("Unknown cache backend: {}".format(scheme))
+                    backend = CACHE_BACKENDS[scheme](url)
+                    cls._backends[url] = backend
+                except Exception as error:
+                    cls._broken[url] = repr(error)
+                    cls._stats["errors"] += 1
+                    cls.__log("backend unavailable", error)
+        return backend
+
+    @classmethod
+    def version(cls, empresa_id: str) -> str:
+        """
+        Read the current version of a company, incremented after each committed write, from the
+        versions kept by this container while they are fresh
+        :param  - empresa_id: ID of the Packages company
+        :return - The version, or None when the cache is disabled or unavailable
+        """
+
+        backend = cls.backend()
+        if backend is None:
+            return None
+
+        entry = cls._versions.get(empresa_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        try:
+            version = backend.get_many([cls.__version_key(empresa_id)])[0] or "0"
+        except Exception:
+            cls._stats["errors"] += 1
+            return None
+
+        cls.__keep_version(empresa_id, version)
+        return version
+
+    @classmethod
+    def read(
+        cls,
+        empresa_id: str,
+        kind: str,
+        parameters: Sequence[Hashable],
+        version: str = None,
+    ) -> Tuple:
+        """
+        Read a cached value under the current version of a company
+        :param  - empresa_id: ID of the Packages company
+                - kind: The cached read, as 'get' or 'list'
+                - parameters: The read parameters, JSON serializable
+                - version: (Optional) The company version returned by version(). Default reads it
+        :return - A tuple with the decoded value, None on a miss, and the key where the value
+                    read from the database is written, None when the cache is unavailable
+        """
+
+        backend = cls.backend()
+        if backend is None:
+            return None, None
+
+        try:
+            if version is None:
+                version = backend.get_many([cls.__version_key(empresa_id)])[0] or "0"
+            digest = hashlib.sha1(
+                json.dumps(list(parameters), default=str).encode("utf-8")
+            ).hexdigest()
+            key = "{}:{}:{}:{}:{}".format(cls.PREFIX, empresa_id, version, kind, digest)
+            value = backend.get_many([key])[0]
+        except Exception:
+            cls._stats["errors"] += 1
+            return None, None
+
+        if value is None:
+            cls._stats["misses"] += 1
+            return None, key
+
+        cls._stats["hits"] += 1
+        return json.loads(value), key
+
+    @classmethod
+    def write(cls, key: str, value) -> None:
+        """
+        Cache a value read from the database
+        :param  - key: The key returned by read(), None to skip
+                - value: The JSON serializable value
+        :return - None
+        """
+
+        if key is None:
+            return
+
+        try:
+            cls.backend().set(key, json.dumps(value, default=str), cls.ttl())
+        except Exception:
+            cls._stats["errors"] += 1
+
+    @classmethod
+    def invalidate(cls, session: Session, *empresa_ids: str) -> None:
+        """
+        Increment the versions of companies once the session commits, dropping them on rollback
+        :param  - session: The session of the write
+                - empresa_ids: IDs of the companies whose Packages changed
+        :return - None
+        """
+
+        if cls.backend() is None:
+            return
+
+        session.info.setdefault(cls.PENDING_KEY, set()).update(empresa_ids)
+
+    @classmethod
+    def committed_version(cls, session: Session, empresa_id: str) -> str:
+        """
+        Return the version a committed write of the session incremented for a company, so the
+        written Packages can be cached under it
+        :param  - session: The session of the committed write
+                - empresa_id: ID of the Packages company
+        :return - The version, or None when the cache is disabled or the increment failed
+        """
+
+        return session.info.get(cls.COMMITTED_KEY, {}).get(empresa_id)
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """
+        Return cache counters
+        :param  - None
+        :return - Dictionary with 'hits', 'misses', 'errors' and 'invalidations'
+        """
+
+        return dict(cls._stats)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Forget the backends and clear counters, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            cls._backends.clear()
+            cls._broken.clear()
+            cls._versions.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def _after_commit(cls, session: Session) -> None:
+        session.info.pop(cls.COMMITTED_KEY, None)
+        pending = session.info.pop(cls.PENDING_KEY, None)
+        if not pending:
+            return
+
+        backend = cls.backend()
+        if backend is None:
+            return
+
+        committed = session.info.setdefault(cls.COMMITTED_KEY, {})
+        for empresa_id in pending:
+            try:
+                version = str(backend.incr(cls.__version_key(empresa_id)))
+                committed[empresa_id] = version
+                cls.__keep_version(empresa_id, version)
+                cls._stats["invalidations"] += 1
+            except Exception as error:
+                # Cached reads of the company stay reachable until they expire
+                cls._stats["errors"] += 1
+                cls.__log("version of {} not incremented".format(empresa_id), error)
+
+    @classmethod
+    def _after_rollback(cls, session: Session) -> None:
+        session.info.pop(cls.PENDING_KEY, None)
+
+    @classmethod
+    def __keep_version(cls, empresa_id: str, version: str) -> None:
+        now = time.monotonic()
+        with cls._lock:
+            if len(cls._versions) >= cls.VERSIONS_SIZE:
+                for key in [
+                    key for key, entry in cls._versions.items() if entry[1] <= now
+                ]:
+                    del cls._versions[key]
+            cls._versions[empresa_id] = (version, now + cls.version_ttl())
+
+    @classmethod
+    def __log(cls, message: str, error: Exception) -> None:
+        print("[LOG] - PackageSharedCache {}: {!r}".format(message, error))
+
+    @classmethod
+    def __version_key(cls, empresa_id: str) -> str:
+        return "{}:{}:version".format(cls.PREFIX, empresa_id)
+
+
+event.listen(Session, "after_commit", PackageSharedCache._after_commit)
+event.listen(Session, "after_rollback", PackageSharedCache._after_rollback)
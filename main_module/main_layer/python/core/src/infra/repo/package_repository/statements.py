@@ -0,0 +1,445 @@
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Tuple
+from sqlalchemy import bindparam, event, func, select, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.sql import Select
+from core.src.infra.config import EngineRegistry
+from core.src.infra.config.db_env import env_flag
+from core.src.infra.entities import Package as PackageModel, PackageCounter
+from core.src.infra.migrations import QueryShape
+from .search import PackageSearch
+
+
+class PackageStatements:
+    """
+    Cache of the hot Package list and count statements. Each query shape is built once per
+    container with bound parameters, so Sqlalchemy reuses its compiled SQL on every call.
+    QUERY_SHAPES declares the filter and order columns of each query, checked by IndexAdvisor.
+    The list shapes are derived from SORT_COLUMNS, the only columns lists can be ordered by
+    """
+
+    INCLUDES = ("products",)
+
+    SORT_COLUMNS = ("created_at", "updated_at", "name", "symbol", "id")
+
+    QUERY_SHAPES = [
+        QueryShape("get_package", ("id",), ()),
+        QueryShape("get_packages", ("id",), ()),
+        QueryShape("count_packages", ("empresa_id",), ()),
+        *(
+            QueryShape(
+                "select_packages:{}".format(column),
+                ("empresa_id",),
+                (column, "id") if column != "id" else ("id",),
+            )
+            for column in SORT_COLUMNS
+        ),
+        QueryShape("export_packages", ("empresa_id",), ("created_at", "id")),
+    ]
+
+    _statements: Dict[Hashable, Select] = {}
+    _statement_ids: set = set()
+    _lock = threading.RLock()
+    _stats: Dict[str, int] = {
+        "hits": 0,
+        "misses": 0,
+        "compiled_hits": 0,
+        "compiled_misses": 0,
+    }
+
+    @classmethod
+    def get(cls, key: Hashable, builder: Callable[[], Select]) -> Select:
+        """
+        Return the statement cached by key, building it only on the first call
+        :param  - key: The query shape
+                - builder: A callable without arguments that builds the statement
+        :return - The cached statement
+        """
+
+        statement = cls._statements.get(key)
+        if statement is not None:
+            cls._stats["hits"] += 1
+            return statement
+
+        with cls._lock:
+            statement = cls._statements.get(key)
+            if statement is None:
+                statement = builder()
+                cls._statements[key] = statement
+                cls._statement_ids.add(id(statement))
+                cls._stats["misses"] += 1
+            else:
+                cls._stats["hits"] += 1
+
+        return statement
+
+    @classmethod
+    def filter_criteria(
+        cls, has_name: bool, has_symbol: bool, indexed: bool = False
+    ) -> list:
+        """
+        Build the tenant, name and symbol criteria with bound parameters
+        :param  - has_name: If the name filter is applied
+                - has_symbol: If the symbol filter is applied
+                - indexed: If name and symbol are matched through the PackageSearch shadow table
+        :return - List of criteria
+        """
+
+        criteria = [PackageModel.empresa_id == bindparam("empresa_id")]
+        if indexed:
+            criteria.append(PackageSearch.match_criteria())
+            return criteria
+        if has_name:
+            criteria.append(PackageModel.name.ilike(bindparam("name")))
+        if has_symbol:
+            criteria.append(PackageModel.symbol.ilike(bindparam("symbol")))
+        return criteria
+
+    @classmethod
+    def filter_parameters(
+        cls, empresa_id: str, name: str, symbol: str, indexed: bool = False
+    ) -> dict:
+        """
+        Build the bound parameters of filter_criteria()
+        :param  - empresa_id: ID of the Package company
+                - name: The name filter, empty to ignore
+                - symbol: The symbol filter, empty to ignore
+                - indexed: If name and symbol are matched through the PackageSearch shadow table
+        :return - Dictionary of bound parameters
+        """
+
+        parameters = {"empresa_id": empresa_id}
+        if indexed:
+            parameters["search"] = PackageSearch.match_expression(name, symbol)
+            return parameters
+        if name:
+            parameters["name"] = "%" + name + "%"
+        if symbol:
+            parameters["symbol"] = "%" + symbol + "%"
+        return parameters
+
+    @classmethod
+    def select_packages(
+        cls,
+        column: str,
+        order: str,
+        has_name: bool,
+        has_symbol: bool,
+        keyset: bool = False,
+        indexed: bool = False,
+        fields: Tuple[str, ...] = None,
+        include: Tuple[str, ...] = (),
+    ) -> Select:
+        """
+        Return the paginated list statement ordered by column with id as tie-breaker.
+        Offset pages bind 'limit' and 'offset', keyset pages bind 'limit', 'cursor_value' and 'cursor_id'.
+        The 'relevance' column orders by PackageSearch.relevance_order() and only supports offset pages
+        :param  - column: The column name used to order results, or 'relevance'
+                - order: The order direction 'asc|desc', ignored by 'relevance'
+                - has_name: If the name filter is applied
+                - has_symbol: If the symbol filter is applied
+                - keyset: If the page starts after a cursor instead of an offset
+                - indexed: If name and symbol are matched through the PackageSearch shadow table
+                - fields: (Optional) Columns to load, as returned by projection(). Default loads every column
+                - include: (Optional) Relationships to load, as returned by includes(). Loads whole ORM
+                    entities, so it must be given without fields
+        :return - The cached statement
+        """
+
+        def build() -> Select:
+            if include:
+                entities = [PackageModel]
+            else:
+                entities = cls.columns(fields)
+
+            statement = select(*entities).where(
+                *cls.filter_criteria(has_name, has_symbol, indexed)
+            )
+            if include:
+                statement = statement.options(*cls.loader_options(include))
+
+            if column == PackageSearch.RELEVANCE:
+                statement = statement.order_by(
+                    *PackageSearch.relevance_order(has_name), PackageModel.id.asc()
+                )
+                return statement.limit(bindparam("limit")).offset(bindparam("offset"))
+
+            attribute = getattr(PackageModel, column)
+            descending = order == "desc"
+            if keyset:
+                keyset_columns = tuple_(attribute, PackageModel.id)
+                cursor = tuple_(
+                    bindparam("cursor_value", type_=attribute.type),
+                    bindparam("cursor_id", type_=PackageModel.id.type),
+                )
+                statement = statement.where(
+                    keyset_columns < cursor if descending else keyset_columns > cursor
+                )
+
+            if descending:
+                statement = statement.order_by(attribute.desc(), PackageModel.id.desc())
+            else:
+                statement = statement.order_by(attribute.asc(), PackageModel.id.asc())
+
+            statement = statement.limit(bindparam("limit"))
+            return statement if keyset else statement.offset(bindparam("offset"))
+
+        return cls.get(
+            (
+                "select",
+                column,
+                order,
+                has_name,
+                has_symbol,
+                keyset,
+                indexed,
+                fields,
+                include,
+            ),
+            build,
+        )
+
+    @classmethod
+    def select_packages_with_total(
+        cls,
+        column: str,
+        order: str,
+        has_name: bool,
+        has_symbol: bool,
+        keyset: bool = False,
+        indexed: bool = False,
+        fields: Tuple[str, ...] = None,
+        include: Tuple[str, ...] = (),
+    ) -> Select:
+        """
+        Return the paginated list statement with a 'total' column holding the filtered count.
+        Offset pages count with COUNT(*) OVER(), evaluated before LIMIT and OFFSET. Keyset pages
+        count with a scalar subquery, since the window would only count the rows after the cursor.
+        Unfiltered pages read the company counter in a scalar subquery of the same statement, and
+        only count the rows when the company has no counter yet
+        :param  - column: The column name used to order results
+                - order: The order direction 'asc|desc'
+                - has_name: If the name filter is applied
+                - has_symbol: If the symbol filter is applied
+                - keyset: If the page starts after a cursor instead of an offset
+                - indexed: If name and symbol are matched through the PackageSearch shadow table
+                - fields: (Optional) Columns to load, as returned by projection(). Default loads every column
+                - include: (Optional) Relationships to load, as returned by includes(), without fields
+        :return - The cached statement
+        """
+
+        def build() -> Select:
+            statement = cls.select_packages(
+                column, order, has_name, has_symbol, keyset, indexed, fields, include
+            )
+            if keyset:
+                total = cls.count_packages(has_name, has_symbol, indexed)
+                total = total.scalar_subquery()
+            else:
+                total = func.count().over()
+            if not (has_name or has_symbol):
+                counter = select(PackageCounter.total).where(
+                    PackageCounter.empresa_id == bindparam("empresa_id")
+                )
+                total = func.coalesce(counter.scalar_subquery(), total)
+            return statement.add_columns(total.label("total"))
+
+        return cls.get(
+            (
+                "select_with_total",
+                column,
+                order,
+                has_name,
+                has_symbol,
+                keyset,
+                indexed,
+                fields,
+                include,
+            ),
+            build,
+        )
+
+    @classmethod
+    def columns(cls, fields: Tuple[str, ...] = None) -> list:
+        """
+        Return the Package columns selected by Core statements, read without ORM entities
+        :param  - fields: (Optional) Column names, as returned by projection(). Default is every column
+        :return - List of columns, in table order when every column is selected
+        """
+
+        if fields is None:
+            return list(PackageModel.__table__.columns)
+
+        return [PackageModel.__table__.c[field] for field in fields]
+
+    @classmethod
+    def get_package(cls) -> Select:
+        """
+        Return the statement reading every column of a Package by 'id' and 'empresa_id'
+        :param  - None
+        :return - The cached statement
+        """
+
+        def build() -> Select:
+            return select(*cls.columns()).where(
+                PackageModel.id == bindparam("id"),
+                PackageModel.empresa_id == bindparam("empresa_id"),
+            )
+
+        return cls.get(("get",), build)
+
+    @classmethod
+    def get_packages(cls) -> Select:
+        """
+        Return the statement reading every column of the Packages of a company whose ID is in the
+        expanding 'ids' parameter
+        :param  - None
+        :return - The cached statement
+        """
+
+        def build() -> Select:
+            return select(*cls.columns()).where(
+                PackageModel.empresa_id == bindparam("empresa_id"),
+                PackageModel.id.in_(bindparam("ids", expanding=True)),
+            )
+
+        return cls.get(("get_many",), build)
+
+    @classmethod
+    def export_packages(cls) -> Select:
+        """
+        Return the statement reading every Package column of a company, in the order of its
+        (empresa_id, created_at, id) index so the rows can be streamed without sorting
+        :param  - None
+        :return - The cached statement
+        """
+
+        def build() -> Select:
+            return (
+                select(*PackageModel.__table__.columns)
+                .where(PackageModel.empresa_id == bindparam("empresa_id"))
+                .order_by(PackageModel.created_at.asc(), PackageModel.id.asc())
+            )
+
+        return cls.get(("export",), build)
+
+    @classmethod
+    def includes(cls, include: Iterable[str]) -> Tuple[str, ...]:
+        """
+        Normalize the relationships requested to be loaded with Packages
+        :param  - include: Relationship names, None or empty to load none
+        :return - A sorted tuple of relationship names
+        """
+
+        include = set(include or [])
+        unknown = include - set(cls.INCLUDES)
+        if unknown:
+            raise ValueError("Unknown include: {}".format(", ".join(sorted(unknown))))
+
+        return tuple(sorted(include))
+
+    @classmethod
+    def loader_options(cls, include: Tuple[str, ...] = ()) -> list:
+        """
+        Build the loader options of Package queries. Included relationships are loaded by a single
+        extra SELECT ... IN query per page, every other relationship raises instead of lazy loading
+        :param  - include: Relationship names, as returned by includes()
+        :return - List of loader options
+        """
+
+        options = [
+            selectinload(getattr(PackageModel, relationship))
+            for relationship in include
+        ]
+        options.append(raiseload("*"))
+        return options
+
+    @classmethod
+    def projection(cls, fields: Iterable[str], column: str) -> Tuple[str, ...]:
+        """
+        Normalize a field projection into the Package columns to load, in table order. The ID and
+        the order column are always loaded, so projected pages can still build cursors
+        :param  - fields: Package column names, None or empty to load every column
+                - column: The column name used to order results
+        :return - A tuple of column names, or None to load whole entities
+        """
+
+        if not fields:
+            return None
+
+        columns = PackageModel.__table__.columns.keys()
+        unknown = set(fields) - set(columns)
+        if unknown:
+            raise ValueError("Unknown fields: {}".format(", ".join(sorted(unknown))))
+
+        selected = set(fields) | {"id", column}
+        return tuple(name for name in columns if name in selected)
+
+    @classmethod
+    def count_packages(
+        cls, has_name: bool, has_symbol: bool, indexed: bool = False
+    ) -> Select:
+        """
+        Return the count statement, without the subquery wrapper of Query.count()
+        :param  - has_name: If the name filter is applied
+                - has_symbol: If the symbol filter is applied
+                - indexed: If name and symbol are matched through the PackageSearch shadow table
+        :return - The cached statement
+        """
+
+        def build() -> Select:
+            return (
+                select(func.count())
+                .select_from(PackageModel)
+                .where(*cls.filter_criteria(has_name, has_symbol, indexed))
+            )
+
+        return cls.get(("count", has_name, has_symbol, indexed), build)
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """
+        Return statement cache counters. 'hits' and 'misses' count statement builds,
+        'compiled_hits' and 'compiled_misses' count Sqlalchemy compiled SQL reuse on the engines
+        created while DATABASE_STATEMENT_STATS is ENABLED
+        :param  - None
+        :return - Dictionary of counters
+        """
+
+        return dict(cls._stats)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Clear cached statements and counters, mainly used by tests
+        :param  - None
+        :return - None
+        """
+
+        with cls._lock:
+            cls._statements.clear()
+            cls._statement_ids.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    @classmethod
+    def _track_engine(cls, engine: Engine) -> None:
+        if env_flag("DATABASE_STATEMENT_STATS", False):
+            event.listen(engine, "after_cursor_execute", cls._count_compiled_cache)
+
+    @classmethod
+    def _count_compiled_cache(
+        cls, conn, cursor, statement, parameters, context, executemany
+    ):
+        if id(context.invoked_statement) not in cls._statement_ids:
+            return
+
+        if context.cache_hit is CACHE_HIT:
+            cls._stats["compiled_hits"] += 1
+        else:
+            cls._stats["compiled_misses"] += 1
+
+
+EngineRegistry.on_create(PackageStatements._track_engine)
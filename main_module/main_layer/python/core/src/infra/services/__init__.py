@@ -1 +1 @@
-
+from .s3_service import S3Service, S3MultipartWriter
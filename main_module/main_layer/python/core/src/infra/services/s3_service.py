@@ -0,0 +1,241 @@
+import os
+import json
+from typing import Iterator, List
+from .base_service import BaseAWSService
+
+
+class S3Service(BaseAWSService):
+    """Simple Storage Service client for streamed uploads and downloads of large objects"""
+
+    service_name = "s3"
+
+    def open_multipart_writer(
+        self,
+        bucket: str,
+        key: str,
+        content_type: str = "application/octet-stream",
+        part_size: int = None,
+    ) -> "S3MultipartWriter":
+        """
+        Start a multipart upload and return a file-like writer of its parts
+        :param  - bucket: The target bucket name
+                - key: The target object key
+                - content_type: (Optional) The object content type
+                - part_size: (Optional) Bytes buffered before each part is uploaded. Default is S3MultipartWriter.DEFAULT_PART_SIZE
+        :return - An open S3MultipartWriter
+        """
+
+        return S3MultipartWriter(self._client, bucket, key, content_type, part_size)
+
+    def generate_presigned_url(
+        self, bucket: str, key: str, expires_in: int = 3600
+    ) -> str:
+        """
+        Build a temporary download url of an object
+        :param  - bucket: The bucket name
+                - key: The object key
+                - expires_in: (Optional) Seconds the url is valid. Default is 3600
+        :return - The presigned url
+        """
+
+        return self._client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def iter_object_lines(
+        self, bucket: str, key: str, start: int = 0, chunk_size: int = 1048576
+    ) -> Iterator[bytes]:
+        """
+        Stream the lines of an object without loading it in memory. Lines keep their line ending,
+        so the byte offset of the next line is start plus the length of the lines already read
+        :param  - bucket: The bucket name
+                - key: The object key
+                - start: (Optional) Byte offset of the first line. Default is 0
+                - chunk_size: (Optional) Bytes read per request chunk. Default is 1 MiB
+        :return - An iterator of lines
+        """
+
+        arguments = {"Bucket": bucket, "Key": key}
+        if start:
+            arguments["Range"] = "bytes={}-".format(start)
+
+        try:
+            body = self._client.get_object(**arguments)["Body"]
+        except self._client.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] == "InvalidRange":
+                return
+            raise
+
+        try:
+            pending = b""
+            for chunk in body.iter_chunks(chunk_size):
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    yield line + b"\n"
+            if pending:
+                yield pending
+        finally:
+            body.close()
+
+    def get_json(self, bucket: str, key: str):
+        """
+        Read a JSON object
+        :param  - bucket: The bucket name
+                - key: The object key
+        :return - The decoded object, or None when the key does not exist
+        """
+
+        try:
+            body = self._client.get_object(Bucket=bucket, Key=key)["Body"]
+        except self._client.exceptions.NoSuchKey:
+            return None
+
+        return json.loads(body.read())
+
+    def put_object(
+        self,
+        bucket: str,
+        key: str,
+        body: bytes,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        """
+        Write a small object in a single request
+        :param  - bucket: The bucket name
+                - key: The object key
+                - body: The object bytes
+                - content_type: (Optional) The object content type
+        :return - None
+        """
+
+        self._client.put_object(
+            Bucket=bucket, Key=key, Body=body, ContentType=content_type
+        )
+
+
+class S3MultipartWriter:
+    """
+    File-like writer that uploads an object as a multipart upload. At most one part is buffered,
+    so memory stays bounded by part_size whatever the object size. Parts other than the last one
+    must hold at least 5 MiB, smaller part sizes are raised to that minimum.
+    Environment:
+        - S3_MULTIPART_PART_SIZE: Default bytes buffered per part (default 8 MiB)
+    """
+
+    MIN_PART_SIZE = 5 * 1024 * 1024
+    DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        key: str,
+        content_type: str = "application/octet-stream",
+        part_size: int = None,
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(
+            part_size
+            or int(os.getenv("S3_MULTIPART_PART_SIZE") or self.DEFAULT_PART_SIZE),
+            self.MIN_PART_SIZE,
+        )
+        self.bytes_written = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._parts: List[dict] = []
+        self._upload_id = client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.bytes_written
+
+    def flush(self) -> None:
+        pass
+
+    def write(self, data) -> int:
+        """
+        Buffer data, uploading a part each time the buffer reaches part_size
+        :param  - data: Bytes, or text encoded as UTF-8
+        :return - Count of bytes written
+        """
+
+        if self.closed:
+            raise ValueError("Write on a closed multipart upload")
+
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self.__upload_part(part)
+        return len(data)
+
+    def close(self) -> None:
+        """
+        Upload the buffered bytes as the last part and complete the upload
+        :param  - None
+        :return - None
+        """
+
+        if self.closed:
+            return
+
+        if self._buffer or not self._parts:
+            self.__upload_part(bytes(self._buffer))
+            self._buffer = bytearray()
+
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+        self.closed = True
+
+    def abort(self) -> None:
+        """
+        Abort the upload, discarding the parts already uploaded
+        :param  - None
+        :return - None
+        """
+
+        if self.closed:
+            return
+
+        self._buffer = bytearray()
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+        )
+        self.closed = True
+
+    def __upload_part(self, part: bytes) -> None:
+        number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=part,
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": number})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
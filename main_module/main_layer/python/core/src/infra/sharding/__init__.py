@@ -0,0 +1 @@
+from .tenant_mover import TenantMover
@@ -0,0 +1,307 @@
+import sys
+import time
+import argparse
+from typing import Callable, Dict, List
+from sqlalchemy import Table, delete, insert, select, update
+from sqlalchemy.engine import Engine
+from core.src.infra.config import Base, DBConnectionHandler, ShardMap
+from core.src.infra.entities import Package as PackageModel, PackageCounter
+from core.src.infra.repo.package_repository import PackageCounts
+
+
+class TenantMover:
+    """
+    Moves the Packages of a company to another shard while they stay readable:
+        1. copy: the rows are copied to the target in key order, page by page, while the source
+            keeps serving reads and writes
+        2. lock: the company is marked 'locked' in the shard directory and the mover waits for
+            every container to reload it, so writes of the company fail with TenantMovingError
+        3. sync: source and target are compared page by page again, writing the rows changed
+            since the copy and deleting the rows deleted since the copy
+        4. switch: the company is pinned to the target as 'active' and its counter recounted
+        5. purge: once every container reloaded the directory the source rows are deleted
+    Rows of tables with a foreign key to packages.id move with their Package. A failure before
+    the switch unlocks the company on the source, a new attempt overwrites the partial copy
+    """
+
+    def __init__(
+        self,
+        empresa_id: str,
+        target: str,
+        batch_size: int = 1000,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Constructor of a move
+        :param  - empresa_id: ID of the moved company
+                - target: Name of the destination shard
+                - batch_size: (Optional) Rows read and written per page. Default is 1000
+                - sleep: (Optional) Function waiting for the containers to reload the directory
+        :return - None
+        """
+
+        if not ShardMap.enabled():
+            raise ValueError("Sharding is not configured")
+
+        self.empresa_id = empresa_id
+        self.source = ShardMap.shard_name(empresa_id)
+        self.target = ShardMap.target(target).name
+        self.batch_size = batch_size
+        self.sleep = sleep
+        if self.source == self.target:
+            raise ValueError(
+                "Company {} already lives on shard {}".format(empresa_id, target)
+            )
+
+        self.source_engine = DBConnectionHandler.for_shard(self.source).get_engine()
+        self.target_engine = DBConnectionHandler.for_shard(self.target).get_engine()
+
+    def move(self) -> Dict[str, int]:
+        """
+        Run every step of the move
+        :param  - None
+        :return - Dictionary with the 'copied' rows, the rows 'synced' while locked and the 'purged' Packages
+        """
+
+        copied = self.sync()
+
+        ShardMap.assign(self.empresa_id, self.source, ShardMap.LOCKED)
+        try:
+            self.sleep(ShardMap.ttl())
+            synced = self.sync()
+            with DBConnectionHandler.for_shard(self.target) as db_connection:
+                PackageCounts.refresh_counter(db_connection.session, self.empresa_id)
+                db_connection.commit()
+            ShardMap.assign(self.empresa_id, self.target)
+        except:
+            ShardMap.assign(self.empresa_id, self.source)
+            raise
+
+        PackageCounts.invalidate(self.empresa_id)
+        self.sleep(ShardMap.ttl())
+        purged = self.purge()
+        return {"copied": copied, "synced": synced, "purged": purged}
+
+    def sync(self) -> int:
+        """
+        Make the target rows of the company equal to the source rows
+        :param  - None
+        :return - Count of rows written or deleted on the target
+        """
+
+        packages = PackageModel.__table__
+        deleted_packages = []
+        changes = self.__sync_table(packages, deleted_packages)
+        for table in self.child_tables():
+            changes += self.__sync_table(table, None)
+
+        for index in range(0, len(deleted_packages), self.batch_size):
+            with self.target_engine.begin() as connection:
+                connection.execute(
+                    delete(packages).where(
+                        packages.c.id.in_(
+                            deleted_packages[index : index + self.batch_size]
+                        )
+                    )
+                )
+        return changes
+
+    def purge(self) -> int:
+        """
+        Delete the company Packages, their child rows and counter from the source, page by page
+        :param  - None
+        :return - Count of deleted Packages
+        """
+
+        packages = PackageModel.__table__
+        purged = 0
+        while True:
+            with self.source_engine.begin() as connection:
+                ids = list(
+                    connection.execute(
+                        select(packages.c.id)
+                        .where(packages.c.empresa_id == self.empresa_id)
+                        .limit(self.batch_size)
+                    ).scalars()
+                )
+                if not ids:
+                    connection.execute(
+                        delete(PackageCounter.__table__).where(
+                            PackageCounter.__table__.c.empresa_id == self.empresa_id
+                        )
+                    )
+                    return purged
+
+                for table in self.child_tables():
+                    connection.execute(
+                        delete(table).where(self.__parent_column(table).in_(ids))
+                    )
+                connection.execute(delete(packages).where(packages.c.id.in_(ids)))
+                purged += len(ids)
+
+    @classmethod
+    def child_tables(cls) -> List[Table]:
+        """
+        Return the tables with a foreign key to packages.id
+        :param  - None
+        :return - List of tables, in dependency order
+        """
+
+        return [
+            table
+            for table in Base.metadata.sorted_tables
+            if any(
+                key.column.table is PackageModel.__table__ for key in table.foreign_keys
+            )
+        ]
+
+    def __sync_table(self, table: Table, deleted: List) -> int:
+        """
+        Merge the company rows of a table from the source into the target, comparing both sides
+        one key range at a time
+        :param  - table: The table, with a single column primary key
+                - deleted: List receiving the target keys to delete after the child tables are
+                    synced, or None to delete them right away
+        :return - Count of rows inserted, updated or deleted
+        """
+
+        key = table.primary_key.columns.values()[0]
+        changes = 0
+        last = None
+        while True:
+            source_rows = self.__read(self.source_engine, table, last, None)
+            upper = (
+                source_rows[-1][key.name]
+                if len(source_rows) == self.batch_size
+                else None
+            )
+            source = {row[key.name]: row for row in source_rows}
+
+            inserts, updates, deletes = [], [], []
+            lower = last
+            while True:
+                target_rows = self.__read(self.target_engine, table, lower, upper)
+                for row in target_rows:
+                    source_row = source.pop(row[key.name], None)
+                    if source_row is None:
+                        deletes.append(row[key.name])
+                    elif source_row != row:
+                        updates.append(source_row)
+                if len(target_rows) < self.batch_size:
+                    break
+                lower = target_rows[-1][key.name]
+            inserts = list(source.values())
+            if table is not PackageModel.__table__:
+                inserts = self.__with_target_parent(table, inserts)
+                updates = self.__with_target_parent(table, updates)
+
+            with self.target_engine.begin() as connection:
+                if inserts:
+                    connection.execute(insert(table), inserts)
+                for row in updates:
+                    connection.execute(
+                        update(table).where(key == row[key.name]).values(**row)
+                    )
+                if deletes and deleted is None:
+                    connection.execute(delete(table).where(key.in_(deletes)))
+            if deleted is not None:
+                deleted.extend(deletes)
+
+            changes += len(inserts) + len(updates) + len(deletes)
+            if upper is None:
+                return changes
+            last = upper
+
+    def __read(self, engine: Engine, table: Table, lower, upper) -> List[dict]:
+        """
+        Read a page of the company rows of a table in key order
+        :param  - engine: The shard engine
+                - table: The table
+                - lower: Exclusive lower key, None to start from the first row
+                - upper: Inclusive upper key, None for no upper bound
+        :return - List of rows as dictionaries, at most batch_size
+        """
+
+        key = table.primary_key.columns.values()[0]
+        # The page bounds compare with the collation of the ordering, byte order as in SQLite
+        if engine.dialect.name == "postgresql":
+            ordering = key.collate("C")
+        else:
+            ordering = key
+
+        statement = select(table).where(self.__company_criteria(table))
+        if lower is not None:
+            statement = statement.where(ordering > lower)
+        if upper is not None:
+            statement = statement.where(ordering <= upper)
+
+        with engine.connect() as connection:
+            return [
+                dict(row)
+                for row in connection.execute(
+                    statement.order_by(ordering).limit(self.batch_size)
+                ).mappings()
+            ]
+
+    def __with_target_parent(self, table: Table, rows: List[dict]) -> List[dict]:
+        """
+        Keep the child rows whose Package is already on the target. Packages created during the
+        copy are only copied by the locked sync, together with their child rows
+        :param  - table: The child table
+                - rows: The child rows to write
+        :return - The rows that can be written
+        """
+
+        column = self.__parent_column(table)
+        parent_ids = set(row[column.name] for row in rows)
+        if not parent_ids:
+            return rows
+
+        packages = PackageModel.__table__
+        with self.target_engine.connect() as connection:
+            present = set(
+                connection.execute(
+                    select(packages.c.id).where(packages.c.id.in_(parent_ids))
+                ).scalars()
+            )
+        return [row for row in rows if row[column.name] in present]
+
+    def __company_criteria(self, table: Table):
+        packages = PackageModel.__table__
+        if table is packages:
+            return packages.c.empresa_id == self.empresa_id
+
+        return self.__parent_column(table).in_(
+            select(packages.c.id).where(packages.c.empresa_id == self.empresa_id)
+        )
+
+    @classmethod
+    def __parent_column(cls, table: Table):
+        for key in table.foreign_keys:
+            if key.column.table is PackageModel.__table__:
+                return key.parent
+
+
+def main(arguments: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Move a company to another shard")
+    parser.add_argument("empresa_id", help="ID of the moved company")
+    parser.add_argument("target", help="Name of the destination shard")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    options = parser.parse_args(arguments)
+
+    result = TenantMover(
+        options.empresa_id, options.target, batch_size=options.batch_size
+    ).move()
+    print(
+        "Moved {} to {}: {} rows copied, {} synced while locked, {} purged".format(
+            options.empresa_id,
+            options.target,
+            result["copied"],
+            result["synced"],
+            result["purged"],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
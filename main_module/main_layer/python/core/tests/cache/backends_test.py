@@ -0,0 +1,69 @@
+import pytest
+from unittest import mock
+from core.src.infra.cache import MemoryCacheBackend, RedisCacheBackend
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.expirations = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode("utf-8")
+        self.expirations[key] = ex
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, b"0")) + 1).encode("utf-8")
+        return int(self.values[key])
+
+
+def test_memory_cache_backend():
+    """
+    Test that memory backends of the same url share values, expire them and count versions
+    :param - None
+    :return - None
+    """
+
+    MemoryCacheBackend.reset()
+    first = MemoryCacheBackend("memory://test")
+    second = MemoryCacheBackend("memory://test")
+
+    first.set("key", "value", 60)
+    assert second.get_many(["key", "missing"]) == ["value", None]
+    assert first.incr("version") == 1
+    assert second.incr("version") == 2
+    assert MemoryCacheBackend("memory://other").get_many(["key"]) == [None]
+
+    with mock.patch("time.monotonic", return_value=10**9):
+        assert second.get_many(["key", "version"]) == [None, "2"]
+
+
+def test_redis_cache_backend():
+    """
+    Test that the Redis backend decodes values and writes them with a TTL
+    :param - None
+    :return - None
+    """
+
+    client = FakeRedis()
+    backend = RedisCacheBackend("redis://localhost:6379/0", client=client)
+
+    backend.set("key", "value", 30)
+    assert backend.get_many(["key", "missing"]) == ["value", None]
+    assert client.expirations["key"] == 30
+    assert backend.incr("version") == 1
+
+
+def test_redis_cache_backend_requires_client_package():
+    """
+    Test that the Redis backend reports the missing optional package
+    :param - None
+    :return - None
+    """
+
+    with mock.patch("core.src.infra.cache.backends.redis", None):
+        with pytest.raises(ImportError):
+            RedisCacheBackend("redis://localhost:6379/0")
@@ -0,0 +1,142 @@
+import os
+import json
+import uuid
+from unittest import mock
+from sqlalchemy import event
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DataApiBatcher, DBConnectionHandler
+from core.src.infra.repo import PackageRepository
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+
+class FakeRdsDataClient:
+    """Local stand-in for boto3 rds-data client recording BatchExecuteStatement requests"""
+
+    def __init__(self):
+        self.requests = []
+
+    def batch_execute_statement(self, **kwargs):
+        self.requests.append(kwargs)
+        return {"updateResults": [{} for _ in kwargs["parameterSets"]]}
+
+
+class FakeDataApiCursor:
+    """DBAPI cursor that maps executemany() to BatchExecuteStatement like aurora-data-api"""
+
+    def __init__(self, client: FakeRdsDataClient):
+        self.client = client
+
+    def executemany(self, operation, seq_of_parameters):
+        self.client.batch_execute_statement(
+            sql=operation,
+            parameterSets=[
+                [
+                    {"name": name, "value": {"stringValue": str(value)}}
+                    for name, value in parameters.items()
+                ]
+                for parameters in seq_of_parameters
+            ],
+        )
+
+
+def test_batcher_chunks_by_parameter_sets_count():
+    """
+    Test that executemany is split into requests with at most DATA_API_BATCH_SIZE parameter sets
+    :param - None
+    :return - None
+    """
+
+    client = FakeRdsDataClient()
+    parameters = [{"id": str(index), "name": "package"} for index in range(2500)]
+
+    with mock.patch.dict(os.environ, {"DATA_API_BATCH_SIZE": "1000"}):
+        handled = DataApiBatcher.do_executemany(
+            FakeDataApiCursor(client), "INSERT", parameters, None
+        )
+
+    assert handled is True
+    assert [len(request["parameterSets"]) for request in client.requests] == [
+        1000,
+        1000,
+        500,
+    ]
+
+
+def test_batcher_chunks_by_request_size():
+    """
+    Test that every request stays under DATA_API_BATCH_MAX_BYTES
+    :param - None
+    :return - None
+    """
+
+    client = FakeRdsDataClient()
+    parameters = [{"id": str(index), "name": "x" * 1000} for index in range(100)]
+
+    with mock.patch.dict(os.environ, {"DATA_API_BATCH_MAX_BYTES": "20000"}):
+        DataApiBatcher.do_executemany(
+            FakeDataApiCursor(client), "INSERT", parameters, None
+        )
+
+    assert len(client.requests) > 1
+    assert sum(len(request["parameterSets"]) for request in client.requests) == 100
+    for request in client.requests:
+        assert len(json.dumps(request)) < 20000
+
+
+@mock.patch.dict(
+    os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "DATA_API_BATCH_SIZE": "40"}
+)
+def test_bulk_writes_are_flushed_through_batcher():
+    """
+    Test that repository bulk inserts and updates go through chunked executemany calls
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    engine = DBConnectionHandler().get_engine()
+    chunk_sizes = []
+
+    def record_executemany(cursor, statement, parameters, context):
+        for chunk in DataApiBatcher.chunk(statement, parameters):
+            chunk_sizes.append(len(chunk))
+            cursor.executemany(statement, chunk)
+        return True
+
+    event.listen(engine, "do_executemany", record_executemany)
+    try:
+        created = PackageRepository.bulk_insert_packages(
+            [
+                {"name": "package {}".format(index), "empresa_id": empresa_id}
+                for index in range(100)
+            ]
+        )
+        assert chunk_sizes == [40, 40, 20]
+
+        updated = PackageRepository.bulk_update_packages(
+            [
+                {
+                    "id": package.id,
+                    "empresa_id": empresa_id,
+                    "name": "renamed",
+                    "symbol": "S",
+                }
+                for package in created
+            ]
+        )
+        assert updated == 100
+    finally:
+        event.remove(engine, "do_executemany", record_executemany)
+
+    assert len(created) == 100
+    assert (
+        engine.execute(
+            "SELECT count(*) FROM packages WHERE empresa_id='{}' AND name='renamed'".format(
+                empresa_id
+            )
+        ).scalar()
+        == 100
+    )
+
+    engine.execute("DELETE FROM packages WHERE empresa_id='{}'".format(empresa_id))
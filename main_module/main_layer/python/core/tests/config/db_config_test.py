@@ -0,0 +1,314 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+from core.tests.mock_util import MockTools
+from core.src.infra.config import (
+    DBConnectionHandler,
+    EngineRegistry,
+    AuroraDataApiDriver,
+    PostgresDriver,
+    SQLiteDriver,
+)
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_engine_is_shared_between_handlers():
+    """
+    Test that handlers with the same connection settings share a single engine
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler.dispose_engines()
+
+    with DBConnectionHandler() as first_connection:
+        first_engine = first_connection.session.get_bind()
+
+    with DBConnectionHandler() as second_connection:
+        second_engine = second_connection.session.get_bind()
+
+    assert first_engine is second_engine
+    assert EngineRegistry.size() == 1
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_engine_registry_keys_by_connection_string():
+    """
+    Test that different connection strings get different engines
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler.dispose_engines()
+
+    default_engine = DBConnectionHandler().get_engine()
+    memory_engine = DBConnectionHandler("sqlite://").get_engine()
+
+    assert default_engine is not memory_engine
+    assert EngineRegistry.size() == 2
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_engine_registry_is_thread_safe():
+    """
+    Test that concurrent handlers create the engine only once
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler.dispose_engines()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        engines = list(
+            executor.map(lambda _: DBConnectionHandler().get_engine(), range(32))
+        )
+
+    assert all(engine is engines[0] for engine in engines)
+    assert EngineRegistry.size() == 1
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_dispose_engines_resets_registry():
+    """
+    Test that dispose hooks release the shared engines
+    :param - None
+    :return - None
+    """
+
+    driver = DBConnectionHandler().get_driver()
+    engine = driver.get_engine()
+    key = driver.registry_key()
+
+    assert EngineRegistry.dispose(key) is True
+    assert EngineRegistry.dispose(key) is False
+    assert DBConnectionHandler().get_engine() is not engine
+
+    DBConnectionHandler.dispose_engines()
+
+    assert EngineRegistry.size() == 0
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": "",
+        "DATABASE_DRIVER": "postgresql",
+        "DATABASE_URL": "sqlite:////tmp/mock_pool.db",
+        "DATABASE_POOL_SIZE": "1",
+        "DATABASE_MAX_CONNECTIONS": "2",
+        "DATABASE_POOL_TIMEOUT": "1",
+    },
+)
+def test_pooled_driver_respects_connection_budget():
+    """
+    Test that the native driver pool never opens more connections than the container budget
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler.dispose_engines()
+
+    driver = DBConnectionHandler().get_driver()
+    assert isinstance(driver, PostgresDriver)
+
+    options = driver.engine_options()
+    assert options["poolclass"] is QueuePool
+    assert options["pool_size"] == 1
+    assert options["max_overflow"] == 1
+    assert options["pool_pre_ping"] is True
+
+    engine = driver.get_engine()
+    first_connection = engine.connect()
+    second_connection = engine.connect()
+    try:
+        engine.connect()
+        assert False
+    except TimeoutError:
+        assert True
+    finally:
+        first_connection.close()
+        second_connection.close()
+
+    DBConnectionHandler.dispose_engines()
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": "",
+        "DATABASE_DRIVER": "postgresql",
+        "DATABASE_URL": "sqlite:////tmp/mock_pool.db",
+        "DATABASE_POOL": "null",
+    },
+)
+def test_pooled_driver_with_null_pool():
+    """
+    Test that DATABASE_POOL=null disables connection pooling
+    :param - None
+    :return - None
+    """
+
+    options = DBConnectionHandler().get_driver().engine_options()
+
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": "",
+        "AURORA_CLUSTER_ARN": "cluster",
+        "AURORA_SECRET_ARN": "secret",
+        "AURORA_DATABASE_NAME": "database",
+    },
+)
+def test_aurora_data_api_driver_by_default():
+    """
+    Test that the Aurora Data API driver is selected without other configuration
+    :param - None
+    :return - None
+    """
+
+    driver = DBConnectionHandler().get_driver()
+
+    assert isinstance(driver, AuroraDataApiDriver)
+    assert driver.connection_string == "postgresql+auroradataapi://:@/database"
+    assert driver.engine_options()["connect_args"] == dict(
+        aurora_cluster_arn="cluster", secret_arn="secret"
+    )
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_sqlite_performance_profile_pragmas():
+    """
+    Test that the SQLite performance profile applies WAL and tuned pragmas on connect
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler.dispose_engines()
+
+    driver = DBConnectionHandler().get_driver()
+    assert isinstance(driver, SQLiteDriver)
+    assert driver.engine_options()["poolclass"] is QueuePool
+
+    with driver.get_engine().connect() as connection:
+        assert connection.execute("pragma journal_mode").scalar() == "wal"
+        assert connection.execute("pragma synchronous").scalar() == 1
+        assert connection.execute("pragma temp_store").scalar() == 2
+        assert connection.execute("pragma foreign_keys").scalar() == 1
+        assert connection.execute("pragma mmap_size").scalar() == driver.mmap_size
+        assert connection.execute("pragma cache_size").scalar() == driver.cache_size
+
+
+@mock.patch.dict(
+    os.environ, {"TEST_DATABASE_CONNECTION": "sqlite://", "SQLITE_PROFILE": "safe"}
+)
+def test_sqlite_safe_profile_only_enables_foreign_keys():
+    """
+    Test that the safe SQLite profile keeps the default journal and pool
+    :param - None
+    :return - None
+    """
+
+    driver = DBConnectionHandler().get_driver()
+
+    assert driver.pragmas() == ["pragma foreign_keys=ON"]
+    assert "poolclass" not in driver.engine_options()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": "sqlite://"})
+def test_sqlite_memory_database_shares_single_connection():
+    """
+    Test that in-memory databases use a static pool so every session sees the same data
+    :param - None
+    :return - None
+    """
+
+    driver = DBConnectionHandler().get_driver()
+
+    assert driver.is_memory_database() is True
+    assert driver.engine_options()["poolclass"] is StaticPool
+    assert "pragma journal_mode=WAL" not in driver.pragmas()
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": MOCK_DB_PATH,
+        "TEST_DATABASE_READER_CONNECTION": "sqlite:////tmp/mock_reader.db",
+        "DATABASE_READ_YOUR_WRITES_SECONDS": "60",
+    },
+)
+def test_read_only_handlers_route_to_reader():
+    """
+    Test that read-only handlers use the reader target while writers stay on the primary
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler._last_write_at = None
+
+    reader_driver = DBConnectionHandler(read_only=True).get_driver()
+    writer_driver = DBConnectionHandler().get_driver()
+
+    assert reader_driver.connection_string == "sqlite:////tmp/mock_reader.db"
+    assert writer_driver.connection_string == MOCK_DB_PATH
+
+    with DBConnectionHandler() as db_connection:
+        db_connection.commit()
+
+    assert DBConnectionHandler.in_read_your_writes_window() is True
+    pinned_driver = DBConnectionHandler(read_only=True).get_driver()
+    assert pinned_driver.connection_string == MOCK_DB_PATH
+
+    DBConnectionHandler._last_write_at = None
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": "",
+        "AURORA_CLUSTER_ARN": "writer",
+        "AURORA_READER_CLUSTER_ARN": "reader",
+        "AURORA_SECRET_ARN": "secret",
+        "AURORA_DATABASE_NAME": "database",
+        "DATABASE_READ_YOUR_WRITES_SECONDS": "0",
+    },
+)
+def test_read_only_handlers_route_to_aurora_reader_cluster():
+    """
+    Test that read-only Data API handlers target the reader cluster once the window expires
+    :param - None
+    :return - None
+    """
+
+    DBConnectionHandler.record_write()
+
+    reader_driver = DBConnectionHandler(read_only=True).get_driver()
+    writer_driver = DBConnectionHandler().get_driver()
+
+    assert reader_driver.cluster_arn == "reader"
+    assert writer_driver.cluster_arn == "writer"
+    assert reader_driver.registry_key() != writer_driver.registry_key()
+
+    DBConnectionHandler._last_write_at = None
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_read_only_handlers_without_reader_use_primary():
+    """
+    Test that read-only handlers fallback to the primary without a reader target
+    :param - None
+    :return - None
+    """
+
+    handler = DBConnectionHandler(read_only=True)
+
+    assert handler.has_reader() is False
+    assert handler.get_driver().connection_string == MOCK_DB_PATH
@@ -0,0 +1,179 @@
+import os
+import pytest
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DatabaseRetryPolicy, DBConnectionHandler
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+
+class BadRequestException(Exception):
+    """Error class raised by the rds-data client"""
+
+
+class FakeRdsDataClient:
+    """Local stand-in for boto3 rds-data client that fails while the cluster resumes"""
+
+    def __init__(self, resume_failures: int):
+        self.resume_failures = resume_failures
+        self.calls = 0
+
+    def execute_statement(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.resume_failures:
+            raise BadRequestException(
+                "Communications link failure\n\nThe last packet sent successfully "
+                "to the server was 0 milliseconds ago."
+            )
+        return {"records": [[{"longValue": 1}]]}
+
+
+class FakeLambdaContext:
+    def __init__(self, remaining_millis: int):
+        self.remaining_millis = remaining_millis
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_millis
+
+
+def test_retry_policy_retries_resuming_errors():
+    """
+    Test that resume errors are retried with bounded jittered backoff
+    :param - None
+    :return - None
+    """
+
+    DatabaseRetryPolicy.bind_lambda_context(None)
+    client = FakeRdsDataClient(resume_failures=3)
+    delays = []
+    policy = DatabaseRetryPolicy(sleep=delays.append, jitter=lambda: 1.0)
+
+    response = policy.call(lambda: client.execute_statement(sql="SELECT 1"))
+
+    assert response["records"][0][0]["longValue"] == 1
+    assert client.calls == 4
+    assert delays == [0.25, 0.5, 1.0]
+
+
+def test_retry_policy_does_not_retry_other_errors():
+    """
+    Test that errors not raised by a resuming database are raised at once
+    :param - None
+    :return - None
+    """
+
+    calls = []
+
+    def operation():
+        calls.append(1)
+        raise BadRequestException("relation packages does not exist")
+
+    try:
+        DatabaseRetryPolicy(sleep=lambda _: None).call(operation)
+        assert False
+    except BadRequestException:
+        assert len(calls) == 1
+
+
+class FakeClock:
+    """Clock advanced by the sleeps of the retry policy"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.delays = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.delays.append(seconds)
+        self.now += seconds
+
+
+@mock.patch.dict(os.environ, {"DATABASE_RETRY_TIMEOUT_SECONDS": "30"})
+def test_retry_policy_is_bounded_by_time():
+    """
+    Test that retries go on for DATABASE_RETRY_TIMEOUT_SECONDS outside Lambda, whatever the
+    count of attempts, and stop once that time is spent
+    :param - None
+    :return - None
+    """
+
+    DatabaseRetryPolicy.bind_lambda_context(None)
+    clock = FakeClock()
+    client = FakeRdsDataClient(resume_failures=1000)
+    policy = DatabaseRetryPolicy(sleep=clock.sleep, jitter=lambda: 1.0, clock=clock)
+
+    try:
+        policy.call(client.execute_statement)
+        assert False
+    except BadRequestException:
+        assert sum(clock.delays) == 30
+        assert max(clock.delays) == 8
+        assert client.calls == len(clock.delays) + 1
+
+    slow_client = FakeRdsDataClient(resume_failures=7)
+    response = DatabaseRetryPolicy(
+        sleep=clock.sleep, jitter=lambda: 1.0, clock=clock
+    ).call(lambda: slow_client.execute_statement(sql="SELECT 1"))
+    assert response["records"][0][0]["longValue"] == 1
+    assert slow_client.calls == 8
+
+
+def test_retry_policy_respects_lambda_deadline():
+    """
+    Test that retries go on until the Lambda deadline margin, no retry sleeps past it and the
+    deadline is unbound once the handler returns
+    :param - None
+    :return - None
+    """
+
+    clock = FakeClock()
+    client = FakeRdsDataClient(resume_failures=10)
+
+    @DatabaseRetryPolicy.with_lambda_deadline
+    def handler(event, context):
+        policy = DatabaseRetryPolicy(sleep=clock.sleep, jitter=lambda: 1.0, clock=clock)
+        with pytest.raises(BadRequestException):
+            policy.call(client.execute_statement)
+
+    with mock.patch("time.monotonic", clock):
+        handler({}, FakeLambdaContext(remaining_millis=2500))
+
+    assert clock.delays == [0.25, 0.25]
+    assert client.calls == 3
+    assert DatabaseRetryPolicy().remaining_seconds() is None
+
+
+def test_resuming_error_is_detected_through_wrapped_errors():
+    """
+    Test that resume errors wrapped by Sqlalchemy are detected
+    :param - None
+    :return - None
+    """
+
+    class DatabaseResumingException(Exception):
+        pass
+
+    class OperationalError(Exception):
+        def __init__(self, orig):
+            self.orig = orig
+
+    assert DatabaseRetryPolicy.is_resuming_error(
+        OperationalError(DatabaseResumingException("resuming"))
+    )
+    assert not DatabaseRetryPolicy.is_resuming_error(OperationalError(ValueError()))
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_ping_database():
+    """
+    Test the cheap ping used to keep the database warm
+    :param - None
+    :return - None
+    """
+
+    handler = DBConnectionHandler()
+
+    assert handler.ping() is True
+    assert handler.needs_warm_up(handler.get_driver()) is False
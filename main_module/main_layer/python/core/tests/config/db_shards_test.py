@@ -0,0 +1,201 @@
+import os
+import json
+import uuid
+import pytest
+from unittest import mock
+from sqlalchemy import create_engine, select
+from core.src.infra.config import (
+    Base,
+    DBConnectionHandler,
+    ShardMap,
+    TenantMovingError,
+    UnitOfWork,
+)
+from core.src.infra.entities import Package as PackageModel
+from core.src.infra.repo import PackageRepository
+
+
+@pytest.fixture
+def shard_urls(tmp_path):
+    urls = {
+        name: "sqlite:///{}".format(tmp_path / "{}.db".format(name))
+        for name in ("directory", "a", "b")
+    }
+    for url in urls.values():
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+    environment = {
+        "TEST_DATABASE_CONNECTION": urls["directory"],
+        "DATABASE_SHARDS": json.dumps(
+            {"shards": {"a": {"url": urls["a"]}, "b": {"url": urls["b"]}}}
+        ),
+        "DATABASE_SHARD_MAP_TTL_SECONDS": "0",
+    }
+    with mock.patch.dict(os.environ, environment):
+        ShardMap.reset()
+        yield urls
+
+    ShardMap.reset()
+    DBConnectionHandler.dispose_engines()
+
+
+def company_on(shard: str) -> str:
+    while True:
+        empresa_id = str(uuid.uuid4())
+        if ShardMap.ring_shard(empresa_id) == shard:
+            return empresa_id
+
+
+def test_shard_map_consistent_hashing(shard_urls):
+    """
+    Test that companies spread over the ring, overrides win and a new shard only takes companies
+    :param - None
+    :return - None
+    """
+
+    empresa_ids = [str(uuid.uuid4()) for _ in range(2000)]
+    placed = {empresa_id: ShardMap.shard_name(empresa_id) for empresa_id in empresa_ids}
+
+    assert 600 < list(placed.values()).count("a") < 1400
+    assert ShardMap.shard_name(empresa_ids[0]) == placed[empresa_ids[0]]
+
+    config = json.loads(os.environ["DATABASE_SHARDS"])
+    config["shards"]["c"] = {"url": shard_urls["directory"]}
+    config["overrides"] = {empresa_ids[0]: "c"}
+    with mock.patch.dict(os.environ, {"DATABASE_SHARDS": json.dumps(config)}):
+        replaced = {
+            empresa_id: ShardMap.shard_name(empresa_id) for empresa_id in empresa_ids
+        }
+
+    moved = [
+        empresa_id
+        for empresa_id in empresa_ids[1:]
+        if replaced[empresa_id] != placed[empresa_id]
+    ]
+    assert replaced[empresa_ids[0]] == "c"
+    assert all(replaced[empresa_id] == "c" for empresa_id in moved)
+    assert 300 < len(moved) < 1000
+
+
+def test_shard_map_disabled():
+    """
+    Test that handlers keep the default target without a shard map
+    :param - None
+    :return - None
+    """
+
+    ShardMap.reset()
+    with mock.patch.dict(os.environ, {"DATABASE_SHARDS": ""}):
+        assert ShardMap.enabled() is False
+        assert ShardMap.resolve(str(uuid.uuid4())) is None
+        assert ShardMap.group(["1", "2"]) == {None: ["1", "2"]}
+        assert DBConnectionHandler(empresa_id=str(uuid.uuid4())).shard is None
+
+
+def test_handlers_route_to_company_shard(shard_urls):
+    """
+    Test that repository calls of a company read and write its shard only
+    :param - None
+    :return - None
+    """
+
+    first_id = company_on("a")
+    second_id = company_on("b")
+
+    created = PackageRepository.bulk_insert_packages(
+        [
+            {"name": "first", "empresa_id": first_id},
+            {"name": "second", "empresa_id": second_id},
+        ]
+    )
+    PackageRepository.create_package(name="third", symbol=None, empresa_id=second_id)
+
+    for shard, empresa_id, names in (
+        ("a", first_id, ["first"]),
+        ("b", second_id, ["second", "third"]),
+    ):
+        engine = create_engine(shard_urls[shard])
+        stored = engine.execute(
+            select(PackageModel.name).order_by(PackageModel.name)
+        ).scalars()
+        assert list(stored) == names
+        engine.dispose()
+        assert PackageRepository.count_packages(empresa_id=empresa_id) == len(names)
+
+    assert PackageRepository.get_package(created[0].id, first_id).name == "first"
+    assert PackageRepository.get_package(created[0].id, second_id) is None
+
+    with UnitOfWork(empresa_id=first_id) as unit_of_work:
+        assert unit_of_work.shard == "a"
+        PackageRepository.delete_package(created[0].id, first_id)
+        with pytest.raises(ValueError):
+            PackageRepository.delete_package(created[1].id, second_id)
+
+    assert PackageRepository.count_packages(empresa_id=first_id) == 0
+
+
+def test_locked_company_refuses_writes(shard_urls):
+    """
+    Test that a company locked in the directory keeps its reads and refuses its writes
+    :param - None
+    :return - None
+    """
+
+    empresa_id = company_on("a")
+    created = PackageRepository.create_package(
+        name="package", symbol=None, empresa_id=empresa_id
+    )
+
+    ShardMap.assign(empresa_id, "a", ShardMap.LOCKED)
+    assert ShardMap.is_locked(empresa_id) is True
+    assert PackageRepository.get_package(created.id, empresa_id).name == "package"
+    with pytest.raises(TenantMovingError):
+        PackageRepository.create_package(
+            name="refused", symbol=None, empresa_id=empresa_id
+        )
+
+    ShardMap.assign(empresa_id, "b")
+    assert ShardMap.is_locked(empresa_id) is False
+    assert DBConnectionHandler(empresa_id=empresa_id).shard == "b"
+
+
+def test_locked_company_refuses_batch_writes(shard_urls):
+    """
+    Test that a batch refuses its writes when any company is locked, not only the first of a shard
+    :param - None
+    :return - None
+    """
+
+    first_id = company_on("a")
+    locked_id = company_on("a")
+    other_id = company_on("b")
+    created = PackageRepository.bulk_insert_packages(
+        [
+            {"name": "first", "empresa_id": first_id},
+            {"name": "locked", "empresa_id": locked_id},
+        ]
+    )
+
+    ShardMap.assign(locked_id, "a", ShardMap.LOCKED)
+    with pytest.raises(TenantMovingError):
+        PackageRepository.bulk_insert_packages(
+            [
+                {"name": "other", "empresa_id": other_id},
+                {"name": "first", "empresa_id": first_id},
+                {"name": "refused", "empresa_id": locked_id},
+            ]
+        )
+    with pytest.raises(TenantMovingError):
+        PackageRepository.bulk_update_packages(
+            [
+                {"id": created[0].id, "empresa_id": first_id, "name": "renamed"},
+                {"id": created[1].id, "empresa_id": locked_id, "name": "refused"},
+            ]
+        )
+
+    assert PackageRepository.count_packages(empresa_id=other_id) == 0
+    assert PackageRepository.count_packages(empresa_id=first_id) == 1
+    assert PackageRepository.get_package(created[0].id, first_id).name == "first"
+    assert PackageRepository.get_package(created[1].id, locked_id).name == "locked"
@@ -0,0 +1,100 @@
+import os
+import uuid
+import pytest
+from faker import Faker
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DBConnectionHandler, UnitOfWork
+from core.src.infra.repo import PackageRepository
+
+fake = Faker()
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+
+@pytest.fixture(scope="session")
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def db_connection_handler():
+    return DBConnectionHandler()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_handlers_join_unit_of_work_session():
+    """
+    Test that handlers opened inside a UnitOfWork share its session
+    :param - None
+    :return - None
+    """
+
+    with UnitOfWork() as unit_of_work:
+        assert UnitOfWork.current() is unit_of_work
+
+        with DBConnectionHandler() as first_connection:
+            first_session = first_connection.session
+        with DBConnectionHandler() as second_connection:
+            second_session = second_connection.session
+
+        assert first_connection.joined is True
+        assert first_session is unit_of_work.session
+        assert second_session is unit_of_work.session
+
+    assert UnitOfWork.current() is None
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_unit_of_work_commits_on_exit(db_connection_handler):
+    """
+    Test that repository writes inside a UnitOfWork are committed once on exit
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    engine = db_connection_handler.get_engine()
+
+    with UnitOfWork():
+        first = PackageRepository.create_package(
+            name=fake.name(), symbol=None, empresa_id=empresa_id
+        )
+        second = PackageRepository.create_package(
+            name=fake.name(), symbol=None, empresa_id=empresa_id
+        )
+
+        assert PackageRepository.count_packages(empresa_id=empresa_id) == 2
+
+    count = engine.execute(
+        "SELECT count(*) FROM packages WHERE id IN ('{}', '{}')".format(
+            first.id, second.id
+        )
+    ).scalar()
+    assert count == 2
+
+    engine.execute("DELETE FROM packages WHERE empresa_id='{}'".format(empresa_id))
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_unit_of_work_rollbacks_on_error(db_connection_handler):
+    """
+    Test that a failed repository call rollbacks every write of the UnitOfWork
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    engine = db_connection_handler.get_engine()
+
+    try:
+        with UnitOfWork():
+            PackageRepository.create_package(
+                name=fake.name(), symbol=None, empresa_id=empresa_id
+            )
+            PackageRepository.delete_package(id="nonexists", empresa_id=empresa_id)
+        assert False
+    except AssertionError:
+        raise
+    except:
+        assert True
+
+    count = engine.execute(
+        "SELECT count(*) FROM packages WHERE empresa_id='{}'".format(empresa_id)
+    ).scalar()
+    assert count == 0
@@ -0,0 +1,119 @@
+from sqlalchemy import create_engine
+from core.src.infra.migrations import IndexAdvisor, MigrationRunner
+from core.src.infra.repo.package_repository import PackageSearch, PackageStatements
+
+
+def test_migration_runner_applies_pending_migrations(tmp_path):
+    """
+    Test that migrations are applied once, in version order, and index every query shape
+    :param - None
+    :return - None
+    """
+
+    engine = create_engine("sqlite:///{}".format(tmp_path / "migrations.db"))
+    runner = MigrationRunner(engine)
+
+    applied = runner.upgrade()
+
+    assert [migration.version for migration in applied] == [1, 2, 3, 4, 5, 6, 7]
+    assert runner.applied_versions() == [1, 2, 3, 4, 5, 6, 7]
+    assert runner.pending() == []
+    assert runner.upgrade() == []
+    assert IndexAdvisor.check(engine, "packages", PackageStatements.QUERY_SHAPES) == []
+
+    engine.dispose()
+
+
+def test_migration_runner_indexes_existing_table(tmp_path):
+    """
+    Test that the index advisor flags an unindexed table and migrations fix it, keeping its rows searchable
+    :param - None
+    :return - None
+    """
+
+    engine = create_engine("sqlite:///{}".format(tmp_path / "legacy.db"))
+    engine.execute("""
+        CREATE TABLE packages (
+            id VARCHAR(36) PRIMARY KEY, name VARCHAR NOT NULL, symbol VARCHAR,
+            created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+            empresa_id VARCHAR(36) NOT NULL, created_by VARCHAR(36), updated_by VARCHAR(36)
+        )
+        """)
+    engine.execute(
+        "INSERT INTO packages (id, name, created_at, updated_at, empresa_id) "
+        "VALUES ('1', 'Legacy Package', '2021-01-01', '2021-01-01', 'e1')"
+    )
+
+    unindexed = IndexAdvisor.check(engine, "packages", PackageStatements.QUERY_SHAPES)
+    assert [shape.name for shape in unindexed] == [
+        "count_packages",
+        "select_packages:created_at",
+        "select_packages:updated_at",
+        "select_packages:name",
+        "select_packages:symbol",
+        "select_packages:id",
+        "export_packages",
+    ]
+
+    MigrationRunner(engine).upgrade()
+
+    assert IndexAdvisor.check(engine, "packages", PackageStatements.QUERY_SHAPES) == []
+    counted = engine.execute(
+        "SELECT total FROM package_counters WHERE empresa_id = 'e1'"
+    ).scalar()
+    assert counted == 1
+    assert engine.execute(
+        "SELECT rowid FROM packages_fts WHERE packages_fts MATCH 'name : \"legacy\"'"
+    ).fetchall()
+
+    engine.dispose()
+
+
+def test_package_search_survives_vacuum(tmp_path):
+    """
+    Test that the search shadow table keyed by the packages rowid is replaced, and that matches
+    keep their Package once VACUUM renumbers the packages rowids
+    :param - None
+    :return - None
+    """
+
+    engine = create_engine("sqlite:///{}".format(tmp_path / "search.db"))
+    MigrationRunner(engine).upgrade()
+    with engine.begin() as connection:
+        for statement in PackageSearch.SQLITE_DROP + ["DROP TABLE packages_fts_keys"]:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE packages_fts USING fts5("
+            "name, symbol, content='packages', content_rowid='rowid', tokenize='trigram')"
+        )
+        for id, name in (("a", "First Widget"), ("b", "Second Gadget")):
+            connection.exec_driver_sql(
+                "INSERT INTO packages (id, name, created_at, updated_at, empresa_id) "
+                "VALUES (?, ?, '2021-01-01', '2021-01-01', 'e1')",
+                (id, name),
+            )
+        PackageSearch.install(connection)
+
+    engine.execute(
+        "INSERT INTO packages (id, name, created_at, updated_at, empresa_id) "
+        "VALUES ('c', 'Third Gadget', '2021-01-01', '2021-01-01', 'e1')"
+    )
+    engine.execute("DELETE FROM packages WHERE id = 'a'")
+    engine.execute("VACUUM")
+
+    def search(term):
+        return sorted(
+            row[0]
+            for row in engine.execute(
+                "SELECT packages_fts_keys.id FROM packages_fts "
+                "JOIN packages_fts_keys ON packages_fts_keys.docid = packages_fts.rowid "
+                "WHERE packages_fts MATCH ?",
+                ('name : "{}"'.format(term),),
+            )
+        )
+
+    assert search("gadget") == ["b", "c"]
+    assert search("third") == ["c"]
+    assert search("widget") == []
+
+    engine.dispose()
@@ -1,12 +1,28 @@
 import os
 import json
+import time
 import uuid
 import pytest
+from contextlib import contextmanager
+from datetime import datetime
 from unittest import mock
 from faker import Faker
+from sqlalchemy import delete, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.exc import NoResultFound
 from core.src.infra.repo import PackageRepository
+from core.src.infra.repo.package_repository import (
+    PackageCache,
+    PackageCounts,
+    PackageSharedCache,
+    PackageStatements,
+    PackageSearch,
+)
 from core.tests.mock_util import MockUtil, MockTools
-from core.src.infra.config import DBConnectionHandler
+from core.src.infra.cache import MemoryCacheBackend
+from core.src.infra.config import DBConnectionHandler, EngineRegistry, UnitOfWork
+from core.src.infra.entities import Package as PackageModel, PackageCounter
+from core.src.domain.models import PackageRecord
 
 
 fake = Faker()
@@ -17,6 +33,27 @@ def generate_uuid():
     return str(uuid.uuid4())
 
 
+@contextmanager
+def capture_statements(db_connection_handler: DBConnectionHandler):
+    """
+    Record the SQL statements sent to the database of the handler while the block runs
+    :param  - db_connection_handler: The handler whose engine is listened
+    :return - The list receiving each statement, in execution order
+    """
+
+    statements = []
+    engine = db_connection_handler.get_engine()
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+
+
 @pytest.fixture(scope="session")
 def mock_entity():
     return {
@@ -186,10 +223,787 @@ def test_package_repository_delete(mock_entity, db_connection_handler):
 
     assert query_entity is None
 
-    try:
+    with pytest.raises(NoResultFound):
         package_repository.delete_package(
             id="nonexists", empresa_id=mock_entity["empresa_id"]
         )
-        assert False
-    except:
-        assert True
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "DATABASE_STATEMENT_STATS": "ENABLED"},
+)
+def test_package_repository_reuses_compiled_statements(mock_entity):
+    """
+    Test that list and count statements are built once and their compiled SQL reused
+    :param - None
+    :return - None
+    """
+
+    EngineRegistry.reset()
+    PackageStatements.reset()
+    package_repository = PackageRepository()
+
+    for _ in range(3):
+        package_repository.select_packages(
+            empresa_id=mock_entity["empresa_id"], name=fake.name()
+        )
+        package_repository.count_packages(
+            empresa_id=mock_entity["empresa_id"], name=fake.name()
+        )
+
+    stats = PackageStatements.stats()
+
+    assert stats["misses"] == 2
+    assert stats["hits"] == 4
+    assert stats["compiled_misses"] <= 2
+    assert stats["compiled_hits"] >= 4
+    EngineRegistry.reset()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_list_by_cursor(db_connection_handler):
+    """
+    Test keyset pagination returns every Package once, in the same order as offset pagination
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    package_repository.bulk_insert_packages(
+        [
+            {
+                "name": "package {:02d}".format(index % 7),
+                "empresa_id": empresa_id,
+                "created_at": datetime(2021, 1, 1 + index % 5, 10, 0, 0),
+            }
+            for index in range(25)
+        ]
+    )
+
+    for column, order in (("created_at", "desc"), ("name", "asc"), ("id", "asc")):
+        by_offset = package_repository.select_packages(
+            empresa_id=empresa_id, column=column, order=order, limit=25
+        )
+
+        by_cursor = []
+        cursor = None
+        while True:
+            page = package_repository.select_packages(
+                empresa_id=empresa_id,
+                column=column,
+                order=order,
+                limit=10,
+                cursor=cursor,
+            )
+            by_cursor.extend(page)
+            if len(page) < 10:
+                break
+            cursor = package_repository.build_cursor(page[-1], column, order)
+
+        assert [package.id for package in by_cursor] == [
+            package.id for package in by_offset
+        ]
+        assert len(set(package.id for package in by_cursor)) == 25
+
+    with pytest.raises(ValueError):
+        package_repository.select_packages(
+            empresa_id=empresa_id, column="name", order="desc", cursor=cursor
+        )
+
+    by_symbol = package_repository.select_packages(
+        empresa_id=empresa_id, column="symbol", order="asc", limit=25
+    )
+    assert len(by_symbol) == 25
+    with pytest.raises(ValueError):
+        package_repository.select_packages(empresa_id=empresa_id, column="created_by")
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_list_with_total(db_connection_handler):
+    """
+    Test the page and the filter total are retrieved in a single statement, the total being
+    reused by the next pages
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    package_repository.bulk_insert_packages(
+        [
+            {"name": "package {:02d}".format(index), "empresa_id": empresa_id}
+            for index in range(12)
+        ]
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        records, total = package_repository.select_packages_with_total(
+            empresa_id=empresa_id, name="package", column="name", order="asc", limit=5
+        )
+
+    assert len(statements) == 1
+    assert "OVER" in statements[0]
+    assert total == 12
+    assert [package.name for package in records] == [
+        "package {:02d}".format(index) for index in range(5)
+    ]
+
+    cursor = package_repository.build_cursor(records[-1], "name", "asc")
+    records, total = package_repository.select_packages_with_total(
+        empresa_id=empresa_id,
+        name="package",
+        column="name",
+        order="asc",
+        limit=5,
+        cursor=cursor,
+    )
+    assert total == 12
+    assert records[0].name == "package 05"
+
+    records, total = package_repository.select_packages_with_total(
+        empresa_id=empresa_id, name="package 1", limit=5, page=20
+    )
+    assert records == []
+    assert total == 2
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_search(db_connection_handler):
+    """
+    Test name and symbol filters are served by the search shadow table, kept in sync on writes
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.bulk_insert_packages(
+        [
+            {"name": "Blue Widget Pro", "symbol": "BWP", "empresa_id": empresa_id},
+            {"name": "Widget", "symbol": "WDG", "empresa_id": empresa_id},
+            {"name": "Widgets Kit", "symbol": "WKT", "empresa_id": empresa_id},
+            {"name": "Gadget", "symbol": "GDG", "empresa_id": empresa_id},
+        ]
+    )
+
+    engine = db_connection_handler.get_engine()
+    assert PackageSearch.uses_shadow_table(engine, "widget", "")
+    assert not PackageSearch.uses_shadow_table(engine, "wi", "")
+
+    data = package_repository.select_packages(
+        empresa_id=empresa_id, name="widget", column="relevance"
+    )
+    assert [package.name for package in data] == [
+        "Widget",
+        "Widgets Kit",
+        "Blue Widget Pro",
+    ]
+    assert package_repository.count_packages(empresa_id=empresa_id, name="widget") == 3
+    assert (
+        package_repository.count_packages(
+            empresa_id=empresa_id, name="widget", symbol="wk"
+        )
+        == 1
+    )
+
+    package_repository.update_package(
+        id=created[3].id, name="Gadget Widget", symbol="GDG", empresa_id=empresa_id
+    )
+    package_repository.delete_package(id=created[0].id, empresa_id=empresa_id)
+    data = package_repository.select_packages(
+        empresa_id=empresa_id, name="widget", column="name", order="asc"
+    )
+    assert [package.name for package in data] == [
+        "Gadget Widget",
+        "Widget",
+        "Widgets Kit",
+    ]
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_bulk_writes(db_connection_handler):
+    """
+    Test many Packages are created, updated and deleted in single transactions with per item results
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+
+    results = package_repository.create_packages(
+        [
+            {"name": "package 1", "symbol": "P1", "empresa_id": empresa_id},
+            {"name": "", "empresa_id": empresa_id},
+            {"name": "package 3", "symbol": "P3", "empresa_id": empresa_id},
+            {"name": "package 4", "symbol": "P4", "empresa_id": empresa_id},
+        ]
+    )
+    assert [result.success for result in results] == [True, False, True, True]
+    assert results[1].error == "invalid"
+    assert results[2].package.name == "package 3"
+    ids = [result.id for result in results if result.success]
+
+    results = package_repository.update_packages(
+        [
+            {"id": ids[0], "name": "package 1 updated", "symbol": "P1U"},
+            {"id": generate_uuid(), "name": "missing"},
+        ],
+        empresa_id=empresa_id,
+    )
+    assert [result.error for result in results] == [None, "not_found"]
+    assert results[0].package.name == "package 1 updated"
+    assert package_repository.get_package(ids[0], empresa_id).symbol == "P1U"
+
+    results = package_repository.delete_packages(
+        [ids[0], generate_uuid()], empresa_id=empresa_id
+    )
+    assert [result.success for result in results] == [True, False]
+    assert package_repository.get_package(ids[0], empresa_id) is None
+
+    assert package_repository.delete_packages_by_filter(generate_uuid()) == 0
+    assert (
+        package_repository.delete_packages_by_filter(empresa_id, name="package 3") == 1
+    )
+    assert package_repository.delete_packages_by_filter(empresa_id) == 1
+    assert package_repository.count_packages(empresa_id=empresa_id) == 0
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_writes_without_reload(db_connection_handler):
+    """
+    Test create issues a single Package statement and update and delete are scoped by company
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+
+    with capture_statements(db_connection_handler) as statements:
+        package = package_repository.create_package(
+            name="package", symbol="PKG", empresa_id=empresa_id
+        )
+
+    package_statements = [
+        statement for statement in statements if "package_counters" not in statement
+    ]
+    assert len(package_statements) == 1
+    assert package_statements[0].startswith("INSERT")
+
+    with pytest.raises(NoResultFound):
+        package_repository.update_package(
+            id=package.id, name="other", symbol=None, empresa_id=generate_uuid()
+        )
+
+    updated = package_repository.update_package(
+        id=package.id, name="updated", symbol=None, empresa_id=empresa_id
+    )
+    assert updated.name == "updated"
+    assert updated.created_at[:19] == package.created_at[:19]
+
+    deleted = package_repository.delete_package_returning(package.id, empresa_id)
+    assert deleted.name == "updated"
+    assert package_repository.get_package(package.id, empresa_id) is None
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_list_projection(db_connection_handler):
+    """
+    Test list queries only load the projected columns, with id and the order column
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    package_repository.bulk_insert_packages(
+        [
+            {
+                "name": "package {}".format(index),
+                "symbol": "P",
+                "empresa_id": empresa_id,
+            }
+            for index in range(3)
+        ]
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        records, total = package_repository.select_packages_with_total(
+            empresa_id=empresa_id, column="name", order="asc", fields=["name"]
+        )
+
+    selected = statements[-1].split("FROM")[0]
+    assert "packages.name" in selected and "packages.id" in selected
+    assert "packages.symbol" not in selected
+    assert total == 3
+    assert records[0].name == "package 0"
+    assert records[0].symbol is None
+    assert package_repository.build_cursor(records[-1], "name", "asc") is not None
+
+    with pytest.raises(ValueError):
+        package_repository.select_packages(empresa_id=empresa_id, fields=["secret"])
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_include_products(db_connection_handler):
+    """
+    Test products are batch loaded only when included, and never lazy loaded
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.bulk_insert_packages(
+        [
+            {"name": "package {}".format(index), "empresa_id": empresa_id}
+            for index in range(5)
+        ]
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        records = package_repository.select_packages(
+            empresa_id=empresa_id, include=["products"]
+        )
+        not_included = package_repository.select_packages(empresa_id=empresa_id)
+
+    assert len(statements) == 3
+    assert [record.products for record in records] == [[]] * 5
+    assert [record.products for record in not_included] == [None] * 5
+    assert records[0].to_dict()["products"] == []
+    assert "products" not in not_included[0].to_dict()
+
+    package = package_repository.get_package(
+        created[0].id, empresa_id, include=["products"]
+    )
+    assert package.products == []
+
+    with DBConnectionHandler() as db_connection:
+        entity = (
+            db_connection.session.query(PackageModel)
+            .options(*PackageStatements.loader_options())
+            .filter(PackageModel.id == created[0].id)
+            .first()
+        )
+        with pytest.raises(InvalidRequestError):
+            entity.products
+        db_connection.close()
+
+    with pytest.raises(ValueError):
+        package_repository.select_packages(empresa_id=empresa_id, include=["owner"])
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_count_cache(db_connection_handler):
+    """
+    Test totals are served by the company counter and the filtered count cache, kept right by writes
+    :param - None
+    :return - None
+    """
+
+    PackageCounts.reset()
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.bulk_insert_packages(
+        [
+            {"name": "widget {}".format(index), "empresa_id": empresa_id}
+            for index in range(4)
+        ]
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        assert package_repository.count_packages(empresa_id=empresa_id) == 4
+        assert (
+            package_repository.count_packages(empresa_id=empresa_id, name="widget") == 4
+        )
+        assert (
+            package_repository.count_packages(empresa_id=empresa_id, name="widget") == 4
+        )
+
+    assert len(statements) == 2
+    assert "package_counters" in statements[0]
+    assert PackageCounts.stats()["hits"] == 1
+
+    package_repository.delete_packages([created[0].id], empresa_id)
+    package_repository.create_package(name="gadget", symbol=None, empresa_id=empresa_id)
+    package_repository.delete_package_returning(created[1].id, empresa_id)
+
+    assert package_repository.count_packages(empresa_id=empresa_id) == 3
+    assert package_repository.count_packages(empresa_id=empresa_id, name="widget") == 2
+    with capture_statements(db_connection_handler) as statements:
+        records, total = package_repository.select_packages_with_total(
+            empresa_id=empresa_id, limit=1
+        )
+        assert total == 3
+        cursor = package_repository.build_cursor(records[-1])
+        records, total = package_repository.select_packages_with_total(
+            empresa_id=empresa_id, limit=1, cursor=cursor
+        )
+        assert total == 3
+
+    assert len(statements) == 2
+    assert all("package_counters" in statement for statement in statements)
+
+    # Companies without a counter yet are counted by the page statement
+    with DBConnectionHandler() as db_connection:
+        db_connection.session.execute(
+            delete(PackageCounter).where(PackageCounter.empresa_id == empresa_id)
+        )
+        db_connection.commit()
+        db_connection.close()
+    with capture_statements(db_connection_handler) as statements:
+        records, total = package_repository.select_packages_with_total(
+            empresa_id=empresa_id, limit=1
+        )
+    assert len(statements) == 1
+    assert total == 3
+
+    assert package_repository.delete_packages_by_filter(empresa_id, name="widget") == 2
+    assert package_repository.count_packages(empresa_id=empresa_id) == 1
+    assert package_repository.count_packages(empresa_id=empresa_id, name="widget") == 0
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_reads_records(db_connection_handler):
+    """
+    Test list and get map rows straight into PackageRecord, serialized without conversions
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.bulk_insert_packages(
+        [{"name": "record", "symbol": "REC", "empresa_id": empresa_id}]
+    )
+
+    records = package_repository.select_packages(empresa_id=empresa_id)
+    package = package_repository.get_package(created[0].id, empresa_id)
+
+    for record in (records[0], package):
+        assert isinstance(record, PackageRecord)
+        assert not hasattr(record, "__dict__")
+        assert record.created_at[:19] == created[0].created_at[:19]
+        assert json.loads(json.dumps(record.to_dict())) == record.to_dict()
+        assert record.to_dict(["name"]) == {"name": "record"}
+        assert tuple(record) == tuple(created[0])[:3] + tuple(record)[3:]
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_package_repository_get_packages(db_connection_handler):
+    """
+    Test many Packages are read by chunked IN queries in the requested order, scoped by company
+    :param - None
+    :return - None
+    """
+
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.bulk_insert_packages(
+        [
+            {"name": "package {}".format(index), "empresa_id": empresa_id}
+            for index in range(5)
+        ]
+    )
+    other = package_repository.bulk_insert_packages(
+        [{"name": "other", "empresa_id": generate_uuid()}]
+    )
+    ids = [created[3].id, "<NOT_EXISTING_ID>", created[0].id, other[0].id]
+    ids += [created[4].id, created[3].id, created[1].id]
+
+    with capture_statements(db_connection_handler) as statements:
+        with mock.patch.object(PackageRepository, "GET_PACKAGES_CHUNK_SIZE", 4):
+            records = package_repository.get_packages(ids, empresa_id)
+
+    assert len(statements) == 2
+    assert [record.name for record in records] == [
+        "package 3",
+        "package 0",
+        "package 4",
+        "package 1",
+    ]
+    assert package_repository.get_packages([], empresa_id) == []
+
+    package_repository.delete_packages_by_filter(empresa_id)
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "PACKAGE_CACHE_SIZE": "2"},
+)
+def test_package_repository_package_cache(db_connection_handler):
+    """
+    Test Packages read by ID are cached per container, updated or dropped by writes and evicted by size
+    :param - None
+    :return - None
+    """
+
+    PackageCache.reset()
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.create_package(
+        name="package", symbol=None, empresa_id=empresa_id
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        assert package_repository.get_package(created.id, empresa_id).name == "package"
+        assert package_repository.get_package(created.id, "<OTHER_COMPANY>") is None
+
+    assert len(statements) == 1
+    assert PackageCache.stats()["hits"] == 1
+
+    package_repository.update_package(
+        id=created.id, name="renamed", symbol=None, empresa_id=empresa_id
+    )
+    assert package_repository.get_package(created.id, empresa_id).name == "renamed"
+
+    package_repository.update_packages(
+        [{"id": created.id, "name": "batch renamed"}], empresa_id
+    )
+    assert (
+        package_repository.get_package(created.id, empresa_id).name == "batch renamed"
+    )
+
+    package_repository.create_package(name="second", symbol=None, empresa_id=empresa_id)
+    package_repository.create_package(name="third", symbol=None, empresa_id=empresa_id)
+    assert PackageCache.stats()["evictions"] == 1
+    assert PackageCache.stats()["size"] == 2
+
+    package_repository.delete_package(created.id, empresa_id)
+    assert package_repository.get_package(created.id, empresa_id) is None
+
+    with mock.patch.dict(os.environ, {"PACKAGE_CACHE_ENABLED": "DISABLED"}):
+        second = package_repository.create_package(
+            name="uncached", symbol=None, empresa_id=empresa_id
+        )
+        package_repository.get_package(second.id, empresa_id)
+        assert package_repository.get_package(second.id, empresa_id) is not None
+        assert PackageCache.get(empresa_id, second.id) is None
+
+    package_repository.delete_packages_by_filter(empresa_id)
+    assert PackageCache.stats()["size"] == 0
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": MOCK_DB_PATH,
+        "PACKAGE_SHARED_CACHE_URL": "memory://packages",
+        "PACKAGE_CACHE_ENABLED": "DISABLED",
+    },
+)
+def test_package_repository_shared_cache(db_connection_handler):
+    """
+    Test get and list reads are served by the shared cache until a committed write bumps the company version
+    :param - None
+    :return - None
+    """
+
+    PackageSharedCache.reset()
+    MemoryCacheBackend.reset()
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.create_package(
+        name="package", symbol=None, empresa_id=empresa_id
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        for _ in range(2):
+            assert (
+                package_repository.get_package(created.id, empresa_id).name == "package"
+            )
+            records, total = package_repository.select_packages_with_total(
+                empresa_id=empresa_id, fields=["id", "name"]
+            )
+            assert [record.name for record in records] == ["package"]
+            assert records[0].symbol is None
+            assert total == 1
+
+    assert len(statements) == 2
+    assert PackageSharedCache.stats()["hits"] == 2
+
+    package_repository.update_package(
+        id=created.id, name="renamed", symbol=None, empresa_id=empresa_id
+    )
+    assert package_repository.get_package(created.id, empresa_id).name == "renamed"
+
+    records, total = package_repository.select_packages_with_total(
+        empresa_id=empresa_id, fields=["id", "name"]
+    )
+
+    # Reads of a UnitOfWork that may write see its own writes and are never cached
+    with pytest.raises(RuntimeError):
+        with UnitOfWork(empresa_id=empresa_id):
+            package_repository.create_package(
+                name="rolled back", symbol=None, empresa_id=empresa_id
+            )
+            package_repository.update_package(
+                id=created.id, name="uncommitted", symbol=None, empresa_id=empresa_id
+            )
+            assert (
+                package_repository.get_package(created.id, empresa_id).name
+                == "uncommitted"
+            )
+            records, total = package_repository.select_packages_with_total(
+                empresa_id=empresa_id, fields=["id", "name"]
+            )
+            assert total == 2
+            raise RuntimeError("rollback")
+
+    assert package_repository.get_package(created.id, empresa_id).name == "renamed"
+    records, total = package_repository.select_packages_with_total(
+        empresa_id=empresa_id, fields=["id", "name"]
+    )
+    assert [record.name for record in records] == ["renamed"]
+    assert PackageSharedCache.stats()["invalidations"] == 2
+
+    package_repository.create_package(name="second", symbol=None, empresa_id=empresa_id)
+    records, total = package_repository.select_packages_with_total(
+        empresa_id=empresa_id, fields=["id", "name"]
+    )
+    assert total == 2
+
+    with mock.patch.object(
+        MemoryCacheBackend, "get_many", side_effect=ConnectionError("down")
+    ):
+        assert package_repository.get_package(created.id, empresa_id).name == "renamed"
+    assert PackageSharedCache.stats()["errors"] == 1
+
+    package_repository.delete_packages_by_filter(empresa_id)
+    PackageSharedCache.reset()
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": MOCK_DB_PATH,
+        "PACKAGE_SHARED_CACHE_URL": "memory://packages",
+    },
+)
+def test_package_repository_package_cache_follows_shared_version(
+    db_connection_handler, capsys
+):
+    """
+    Test per container hits are dropped once another container bumps the shared version, and
+    that shared cache failures are logged and served as misses
+    :param - None
+    :return - None
+    """
+
+    PackageCache.reset()
+    PackageSharedCache.reset()
+    MemoryCacheBackend.reset()
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.create_package(
+        name="package", symbol=None, empresa_id=empresa_id
+    )
+    # Writes cache the Package under the version their commit produced
+    with capture_statements(db_connection_handler) as statements:
+        assert package_repository.get_package(created.id, empresa_id).name == "package"
+        package_repository.update_package(
+            id=created.id, name="updated", symbol=None, empresa_id=empresa_id
+        )
+        assert package_repository.get_package(created.id, empresa_id).name == "updated"
+    # Only the update and, without RETURNING on SQLite, its row read reach the database
+    assert len(statements) == 2
+    assert statements[0].startswith("UPDATE")
+    assert PackageCache.stats()["hits"] == 2
+
+    # A write committed by another container: the row changes and the version is bumped
+    engine = db_connection_handler.get_engine()
+    engine.execute(
+        "UPDATE packages SET name='renamed' WHERE id='{}'".format(created.id)
+    )
+    MemoryCacheBackend("memory://packages").incr(
+        "packages:{}:version".format(empresa_id)
+    )
+    assert package_repository.get_package(created.id, empresa_id).name == "updated"
+    # Seen once the version kept by this container expires
+    with mock.patch.object(time, "monotonic", return_value=time.monotonic() + 2):
+        assert package_repository.get_package(created.id, empresa_id).name == "renamed"
+
+    with mock.patch.object(
+        MemoryCacheBackend, "incr", side_effect=ConnectionError("down")
+    ):
+        package_repository.update_package(
+            id=created.id, name="unversioned", symbol=None, empresa_id=empresa_id
+        )
+    assert "not incremented" in capsys.readouterr().out
+
+    PackageCache.reset()
+    PackageSharedCache.reset()
+    with mock.patch.dict(os.environ, {"PACKAGE_SHARED_CACHE_URL": "unknown://host"}):
+        assert (
+            package_repository.get_package(created.id, empresa_id).name == "unversioned"
+        )
+        records, total = package_repository.select_packages_with_total(
+            empresa_id=empresa_id
+        )
+        assert total == 1
+        package_repository.delete_package(created.id, empresa_id)
+    assert PackageSharedCache.stats()["errors"] == 1
+    assert "backend unavailable" in capsys.readouterr().out
+
+    PackageSharedCache.reset()
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "TEST_DATABASE_CONNECTION": MOCK_DB_PATH,
+        "TEST_DATABASE_READER_CONNECTION": MOCK_DB_PATH,
+        "DATABASE_READ_YOUR_WRITES_SECONDS": "0",
+        "PACKAGE_SHARED_CACHE_URL": "memory://packages",
+    },
+)
+def test_package_repository_reader_reads_are_not_cached(db_connection_handler):
+    """
+    Test reads served by a reader, that may lag behind the current version, are not cached
+    :param - None
+    :return - None
+    """
+
+    PackageCache.reset()
+    PackageSharedCache.reset()
+    MemoryCacheBackend.reset()
+    empresa_id = generate_uuid()
+    package_repository = PackageRepository()
+    created = package_repository.bulk_insert_packages(
+        [{"name": "package", "empresa_id": empresa_id}]
+    )
+
+    with capture_statements(db_connection_handler) as statements:
+        for _ in range(2):
+            assert (
+                package_repository.get_package(created[0].id, empresa_id).name
+                == "package"
+            )
+            records, total = package_repository.select_packages_with_total(
+                empresa_id=empresa_id
+            )
+            assert total == 1
+
+    assert len(statements) == 4
+    assert PackageCache.stats()["size"] == 0
+    assert PackageSharedCache.stats()["hits"] == 0
+
+    package_repository.delete_packages_by_filter(empresa_id)
+    PackageSharedCache.reset()
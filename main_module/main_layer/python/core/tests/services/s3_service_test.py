@@ -0,0 +1,68 @@
+import os
+import boto3
+from unittest import mock
+from core.src.infra.services import S3Service, S3MultipartWriter
+
+try:
+    from moto import mock_aws
+except ImportError:  # moto < 5
+    from moto import mock_s3, mock_sts
+
+    def mock_aws(function):
+        return mock_s3(mock_sts(function))
+
+
+BUCKET = "exports-test"
+
+
+@mock.patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+@mock_aws
+def test_multipart_writer_uploads_bounded_parts():
+    """
+    Test the S3MultipartWriter uploading an object larger than its part size
+    :param - None
+    :return - None
+    """
+
+    boto3.client("s3", "us-east-1").create_bucket(Bucket=BUCKET)
+    service = S3Service()
+    payload = b"0123456789abcdef" * (11 * 1024 * 1024 // 16)
+
+    with service.open_multipart_writer(BUCKET, "large.bin", part_size=1) as writer:
+        for start in range(0, len(payload), 65536):
+            writer.write(payload[start : start + 65536])
+            assert len(writer._buffer) < S3MultipartWriter.MIN_PART_SIZE
+
+    assert writer.part_size == S3MultipartWriter.MIN_PART_SIZE
+    assert len(writer._parts) == 3
+    assert writer.bytes_written == len(payload)
+
+    body = boto3.client("s3", "us-east-1").get_object(Bucket=BUCKET, Key="large.bin")
+    assert body["Body"].read() == payload
+    assert b"".join(service.iter_object_lines(BUCKET, "large.bin", start=16)) == payload[16:]
+
+
+@mock.patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+@mock_aws
+def test_multipart_writer_aborts_on_error():
+    """
+    Test the S3MultipartWriter aborting the upload when the writing block raises
+    :param - None
+    :return - None
+    """
+
+    client = boto3.client("s3", "us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    service = S3Service()
+
+    try:
+        with service.open_multipart_writer(BUCKET, "failed.bin") as writer:
+            writer.write("partial")
+            raise RuntimeError("encoding failed")
+    except RuntimeError:
+        pass
+
+    assert writer.closed is True
+    assert client.list_objects_v2(Bucket=BUCKET).get("KeyCount") == 0
+    assert client.list_multipart_uploads(Bucket=BUCKET).get("Uploads") is None
+    assert service.generate_presigned_url(BUCKET, "failed.bin").startswith("https://")
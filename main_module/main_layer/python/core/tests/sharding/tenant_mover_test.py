@@ -0,0 +1,135 @@
+import os
+import json
+import uuid
+import pytest
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import create_engine, delete, insert, select, update
+from core.src.infra.config import Base, DBConnectionHandler, ShardMap
+from core.src.infra.entities import Package as PackageModel, PackageCounter
+from core.src.infra.repo import PackageRepository
+from core.src.infra.sharding import TenantMover
+
+
+@pytest.fixture
+def shard_urls(tmp_path):
+    urls = {
+        name: "sqlite:///{}".format(tmp_path / "{}.db".format(name))
+        for name in ("directory", "a", "b")
+    }
+    for url in urls.values():
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+    environment = {
+        "TEST_DATABASE_CONNECTION": urls["directory"],
+        "DATABASE_SHARDS": json.dumps(
+            {"shards": {"a": {"url": urls["a"]}, "b": {"url": urls["b"]}}}
+        ),
+        "DATABASE_SHARD_MAP_TTL_SECONDS": "0",
+    }
+    with mock.patch.dict(os.environ, environment):
+        ShardMap.reset()
+        yield urls
+
+    ShardMap.reset()
+    DBConnectionHandler.dispose_engines()
+
+
+def company_on(shard: str) -> str:
+    while True:
+        empresa_id = str(uuid.uuid4())
+        if ShardMap.ring_shard(empresa_id) == shard:
+            return empresa_id
+
+
+def test_tenant_mover_moves_company(shard_urls):
+    """
+    Test that a move copies the company, syncs the writes made before the lock and purges the source
+    :param - None
+    :return - None
+    """
+
+    empresa_id = company_on("a")
+    neighbour_id = company_on("a")
+    created = PackageRepository.bulk_insert_packages(
+        [
+            {"name": "package {}".format(index), "empresa_id": empresa_id}
+            for index in range(7)
+        ]
+        + [{"name": "neighbour", "empresa_id": neighbour_id}]
+    )
+    table = PackageModel.__table__
+    source = create_engine(shard_urls["a"])
+    target = create_engine(shard_urls["b"])
+
+    def late_writes(seconds):
+        if ShardMap.is_locked(empresa_id):
+            with source.begin() as connection:
+                connection.execute(
+                    update(table)
+                    .where(table.c.id == created[0].id)
+                    .values(name="renamed")
+                )
+                connection.execute(delete(table).where(table.c.id == created[1].id))
+                connection.execute(
+                    insert(table).values(
+                        id="late",
+                        name="late",
+                        empresa_id=empresa_id,
+                        created_at=datetime.now(),
+                        updated_at=datetime.now(),
+                    )
+                )
+
+    result = TenantMover(empresa_id, "b", batch_size=3, sleep=late_writes).move()
+
+    assert result == {"copied": 7, "synced": 3, "purged": 7}
+    assert ShardMap.shard_name(empresa_id) == "b"
+    assert ShardMap.is_locked(empresa_id) is False
+
+    names = target.execute(
+        select(table.c.name).where(table.c.empresa_id == empresa_id)
+    ).scalars()
+    assert sorted(names) == ["late"] + [
+        "package {}".format(index) for index in range(2, 7)
+    ] + ["renamed"]
+    assert source.execute(
+        select(table.c.name).where(table.c.empresa_id.in_([empresa_id, neighbour_id]))
+    ).scalars().all() == ["neighbour"]
+    assert (
+        source.execute(
+            select(PackageCounter.total).where(PackageCounter.empresa_id == empresa_id)
+        ).scalar()
+        is None
+    )
+    assert PackageRepository.count_packages(empresa_id=empresa_id) == 7
+    assert PackageRepository.get_package("late", empresa_id).name == "late"
+
+    source.dispose()
+    target.dispose()
+
+
+def test_tenant_mover_unlocks_on_failure(shard_urls):
+    """
+    Test that a failed move leaves the company active on its source shard
+    :param - None
+    :return - None
+    """
+
+    empresa_id = company_on("a")
+    PackageRepository.create_package(name="package", symbol=None, empresa_id=empresa_id)
+    mover = TenantMover(empresa_id, "b", sleep=lambda seconds: None)
+
+    with pytest.raises(RuntimeError):
+        with mock.patch.object(
+            TenantMover, "sync", side_effect=[1, RuntimeError("sync failed")]
+        ):
+            mover.move()
+
+    assert ShardMap.shard_name(empresa_id) == "a"
+    assert ShardMap.is_locked(empresa_id) is False
+    assert PackageRepository.count_packages(empresa_id=empresa_id) == 1
+    with pytest.raises(ValueError):
+        TenantMover(empresa_id, "a")
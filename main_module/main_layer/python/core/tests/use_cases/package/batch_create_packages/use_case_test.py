@@ -0,0 +1,81 @@
+import os
+import uuid
+import pytest
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DBConnectionHandler
+from core.src.data.package.batch_create_packages import (
+    BatchCreatePackagesUseCase,
+    BatchCreatePackagesParameter,
+)
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+BODY_SCHEMA = {
+    "type": "array",
+    "minItems": 1,
+    "maxItems": 3,
+    "items": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "minLength": 1},
+            "symbol": {"type": ["string", "null"]},
+        },
+        "required": ["name"],
+    },
+}
+
+
+@pytest.fixture(scope="session")
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def db_connection_handler():
+    return DBConnectionHandler()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_batch_create_use_case(db_connection_handler):
+    """
+    Test the BatchCreatePackagesUseCase invocation with a schema invalid item
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    items = [
+        {"name": "package 1", "symbol": "P1"},
+        {"symbol": "P2"},
+        {"name": "package 3"},
+    ]
+
+    use_case = BatchCreatePackagesUseCase()
+    schema_validate = use_case.validate_schema_items("packages", items, BODY_SCHEMA)
+    assert [error["index"] for error in schema_validate.errors] == [1]
+    assert schema_validate.errors[0]["field"] == "name"
+
+    parameter = BatchCreatePackagesParameter(
+        empresa_id=empresa_id,
+        packages=items,
+        created_by=str(uuid.uuid4()),
+        item_errors={1: schema_validate.errors},
+    )
+    response = use_case.proceed(parameter)
+
+    assert response["success"] is True
+    assert response["created"] == 2
+    assert response["failed"] == 1
+    assert [result["success"] for result in response["data"]] == [True, False, True]
+    assert [result["index"] for result in response["data"]] == [0, 1, 2]
+    assert response["data"][1]["error"] == "invalid"
+    assert response["data"][1]["errors"] == schema_validate.errors
+    assert response["data"][2]["package"]["name"] == "package 3"
+    assert response["data"][2]["package"]["empresa_id"] == empresa_id
+    assert "products" not in response["data"][2]["package"]
+
+    schema_validate = use_case.validate_schema_items(
+        "packages", items + items, BODY_SCHEMA
+    )
+    assert None in [error["index"] for error in schema_validate.errors]
+
+    db_connection_handler.get_engine().execute(
+        "DELETE FROM packages WHERE empresa_id='{}'".format(empresa_id)
+    )
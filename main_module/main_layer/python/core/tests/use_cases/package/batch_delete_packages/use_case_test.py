@@ -0,0 +1,46 @@
+import os
+import uuid
+import pytest
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DBConnectionHandler
+from core.src.infra.repo import PackageRepository
+from core.src.data.package.batch_delete_packages import (
+    BatchDeletePackagesUseCase,
+    BatchDeletePackagesParameter,
+)
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+
+@pytest.fixture(scope="session")
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def db_connection_handler():
+    return DBConnectionHandler()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_batch_delete_use_case(db_connection_handler):
+    """
+    Test the BatchDeletePackagesUseCase invocation with an unknown ID
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    created = PackageRepository().bulk_insert_packages(
+        [{"name": "package 1", "empresa_id": empresa_id}]
+    )
+
+    use_case = BatchDeletePackagesUseCase()
+    parameter = BatchDeletePackagesParameter(
+        empresa_id=empresa_id, ids=[created[0].id, "<NOT_EXISTING_ID>"]
+    )
+    response = use_case.proceed(parameter)
+
+    assert response["success"] is True
+    assert response["deleted"] == 1
+    assert response["failed"] == 1
+    assert response["data"][0]["success"] is True
+    assert response["data"][1]["error"] == "not_found"
+    assert PackageRepository().count_packages(empresa_id=empresa_id) == 0
@@ -62,6 +62,7 @@ def test_create_use_case(mock_entity, db_connection_handler):
     response = use_case.proceed(parameter)
     assert response["success"] is True
     assert response["data"] is not None
+    assert "products" not in response["data"]
 
     data = use_case.serialize(response)["data"]
 
@@ -0,0 +1,158 @@
+import os
+import csv
+import json
+import uuid
+import boto3
+import pytest
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DBConnectionHandler
+from core.src.infra.export import ParquetEncoder
+from core.src.infra.repo import PackageRepository
+from core.src.data.package.export_packages import (
+    ExportPackagesUseCase,
+    ExportPackagesParameter,
+)
+
+try:
+    from moto import mock_aws
+except ImportError:  # moto < 5
+    from moto import mock_s3, mock_sts
+
+    def mock_aws(function):
+        return mock_s3(mock_sts(function))
+
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+BUCKET = "exports-test"
+
+
+@pytest.fixture(scope="session")
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def db_connection_handler():
+    return DBConnectionHandler()
+
+
+def create_tenant_packages(total: int) -> str:
+    empresa_id = str(uuid.uuid4())
+    PackageRepository().bulk_insert_packages(
+        [
+            {
+                "name": "package {}".format(index),
+                "symbol": 'sy,"{}'.format(index),
+                "empresa_id": empresa_id,
+            }
+            for index in range(total)
+        ]
+    )
+    return empresa_id
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_export_use_case_ndjson(db_connection_handler):
+    """
+    Test the ExportPackagesUseCase streaming a company into NDJSON, in several batches
+    :param - None
+    :return - None
+    """
+
+    client = boto3.client("s3", "us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    empresa_id = create_tenant_packages(25)
+    create_tenant_packages(3)
+
+    parameter = ExportPackagesParameter(
+        empresa_id=empresa_id,
+        format="ndjson",
+        bucket=BUCKET,
+        key="exports/{}/packages".format(empresa_id),
+        batch_size=10,
+    )
+    response = ExportPackagesUseCase().proceed(parameter)
+
+    assert response["success"] is True
+    assert response["data"]["rows"] == 25
+    assert response["data"]["key"].endswith("packages.ndjson")
+    assert response["data"]["key"] in response["data"]["url"]
+
+    body = client.get_object(Bucket=BUCKET, Key=response["data"]["key"])["Body"]
+    lines = body.read().decode("utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert len(rows) == 25
+    assert {row["empresa_id"] for row in rows} == {empresa_id}
+    assert sorted(row["name"] for row in rows) == sorted(
+        "package {}".format(index) for index in range(25)
+    )
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_export_use_case_csv(db_connection_handler):
+    """
+    Test the ExportPackagesUseCase writing a CSV with header and quoted values
+    :param - None
+    :return - None
+    """
+
+    client = boto3.client("s3", "us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    empresa_id = create_tenant_packages(4)
+
+    parameter = ExportPackagesParameter(
+        empresa_id=empresa_id,
+        format="csv",
+        bucket=BUCKET,
+        key="exports/{}/packages".format(empresa_id),
+    )
+    response = ExportPackagesUseCase().proceed(parameter)
+
+    assert response["success"] is True
+    body = client.get_object(Bucket=BUCKET, Key=response["data"]["key"])["Body"]
+    rows = list(csv.DictReader(body.read().decode("utf-8").splitlines()))
+    assert len(rows) == 4
+    assert rows[0]["symbol"].startswith('sy,"')
+    assert rows[0]["created_by"] == ""
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_export_use_case_unavailable_format(db_connection_handler):
+    """
+    Test the ExportPackagesUseCase failing without leaving an object for unknown formats
+    :param - None
+    :return - None
+    """
+
+    client = boto3.client("s3", "us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    empresa_id = create_tenant_packages(1)
+
+    assert ExportPackagesUseCase.available_formats() == ["ndjson", "csv"] + (
+        ["parquet"] if ParquetEncoder.is_available() else []
+    )
+
+    for export_format in ["xml"] + (
+        [] if ParquetEncoder.is_available() else ["parquet"]
+    ):
+        parameter = ExportPackagesParameter(
+            empresa_id=empresa_id,
+            format=export_format,
+            bucket=BUCKET,
+            key="exports/{}/packages".format(empresa_id),
+        )
+        response = ExportPackagesUseCase().proceed(parameter)
+
+        assert response["success"] is False
+
+    assert client.list_objects_v2(Bucket=BUCKET).get("KeyCount") == 0
+    assert client.list_multipart_uploads(Bucket=BUCKET).get("Uploads") is None
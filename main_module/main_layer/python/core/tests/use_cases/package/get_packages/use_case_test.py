@@ -0,0 +1,48 @@
+import os
+import uuid
+import pytest
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DBConnectionHandler
+from core.src.infra.repo import PackageRepository
+from core.src.data.package.get_packages import (
+    GetPackagesUseCase,
+    GetPackagesParameter,
+)
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+
+
+@pytest.fixture(scope="session")
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def db_connection_handler():
+    return DBConnectionHandler()
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_get_packages_use_case(db_connection_handler):
+    """
+    Test the GetPackagesUseCase invocation keeping the requested order and reporting unknown IDs
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    created = PackageRepository().bulk_insert_packages(
+        [
+            {"name": "package 1", "empresa_id": empresa_id},
+            {"name": "package 2", "empresa_id": empresa_id},
+        ]
+    )
+
+    use_case = GetPackagesUseCase()
+    parameter = GetPackagesParameter(
+        ids=[created[1].id, "<NOT_EXISTING_ID>", created[0].id],
+        empresa_id=empresa_id,
+    )
+    response = use_case.proceed(parameter)
+
+    assert response["success"] is True
+    assert [item["name"] for item in response["data"]] == ["package 2", "package 1"]
+    assert response["missing"] == ["<NOT_EXISTING_ID>"]
+    assert use_case.serialize(response) == response
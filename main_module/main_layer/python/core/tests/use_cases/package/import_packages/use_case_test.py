@@ -0,0 +1,237 @@
+import os
+import json
+import uuid
+import boto3
+import pytest
+from unittest import mock
+from core.tests.mock_util import MockTools
+from core.src.infra.config import DBConnectionHandler, DatabaseRetryPolicy
+from core.src.infra.repo import PackageRepository
+from core.src.data.package.import_packages import (
+    ImportPackagesUseCase,
+    ImportPackagesParameter,
+)
+
+try:
+    from moto import mock_aws
+except ImportError:  # moto < 5
+    from moto import mock_s3, mock_sts
+
+    def mock_aws(function):
+        return mock_s3(mock_sts(function))
+
+
+MOCK_DB_PATH = MockTools.get_mock_db_path()
+BUCKET = "imports-test"
+
+
+@pytest.fixture(scope="session")
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def db_connection_handler():
+    return DBConnectionHandler()
+
+
+def upload_file(key: str, lines: list) -> boto3.client:
+    client = boto3.client("s3", "us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    client.put_object(Bucket=BUCKET, Key=key, Body="\n".join(lines).encode("utf-8"))
+    return client
+
+
+def read_error_reports(client, prefix: str) -> list:
+    reports = []
+    objects = client.list_objects_v2(Bucket=BUCKET, Prefix=prefix).get("Contents", [])
+    for item in sorted(objects, key=lambda item: item["Key"]):
+        body = client.get_object(Bucket=BUCKET, Key=item["Key"])["Body"].read()
+        reports += [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    return reports
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_import_use_case_csv(db_connection_handler):
+    """
+    Test the ImportPackagesUseCase importing a CSV in chunks with a per line error report
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    lines = ["name,symbol"] + [
+        "package {},p{}".format(index, index) for index in range(7)
+    ]
+    lines.insert(3, ",missing name")
+    lines.insert(5, "too,many,values")
+    key = ImportPackagesUseCase.uploads_prefix(empresa_id) + "catalog.csv"
+    client = upload_file(key, lines)
+
+    parameter = ImportPackagesParameter(
+        empresa_id=empresa_id,
+        bucket=BUCKET,
+        key=key,
+        format="csv",
+        job_id="job-csv",
+        chunk_size=3,
+    )
+    response = ImportPackagesUseCase().proceed(parameter)
+
+    assert response["success"] is True
+    assert response["data"]["done"] is True
+    assert response["data"]["rows"] == 9
+    assert response["data"]["created"] == 7
+    assert response["data"]["failed"] == 2
+    assert PackageRepository().count_packages(empresa_id=empresa_id) == 7
+
+    reports = read_error_reports(client, response["data"]["reports"])
+    assert [report["line"] for report in reports] == [4, 6]
+    assert reports[0]["errors"][0]["field"] == "name"
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_import_use_case_resumes_from_checkpoint(db_connection_handler):
+    """
+    Test the ImportPackagesUseCase stopping before the deadline and resuming without duplicates,
+    also when the last committed chunk has no checkpoint
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    lines = [json.dumps({"name": "package {}".format(index)}) for index in range(10)]
+    lines.insert(4, "{not json")
+    key = ImportPackagesUseCase.uploads_prefix(empresa_id) + "catalog.ndjson"
+    client = upload_file(key, lines)
+
+    parameter = ImportPackagesParameter(
+        empresa_id=empresa_id,
+        bucket=BUCKET,
+        key=key,
+        format="ndjson",
+        job_id="job-ndjson",
+        chunk_size=4,
+    )
+    checkpoint_key = (
+        ImportPackagesUseCase.reports_prefix(empresa_id, "job-ndjson")
+        + "/checkpoint.json"
+    )
+
+    with mock.patch.object(
+        DatabaseRetryPolicy, "remaining_seconds", side_effect=[900, 900, 10]
+    ):
+        response = ImportPackagesUseCase().proceed(parameter)
+
+    assert response["data"]["done"] is False
+    assert response["data"]["rows"] == 8
+    assert PackageRepository().count_packages(empresa_id=empresa_id) == 7
+
+    checkpoint = json.loads(
+        client.get_object(Bucket=BUCKET, Key=checkpoint_key)["Body"].read()
+    )
+    checkpoint.update(offset=sum(len(line) + 1 for line in lines[:4]), line=4)
+    checkpoint.update(rows=4, created=4, failed=0)
+    client.put_object(
+        Bucket=BUCKET, Key=checkpoint_key, Body=json.dumps(checkpoint).encode()
+    )
+
+    response = ImportPackagesUseCase().proceed(parameter)
+
+    assert response["data"]["done"] is True
+    assert response["data"]["rows"] == 11
+    assert response["data"]["failed"] == 1
+    assert PackageRepository().count_packages(empresa_id=empresa_id) == 10
+
+    reports = read_error_reports(client, response["data"]["reports"])
+    assert [report["line"] for report in reports] == [5]
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_import_use_case_csv_multiline_values(db_connection_handler):
+    """
+    Test the ImportPackagesUseCase reading quoted CSV values that span lines, resuming after them
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    lines = [
+        "name,symbol",
+        '"first\npackage",p1',
+        "second package,p2",
+        '"third, with comma","p\n3"',
+        "fourth package,p4",
+    ]
+    key = ImportPackagesUseCase.uploads_prefix(empresa_id) + "catalog.csv"
+    upload_file(key, lines)
+
+    parameter = ImportPackagesParameter(
+        empresa_id=empresa_id,
+        bucket=BUCKET,
+        key=key,
+        format="csv",
+        job_id="job-multiline",
+        chunk_size=1,
+    )
+    with mock.patch.object(
+        DatabaseRetryPolicy, "remaining_seconds", side_effect=[900, 900, 900, 10]
+    ):
+        response = ImportPackagesUseCase().proceed(parameter)
+
+    assert response["data"]["done"] is False
+    assert response["data"]["line"] == 6
+    assert response["data"]["offset"] == sum(len(line) + 1 for line in lines[:4])
+
+    response = ImportPackagesUseCase().proceed(parameter)
+
+    assert response["data"]["done"] is True
+    assert response["data"]["rows"] == 4
+    assert response["data"]["failed"] == 0
+    packages = PackageRepository().select_packages(
+        empresa_id=empresa_id, column="name", order="asc"
+    )
+    assert [(package.name, package.symbol) for package in packages] == [
+        ("first\npackage", "p1"),
+        ("fourth package", "p4"),
+        ("second package", "p2"),
+        ("third, with comma", "p\n3"),
+    ]
+
+
+@mock.patch.dict(
+    os.environ,
+    {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH, "AWS_DEFAULT_REGION": "us-east-1"},
+)
+@mock_aws
+def test_import_use_case_rejects_keys_of_other_companies(db_connection_handler):
+    """
+    Test the ImportPackagesUseCase refusing files outside the uploads prefix of the company
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    key = ImportPackagesUseCase.uploads_prefix(str(uuid.uuid4())) + "catalog.csv"
+    upload_file(key, ["name,symbol", "package,p"])
+
+    response = ImportPackagesUseCase().proceed(
+        ImportPackagesParameter(
+            empresa_id=empresa_id,
+            bucket=BUCKET,
+            key=key,
+            format="csv",
+            job_id="job-foreign",
+        )
+    )
+
+    assert response["success"] is False
+    assert PackageRepository().count_packages(empresa_id=empresa_id) == 0
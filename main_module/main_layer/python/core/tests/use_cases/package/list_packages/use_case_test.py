@@ -67,3 +67,129 @@ def test_list_use_case(mock_entity, db_connection_handler):
     assert response["data"][0]["empresa_id"] == mock_entity["empresa_id"]
 
     engine.execute("DELETE FROM packages WHERE empresa_id='{}'".format(empresa_id))
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_list_use_case_by_cursor(db_connection_handler):
+    """
+    Test the ListPackagesUseCase invocation paginated by next_cursor
+    :param - None
+    :return - None
+    """
+
+    empresa_id = str(uuid.uuid4())
+    engine = db_connection_handler.get_engine()
+    for index in range(3):
+        engine.execute(
+            MockUtil.build_insert_sql(
+                "packages",
+                {
+                    "id": str(uuid.uuid4()),
+                    "empresa_id": empresa_id,
+                    "name": fake.name(),
+                    "created_at": "2021-01-0{} 10:00:00.000000".format(index + 1),
+                    "updated_at": "2021-01-0{} 10:00:00.000000".format(index + 1),
+                },
+            )
+        )
+
+    use_case = ListPackagesUseCase()
+    ids = []
+    cursor = None
+    for _ in range(3):
+        parameter = ListPackagesParameter(
+            empresa_id=empresa_id,
+            name="",
+            symbol="",
+            column="created_at",
+            order="desc",
+            page=0,
+            limit=2,
+            cursor=cursor,
+        )
+        response = use_case.proceed(parameter)
+
+        assert response["success"] is True
+        assert response["total"] == 3
+        ids.extend(item["id"] for item in response["data"])
+        cursor = response["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(ids) == 3
+    assert len(set(ids)) == 3
+
+    engine.execute("DELETE FROM packages WHERE empresa_id='{}'".format(empresa_id))
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_list_use_case_with_fields(mock_entity, db_connection_handler):
+    """
+    Test the ListPackagesUseCase invocation serializing the requested fields, the ID and the order column
+    :param - None
+    :return - None
+    """
+
+    empresa_id = mock_entity["empresa_id"]
+    engine = db_connection_handler.get_engine()
+    engine.execute(MockUtil.build_insert_sql("packages", mock_entity))
+
+    use_case = ListPackagesUseCase()
+    parameter = ListPackagesParameter(
+        empresa_id=empresa_id,
+        name="",
+        symbol="",
+        column="created_at",
+        order="desc",
+        page=0,
+        limit=10,
+        fields=["name", "symbol"],
+    )
+    response = use_case.proceed(parameter)
+
+    assert response["success"] is True
+    assert response["data"] == [
+        {
+            "id": mock_entity["id"],
+            "name": mock_entity["name"],
+            "symbol": mock_entity["symbol"],
+            "created_at": response["data"][0]["created_at"],
+        }
+    ]
+    assert response["data"][0]["created_at"] is not None
+    assert response["total"] == 1
+
+    engine.execute("DELETE FROM packages WHERE empresa_id='{}'".format(empresa_id))
+
+
+@mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_DB_PATH})
+def test_list_use_case_with_unknown_fields(mock_entity, db_connection_handler):
+    """
+    Test the ListPackagesUseCase invocation rejecting fields that are not Package columns
+    :param - None
+    :return - None
+    """
+
+    use_case = ListPackagesUseCase()
+    parameter = ListPackagesParameter(
+        empresa_id=mock_entity["empresa_id"],
+        name="",
+        symbol="",
+        column="created_at",
+        order="desc",
+        page=0,
+        limit=10,
+        fields=["name", "nmae"],
+    )
+    response = use_case.proceed(parameter)
+
+    assert response["success"] is False
+    assert response["data"] == []
+    assert response["errors"] == [
+        {
+            "entity": "packages",
+            "field": "fields",
+            "type": "invalid",
+            "msg": "'nmae' is not a Package field",
+        }
+    ]
@@ -13,11 +13,14 @@ sys.path.pop()
 
 from core.src.infra.config import *
 from core.src.infra.entities import *
+from core.src.infra.migrations import MigrationRunner
 
 @mock.patch.dict(os.environ, {"TEST_DATABASE_CONNECTION": MOCK_SQLITE_PATH})
 def generate_tables():    
     conn = DBConnectionHandler()
     engine = conn.get_engine()
     Base.metadata.create_all(engine)
+    MigrationRunner(engine).upgrade()
+    DBConnectionHandler.dispose_engines()
 
 generate_tables()
\ No newline at end of file
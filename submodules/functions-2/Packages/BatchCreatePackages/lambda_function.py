@@ -0,0 +1,76 @@
+import os
+import json
+from core.src.infra.config import DatabaseRetryPolicy
+from core.src.data.package.batch_create_packages import (
+    BatchCreatePackagesUseCase,
+    BatchCreatePackagesParameter,
+)
+
+CORENAMESPACE = os.environ['CORE_NAMESPACE']
+NAMESPACE = os.environ['NAMESPACE']
+MODULE = os.environ['MODULE']
+REGION = os.environ['REGION']
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS') or 500)
+
+BODY_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "PackageBatchSchema",
+	"type": "array",
+	"minItems": 1,
+	"maxItems": BATCH_MAX_ITEMS,
+	"items": {
+		"type": "object",
+		"properties": {
+			"name": { "type": "string", "minLength": 1 },
+			"symbol": { "type": ["string", "null"] }
+		},
+		"required": ["name"]
+	}
+}
+
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
+    print("EVENT -> ", json.dumps(event))
+
+    empresa_id = event['empresa_id']
+    entity = 'packages'
+
+    user_data = event["principal"]
+    body = event['body']
+    use_case = BatchCreatePackagesUseCase()
+
+    if not isinstance(body, list):
+        return {'success': False, 'ErrorCodes': [{'entity': entity, 'type': 'invalid', 'msg': 'body must be an array'}]}
+
+    schema_validate = use_case.validate_schema_items(entity, body, BODY_SCHEMA)
+    request_errors = [error for error in schema_validate.errors if error['index'] is None]
+    if len(request_errors) > 0:
+        return {'success': False, 'ErrorCodes': request_errors}
+
+    item_errors = {}
+    for error in schema_validate.errors:
+        item_errors.setdefault(error['index'], []).append(error)
+
+    parameter = BatchCreatePackagesParameter(
+        empresa_id=empresa_id,
+        packages=body,
+        created_by=user_data["id"],
+        item_errors=item_errors,
+    )
+    response = use_case.proceed(parameter)
+
+    if response['success']:
+        data = use_case.serialize(response)["data"]
+        return {
+            'success': True, 
+            'msg': "{} Embalagens cadastradas com sucesso".format(response['created']), 
+            'created': response['created'],
+            'failed': response['failed'],
+            'data': data
+        }
+    else:
+        return {
+            'success': False, 
+            'data': response['data'], 
+            'ErrorCodes': ['entity.save.error']
+        }
@@ -0,0 +1,61 @@
+import os
+import json
+from core.src.infra.config import DatabaseRetryPolicy
+from core.src.data.package.batch_delete_packages import (
+    BatchDeletePackagesUseCase,
+    BatchDeletePackagesParameter,
+)
+
+CORENAMESPACE = os.environ['CORE_NAMESPACE']
+NAMESPACE = os.environ['NAMESPACE']
+MODULE = os.environ['MODULE']
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS') or 500)
+
+BODY_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "PackageBatchDeleteSchema",
+	"type": "object",
+	"properties": {
+		"ids": {
+			"type": "array",
+			"minItems": 1,
+			"maxItems": BATCH_MAX_ITEMS,
+			"uniqueItems": True,
+			"items": { "type": "string", "minLength": 1 }
+		}
+	},
+	"required": ["ids"]
+}
+
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
+    print("EVENT -> ", json.dumps(event))
+
+    empresa_id = event['empresa_id']
+    entity = 'packages'
+
+    body = event['body']
+    use_case = BatchDeletePackagesUseCase()
+
+    schema_validate = use_case.validate_schema(entity, body, BODY_SCHEMA)
+    if not schema_validate.success:
+        return {'success': schema_validate.success, 'ErrorCodes': schema_validate.errors}
+
+    parameter = BatchDeletePackagesParameter(
+        empresa_id=empresa_id, ids=body['ids']
+    )
+    response = use_case.proceed(parameter)
+
+    if response['success']:
+        return {
+            'success': True, 
+            'msg': '{} Embalagens foram removidas com sucesso.'.format(response['deleted']),
+            'deleted': response['deleted'],
+            'failed': response['failed'],
+            'data': response['data']
+        }
+    else:
+        return {
+            'success': False, 
+            'msg': 'Erro ao remover Embalagens'
+        }
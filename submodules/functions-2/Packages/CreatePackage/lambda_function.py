@@ -1,6 +1,7 @@
 import os
 import json
 from datetime import datetime, timezone, timedelta
+from core.src.infra.config import DatabaseRetryPolicy
 from core.src.data.package.create_package import (
     CreatePackageUseCase,
     CreatePackageParameter,
@@ -22,7 +23,8 @@ BODY_SCHEMA = {
 	"required": ["name"]
 }
 
-def lambda_handler(event, _):
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
     print("EVENT -> ", json.dumps(event))
 
     empresa_id = event['empresa_id']
@@ -1,5 +1,6 @@
 import os
 import json
+from core.src.infra.config import DatabaseRetryPolicy
 from core.src.data.package.delete_package import (
     DeletePackageUseCase,
     DeletePackageParameter,
@@ -11,6 +12,7 @@ CORENAMESPACE = os.environ['CORE_NAMESPACE']
 NAMESPACE = os.environ['NAMESPACE']
 MODULE = os.environ['MODULE']
 
+@DatabaseRetryPolicy.with_lambda_deadline
 def lambda_handler(event, context):
     print("EVENT -> ", json.dumps(event))
 
@@ -0,0 +1,91 @@
+import os
+import json
+import uuid
+import boto3
+from datetime import datetime, timezone
+from core.src.infra.config import DatabaseRetryPolicy
+from core.src.data.package.export_packages import (
+    ExportPackagesUseCase,
+    ExportPackagesParameter,
+)
+
+CORENAMESPACE = os.environ['CORE_NAMESPACE']
+NAMESPACE = os.environ['NAMESPACE']
+MODULE = os.environ['MODULE']
+REGION = os.environ['REGION']
+FUNCTION_NAME = os.environ['AWS_LAMBDA_FUNCTION_NAME']
+EXPORT_BUCKET = os.environ['EXPORT_BUCKET']
+EXPORT_URL_EXPIRES = int(os.getenv('EXPORT_URL_EXPIRES') or 3600)
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE') or 1000)
+# Formats whose encoder cannot run in this Lambda (parquet without pyarrow) are rejected before
+# the asynchronous invocation, so callers never get a url that will not resolve
+EXPORT_FORMATS = ExportPackagesUseCase.available_formats()
+
+def build_export_key(empresa_id):
+    """Build the object key of a new export, without extension"""
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    return 'exports/{}/packages/{}-{}'.format(empresa_id, timestamp, uuid.uuid4())
+
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
+    print("EVENT -> ", json.dumps(event))
+
+    empresa_id = event['empresa_id']
+    export_format = event.get('format') or 'ndjson'
+    if export_format not in EXPORT_FORMATS:
+        msg = 'Formato de exportacao invalido, use: {}'.format(', '.join(EXPORT_FORMATS))
+        return {
+            'success': False,
+            'msg': msg,
+            'ErrorCodes': [{'entity': 'packages', 'field': 'format', 'type': 'invalid', 'msg': msg}]
+        }
+
+    # API requests cannot wait for large exports, they start an asynchronous invocation
+    # of this function and answer with the key and the url the export will be found at
+    if event.get('export_key') is None:
+        export_key = build_export_key(empresa_id)
+        boto3.client('lambda', REGION).invoke(
+            FunctionName=FUNCTION_NAME,
+            InvocationType='Event',
+            Payload=json.dumps({
+                'empresa_id': empresa_id,
+                'format': export_format,
+                'export_key': export_key
+            })
+        )
+        key = '{}.{}'.format(export_key, export_format)
+        url = boto3.client('s3', REGION).generate_presigned_url(
+            'get_object',
+            Params={'Bucket': EXPORT_BUCKET, 'Key': key},
+            ExpiresIn=EXPORT_URL_EXPIRES
+        )
+        return {
+            'success': True,
+            'msg': 'Exportacao de Embalagens iniciada.',
+            'status': 'processing',
+            'data': {'key': key, 'format': export_format, 'url': url}
+        }
+
+    parameter = ExportPackagesParameter(
+        empresa_id=empresa_id,
+        format=export_format,
+        bucket=EXPORT_BUCKET,
+        key=event['export_key'],
+        region=REGION,
+        expires_in=EXPORT_URL_EXPIRES,
+        batch_size=EXPORT_BATCH_SIZE
+    )
+    response = ExportPackagesUseCase().proceed(parameter)
+
+    if response['success']:
+        return {
+            'success': True,
+            'msg': 'Embalagens exportadas com sucesso.',
+            'status': 'completed',
+            'data': response['data']
+        }
+    else:
+        return {
+            'success': False,
+            'msg': 'Erro ao exportar Embalagens'
+        }
@@ -1,5 +1,6 @@
 import os
 import json
+from core.src.infra.config import DatabaseRetryPolicy
 from core.src.data.package.get_package import (
     GetPackageParameter,
     GetPackageUseCase,
@@ -10,18 +11,22 @@ NAMESPACE = os.environ['NAMESPACE']
 MODULE = os.environ['MODULE']
 FUNCTION_NAME = os.environ['AWS_LAMBDA_FUNCTION_NAME']
 
-def lambda_handler(event, _):
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
     print("EVENT -> ", json.dumps(event))
     
     empresa_id = event['empresa_id']
     entity_id = event['id']
+    include = [item.strip() for item in event['include'].split(',')] if len(event.get('include', '')) > 0 else None
 
     use_case = GetPackageUseCase()
     parameter = GetPackageParameter(
         id=entity_id,
         empresa_id=empresa_id,
+        include=include,
     )
     response = use_case.proceed(parameter)
-    
-    return use_case.serialize(response)
+
+    # The record is already serialized, only embedded relationships may hold dates or decimals
+    return use_case.serialize(response) if include else response
     
\ No newline at end of file
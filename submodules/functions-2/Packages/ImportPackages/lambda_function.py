@@ -0,0 +1,104 @@
+import os
+import json
+import uuid
+import boto3
+from core.src.infra.config import DatabaseRetryPolicy
+from core.src.data.package.import_packages import (
+    ImportPackagesUseCase,
+    ImportPackagesParameter,
+)
+
+CORENAMESPACE = os.environ['CORE_NAMESPACE']
+NAMESPACE = os.environ['NAMESPACE']
+MODULE = os.environ['MODULE']
+REGION = os.environ['REGION']
+FUNCTION_NAME = os.environ['AWS_LAMBDA_FUNCTION_NAME']
+IMPORT_BUCKET = os.environ['IMPORT_BUCKET']
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE') or 1000)
+IMPORT_RESERVE_SECONDS = int(os.getenv('IMPORT_RESERVE_SECONDS') or 60)
+
+BODY_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "PackageImportSchema",
+	"type": "object",
+	"properties": {
+		"key": { "type": "string", "minLength": 1 },
+		"format": { "type": "string", "enum": ["csv", "ndjson"] }
+	},
+	"required": ["key", "format"]
+}
+
+def invoke_async(payload):
+    """Start an asynchronous invocation of this function"""
+    boto3.client('lambda', REGION).invoke(
+        FunctionName=FUNCTION_NAME,
+        InvocationType='Event',
+        Payload=json.dumps(payload)
+    )
+
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
+    print("EVENT -> ", json.dumps(event))
+
+    empresa_id = event['empresa_id']
+    entity = 'packages'
+
+    # API requests only start the job, the import runs in asynchronous invocations
+    # that resume from the job checkpoint until the whole file is processed
+    if event.get('job_id') is None:
+        body = event['body']
+        use_case = ImportPackagesUseCase()
+        schema_validate = use_case.validate_schema(entity, body, BODY_SCHEMA)
+        if not schema_validate.success:
+            return {'success': schema_validate.success, 'ErrorCodes': schema_validate.errors}
+
+        # Only files uploaded under the company prefix can be imported
+        uploads_prefix = ImportPackagesUseCase.uploads_prefix(empresa_id)
+        if not body['key'].startswith(uploads_prefix):
+            return {'success': False, 'ErrorCodes': [{'entity': entity, 'field': 'key', 'type': 'forbidden', 'msg': 'key must start with ' + uploads_prefix}]}
+
+        job_id = str(uuid.uuid4())
+        invoke_async({
+            'empresa_id': empresa_id,
+            'key': body['key'],
+            'format': body['format'],
+            'job_id': job_id,
+            'created_by': event['principal']['id']
+        })
+        return {
+            'success': True,
+            'msg': 'Importacao de Embalagens iniciada.',
+            'status': 'processing',
+            'data': {
+                'job_id': job_id,
+                'reports': ImportPackagesUseCase.reports_prefix(empresa_id, job_id)
+            }
+        }
+
+    parameter = ImportPackagesParameter(
+        empresa_id=empresa_id,
+        bucket=IMPORT_BUCKET,
+        key=event['key'],
+        format=event['format'],
+        job_id=event['job_id'],
+        created_by=event.get('created_by'),
+        region=REGION,
+        chunk_size=IMPORT_CHUNK_SIZE,
+        reserve_seconds=IMPORT_RESERVE_SECONDS
+    )
+    response = ImportPackagesUseCase().proceed(parameter)
+
+    if not response['success']:
+        return {
+            'success': False,
+            'msg': 'Erro ao importar Embalagens'
+        }
+
+    if not response['data']['done']:
+        invoke_async(event)
+
+    return {
+        'success': True,
+        'status': 'completed' if response['data']['done'] else 'processing',
+        'data': response['data']
+    }
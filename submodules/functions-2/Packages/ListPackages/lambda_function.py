@@ -1,10 +1,15 @@
 import json
 import os
 from lambda_utils import  get_filter
+from core.src.infra.config import DatabaseRetryPolicy
 from core.src.data.package.list_packages import (
     ListPackagesUseCase,
     ListPackagesParameter
 )
+from core.src.data.package.get_packages import (
+    GetPackagesUseCase,
+    GetPackagesParameter
+)
 from core.src.data.filter.get_filter import (
     GetFilterUseCase,
     GetFilterParameter
@@ -14,11 +19,52 @@ CORENAMESPACE = os.environ['CORE_NAMESPACE']
 NAMESPACE = os.environ['NAMESPACE']
 MODULE = os.environ['MODULE']
 FUNCTION_NAME = os.environ['AWS_LAMBDA_FUNCTION_NAME']
+IDS_MAX_ITEMS = int(os.getenv('IDS_MAX_ITEMS') or 500)
+
+def get_column_fields(columns):
+    """Read the field names of the user's saved columns, skipping hidden ones"""
+    fields = []
+    for column in columns or []:
+        if isinstance(column, str):
+            fields.append(column)
+        elif isinstance(column, dict) and column.get('visible', True) is not False:
+            field = column.get('field') or column.get('key') or column.get('name')
+            if field:
+                fields.append(field)
+    return fields
+
+def get_packages_by_ids(empresa_id, ids):
+    """Resolve many packages by id with one request, keeping the requested order"""
+    if len(ids) > IDS_MAX_ITEMS:
+        return {
+            'success': False,
+            'msg': 'Maximo de {} ids por consulta'.format(IDS_MAX_ITEMS)
+        }
 
-def lambda_handler(event, _):
+    use_case = GetPackagesUseCase()
+    response = use_case.proceed(GetPackagesParameter(ids=ids, empresa_id=empresa_id))
+    if response['success'] == True:
+        return {
+            'success': True,
+            'data': response['data'],
+            'total': len(response['data']),
+            'missing': response['missing']
+        }
+    else:
+        return {
+            'success': False,
+            'data': response['data']
+        }
+
+@DatabaseRetryPolicy.with_lambda_deadline
+def lambda_handler(event, context):
     print("EVENT -> ", json.dumps(event))
     
     empresa_id = event['empresa_id']
+    if len(event.get('ids', '')) > 0:
+        ids = [id.strip() for id in event['ids'].split(',') if id.strip()]
+        return get_packages_by_ids(empresa_id, ids)
+
     user_data = event["principal"]
 
     parameter = GetFilterParameter(
@@ -36,14 +82,25 @@ def lambda_handler(event, _):
     limit = int(event['limit']) if len(event['limit']) > 0 else 10
     order = event['order'] if len(event['order']) > 0 else None
     orderfield = event['orderfield'] if len(event['orderfield']) > 0 else None
-    
+    cursor = event['cursor'] if len(event.get('cursor', '')) > 0 else None
     use_case = ListPackagesUseCase()
+    if len(event.get('fields', '')) > 0:
+        fields = [field.strip() for field in event['fields'].split(',')]
+        fields_validate = use_case.validate_fields(fields)
+        if not fields_validate.success:
+            return {'success': False, 'ErrorCodes': fields_validate.errors}
+    else:
+        # Saved columns may hold view only columns, they are projected when they are Package fields
+        fields = [field for field in get_column_fields(filters) if field in use_case.FIELDS]
+    include = [item.strip() for item in event['include'].split(',')] if len(event.get('include', '')) > 0 else None
+    
     parameter = ListPackagesParameter(
-        empresa_id=empresa_id, name=event["name"], symbol=event["symbol"], column=orderfield, order=order, page=offset, limit=limit
+        empresa_id=empresa_id, name=event["name"], symbol=event["symbol"], column=orderfield, order=order, page=offset, limit=limit, cursor=cursor, fields=fields, include=include
     )
     response = use_case.proceed(parameter)
 
-    serialized = use_case.serialize(response)
+    # Records are already serialized, only embedded relationships may hold dates or decimals
+    serialized = use_case.serialize(response) if include else response
     
     if serialized['success'] == True:
         return {
@@ -52,6 +109,7 @@ def lambda_handler(event, _):
             'limit': limit,
             'total': serialized['total'], 
             'offset': int(event['offset']) if len(event['offset']) > 0 else 0,
+            'next_cursor': serialized['next_cursor'],
             'columns': filters
         }
     else: